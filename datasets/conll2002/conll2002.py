@@ -50,7 +50,6 @@ class Conll2003(pytorch_ie.data.builder.GeneratorBasedBuilder):
 
         document = CoNLL2002Document(text=text, id=doc_id)
 
-        for span in sorted(ner_spans, key=lambda span: span.start):
-            document.entities.append(span)
+        document.entities.extend(sorted(ner_spans, key=lambda span: span.start))
 
         return document
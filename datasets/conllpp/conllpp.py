@@ -47,7 +47,6 @@ class CoNLLpp(pytorch_ie.data.builder.GeneratorBasedBuilder):
 
         document = CoNLLppDocument(text=text, id=doc_id)
 
-        for span in sorted(ner_spans, key=lambda span: span.start):
-            document.entities.append(span)
+        document.entities.extend(sorted(ner_spans, key=lambda span: span.start))
 
         return document
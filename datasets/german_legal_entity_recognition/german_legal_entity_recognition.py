@@ -58,7 +58,6 @@ class GermanLegalEntityRecognition(pytorch_ie.data.builder.GeneratorBasedBuilder
 
         document = GermanLegalEntityRecognitionDocument(text=text, id=doc_id)
 
-        for span in sorted(ner_spans, key=lambda span: span.start):
-            document.entities.append(span)
+        document.entities.extend(sorted(ner_spans, key=lambda span: span.start))
 
         return document
@@ -53,7 +53,6 @@ class GermEval14(pytorch_ie.data.builder.GeneratorBasedBuilder):
 
         document = GermEval14Document(text=text, id=doc_id)
 
-        for span in sorted(ner_spans + nested_ner_tags, key=lambda span: span.start):
-            document.entities.append(span)
+        document.entities.extend(sorted(ner_spans + nested_ner_tags, key=lambda span: span.start))
 
         return document
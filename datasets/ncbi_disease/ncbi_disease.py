@@ -49,7 +49,6 @@ class NCBIDisease(pytorch_ie.data.builder.GeneratorBasedBuilder):
 
         document = NCBIDiseaseDocument(text=text, id=doc_id)
 
-        for span in sorted(ner_spans, key=lambda span: span.start):
-            document.entities.append(span)
+        document.entities.extend(sorted(ner_spans, key=lambda span: span.start))
 
         return document
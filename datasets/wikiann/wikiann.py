@@ -219,7 +219,6 @@ class WikiANN(pytorch_ie.data.builder.GeneratorBasedBuilder):
 
         document = WikiANNDocument(text=text, id=None)
 
-        for span in sorted(ner_spans, key=lambda span: span.start):
-            document.entities.append(span)
+        document.entities.extend(sorted(ner_spans, key=lambda span: span.start))
 
         return document
@@ -51,7 +51,6 @@ class WNUT17(pytorch_ie.data.builder.GeneratorBasedBuilder):
 
         document = WNUT17Document(text=text, id=doc_id)
 
-        for span in sorted(ner_spans, key=lambda span: span.start):
-            document.entities.append(span)
+        document.entities.extend(sorted(ner_spans, key=lambda span: span.start))
 
         return document
@@ -3,5 +3,5 @@
 from pytorch_ie.auto import AutoModel, AutoPipeline, AutoTaskModule
 from pytorch_ie.data import *
 from pytorch_ie.models import *
-from pytorch_ie.pipeline import Pipeline
+from pytorch_ie.pipeline import AsyncPipeline, Pipeline
 from pytorch_ie.taskmodules import *
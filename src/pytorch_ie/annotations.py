@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from typing import Optional, Tuple
 
-from pytorch_ie.core.document import Annotation
+from pytorch_ie.core.document import Annotation, with_slots
 
 
 def _post_init_single_label(self):
@@ -29,29 +29,48 @@ def _post_init_multi_label(self):
         )
 
 
+# Exact type checks for the common case of well typed input which allow to skip the (slower) _post_init_*()
+# functions.
+def _is_well_typed_single_label(self) -> bool:
+    return type(self.label) is str and type(self.score) is float
+
+
+def _is_well_typed_multi_label(self) -> bool:
+    return (
+        type(self.label) is tuple
+        and type(self.score) is tuple
+        and len(self.label) == len(self.score)
+    )
+
+
 def _post_init_multi_span(self):
     if isinstance(self.slices, list):
         object.__setattr__(self, "slices", tuple(tuple(s) for s in self.slices))
 
 
+@with_slots
 @dataclass(eq=True, frozen=True)
 class Label(Annotation):
     label: str
     score: float = 1.0
 
     def __post_init__(self) -> None:
-        _post_init_single_label(self)
+        if not _is_well_typed_single_label(self):
+            _post_init_single_label(self)
 
 
+@with_slots
 @dataclass(eq=True, frozen=True)
 class MultiLabel(Annotation):
     label: Tuple[str, ...]
     score: Optional[Tuple[float, ...]] = None
 
     def __post_init__(self) -> None:
-        _post_init_multi_label(self)
+        if not _is_well_typed_multi_label(self):
+            _post_init_multi_label(self)
 
 
+@with_slots
 @dataclass(eq=True, frozen=True)
 class Span(Annotation):
     start: int
@@ -63,24 +82,29 @@ class Span(Annotation):
         return str(self.target[self.start : self.end])
 
 
+@with_slots
 @dataclass(eq=True, frozen=True)
 class LabeledSpan(Span):
     label: str
     score: float = 1.0
 
     def __post_init__(self) -> None:
-        _post_init_single_label(self)
+        if not _is_well_typed_single_label(self):
+            _post_init_single_label(self)
 
 
+@with_slots
 @dataclass(eq=True, frozen=True)
 class MultiLabeledSpan(Span):
     label: Tuple[str, ...]
     score: Optional[Tuple[float, ...]] = None
 
     def __post_init__(self) -> None:
-        _post_init_multi_label(self)
+        if not _is_well_typed_multi_label(self):
+            _post_init_multi_label(self)
 
 
+@with_slots
 @dataclass(eq=True, frozen=True)
 class LabeledMultiSpan(Annotation):
     slices: Tuple[Tuple[int, int], ...]
@@ -89,9 +113,11 @@ class LabeledMultiSpan(Annotation):
 
     def __post_init__(self) -> None:
         _post_init_multi_span(self)
-        _post_init_single_label(self)
+        if not _is_well_typed_single_label(self):
+            _post_init_single_label(self)
 
 
+@with_slots
 @dataclass(eq=True, frozen=True)
 class MultiLabeledMultiSpan(Annotation):
     slices: Tuple[Tuple[int, int], ...]
@@ -100,9 +126,11 @@ class MultiLabeledMultiSpan(Annotation):
 
     def __post_init__(self) -> None:
         _post_init_multi_span(self)
-        _post_init_multi_label(self)
+        if not _is_well_typed_multi_label(self):
+            _post_init_multi_label(self)
 
 
+@with_slots
 @dataclass(eq=True, frozen=True)
 class BinaryRelation(Annotation):
     head: Span
@@ -111,9 +139,11 @@ class BinaryRelation(Annotation):
     score: float = 1.0
 
     def __post_init__(self) -> None:
-        _post_init_single_label(self)
+        if not _is_well_typed_single_label(self):
+            _post_init_single_label(self)
 
 
+@with_slots
 @dataclass(eq=True, frozen=True)
 class MultiLabeledBinaryRelation(Annotation):
     head: Span
@@ -122,4 +152,5 @@ class MultiLabeledBinaryRelation(Annotation):
     score: Optional[Tuple[float, ...]] = None
 
     def __post_init__(self) -> None:
-        _post_init_multi_label(self)
+        if not _is_well_typed_multi_label(self):
+            _post_init_multi_label(self)
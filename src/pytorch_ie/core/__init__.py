@@ -1,3 +1,3 @@
-from .document import Annotation, AnnotationList, Document, annotation_field
+from .document import Annotation, AnnotationList, Document, annotation_field, with_slots
 from .model import PyTorchIEModel
 from .taskmodule import TaskEncoding, TaskModule
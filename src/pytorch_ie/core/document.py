@@ -1,10 +1,16 @@
+import copy
 import dataclasses
+import functools
+import operator
+import sys
+import types
 import typing
-from collections import defaultdict
+from collections import ChainMap
 from collections.abc import Mapping, Sequence
 from dataclasses import _asdict_inner  # type: ignore
 from typing import (
     Any,
+    Callable,
     ClassVar,
     Dict,
     Iterable,
@@ -17,6 +23,10 @@ from typing import (
     overload,
 )
 
+import numpy as np
+
+from pytorch_ie.utils import binary
+
 
 def _enumerate_dependencies(
     resolved: List[str],
@@ -83,12 +93,15 @@ def _is_tuple_of_annotation_types(t: Any) -> bool:
         return False
 
 
+# The result is cached per Annotation subclass because it is required for each call of Annotation.asdict()
+# and Annotation.fromdict(). Note that the returned dict is shared, so it must not be modified.
+@functools.lru_cache(maxsize=None)
 def _get_reference_fields_and_container_types(
     annotation_class: typing.Type["Annotation"],
 ) -> Dict[str, Any]:
     containers: Dict[str, Any] = {}
     for field in dataclasses.fields(annotation_class):
-        if field.name == "_targets":
+        if field.name in _INTERNAL_FIELD_NAMES:
             continue
         if not _contains_annotation_type(field.type):
             continue
@@ -114,6 +127,237 @@ def _get_reference_fields_and_container_types(
     return containers
 
 
+@functools.lru_cache(maxsize=None)
+def _get_field_names(annotation_class: typing.Type["Annotation"]) -> Tuple[str, ...]:
+    return tuple(
+        field.name
+        for field in dataclasses.fields(annotation_class)
+        if field.name not in _INTERNAL_FIELD_NAMES
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _get_hash_values_getter(
+    annotation_class: typing.Type["Annotation"],
+) -> Callable[["Annotation"], Tuple[Any, ...]]:
+    # returns the values of the same fields that the __hash__ generated by dataclass() would use
+    field_names = tuple(
+        field.name
+        for field in dataclasses.fields(annotation_class)
+        if (field.compare if field.hash is None else field.hash)
+    )
+    if len(field_names) == 1:
+        # attrgetter returns a single value (instead of a tuple) in this case
+        field_name = field_names[0]
+        return lambda annotation: (getattr(annotation, field_name),)
+    if len(field_names) == 0:
+        return lambda annotation: ()
+    return operator.attrgetter(*field_names)
+
+
+A = TypeVar("A", bound="Annotation")
+
+# marks absent values where None is a valid value
+_MISSING = object()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_slot_names(cls: type) -> Tuple[str, ...]:
+    # the slots of the class and all its bases, without __dict__ and __weakref__
+    slot_names: List[str] = []
+    for klass in reversed(cls.__mro__):
+        slots = klass.__dict__.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        for name in slots:
+            if name not in ("__dict__", "__weakref__") and name not in slot_names:
+                slot_names.append(name)
+    return tuple(slot_names)
+
+
+def _get_annotation_state(annotation: "Annotation") -> Dict[str, Any]:
+    """Returns all attribute values of the annotation, no matter if they are stored in slots or in __dict__."""
+    state = dict(annotation.__dict__) if hasattr(annotation, "__dict__") else {}
+    for name in _get_slot_names(type(annotation)):
+        value = getattr(annotation, name, _MISSING)
+        if value is not _MISSING:
+            state[name] = value
+    return state
+
+
+def _set_annotation_state(annotation: "Annotation", state: Dict[str, Any]) -> None:
+    # annotations are frozen, so we need to bypass their __setattr__
+    for name, value in state.items():
+        object.__setattr__(annotation, name, value)
+
+
+def _create_slots_init(cls: type) -> Callable[..., None]:
+    """
+    Creates an __init__ for the slotted dataclass that behaves like the one generated by dataclass(), but sets
+    the values directly via the slot descriptors. This is considerably faster than object.__setattr__() which
+    dataclass() uses for frozen classes.
+    """
+    namespace: Dict[str, Any] = {"_HAS_DEFAULT_FACTORY": _MISSING}
+    params: List[str] = []
+    kw_only_params: List[str] = []
+    body: List[str] = []
+    for field in dataclasses.fields(cls):
+        name = field.name
+        setter = f"_set_{name}"
+        descriptor = next(
+            (
+                klass.__dict__[name]
+                for klass in cls.__mro__
+                if isinstance(klass.__dict__.get(name), types.MemberDescriptorType)
+            ),
+            None,
+        )
+        if descriptor is not None:
+            namespace[setter] = descriptor.__set__
+        else:
+            # the value is stored in __dict__
+            namespace[setter] = functools.partial(_set_attribute, name=name)
+        has_default = field.default is not dataclasses.MISSING
+        has_default_factory = field.default_factory is not dataclasses.MISSING  # type: ignore
+        namespace[f"_default_{name}"] = field.default
+        namespace[f"_default_factory_{name}"] = field.default_factory  # type: ignore
+        if field.init:
+            if has_default:
+                param = f"{name}=_default_{name}"
+            elif has_default_factory:
+                param = f"{name}=_HAS_DEFAULT_FACTORY"
+                body.append(
+                    f"if {name} is _HAS_DEFAULT_FACTORY: {name} = _default_factory_{name}()"
+                )
+            else:
+                param = name
+            (kw_only_params if getattr(field, "kw_only", False) else params).append(param)
+            body.append(f"{setter}(self, {name})")
+        elif has_default_factory:
+            body.append(f"{setter}(self, _default_factory_{name}())")
+        elif has_default:
+            body.append(f"{setter}(self, _default_{name})")
+    if hasattr(cls, "__post_init__"):
+        body.append("self.__post_init__()")
+    if len(kw_only_params) > 0:
+        params = params + ["*"] + kw_only_params
+    body_str = "\n".join(f"    {line}" for line in body) or "    pass"
+    exec(f"def __init__(self, {', '.join(params)}):\n{body_str}", namespace)
+    __init__ = namespace["__init__"]
+    __init__.__qualname__ = f"{cls.__qualname__}.__init__"
+    return __init__
+
+
+def _set_attribute(obj: Any, value: Any, name: str) -> None:
+    object.__setattr__(obj, name, value)
+
+
+def with_slots(cls: typing.Type[A]) -> typing.Type[A]:
+    """
+    Class decorator that recreates an Annotation dataclass with __slots__ for its fields, so its instances do not
+    have a __dict__ which reduces their memory footprint considerably. This is what dataclass(slots=True) does,
+    but that requires Python 3.10. Apply it on top of the dataclass decorator:
+
+        @with_slots
+        @dataclasses.dataclass(eq=True, frozen=True)
+        class MySpan(Span):
+            ...
+
+    Note that the instances have a __dict__ anyway if any base class (except object) does not define __slots__.
+    In addition, the generated __init__ is replaced by a faster one (see _create_slots_init).
+    """
+    cls_dict = dict(cls.__dict__)
+    inherited_slot_names = set(_get_slot_names(cls))
+    slot_names = tuple(
+        field.name for field in dataclasses.fields(cls) if field.name not in inherited_slot_names
+    )
+    slot_names += tuple(name for name in _INTERNAL_SLOT_NAMES if name not in inherited_slot_names)
+    if not any(base.__weakrefoffset__ for base in cls.__bases__):
+        # keep the instances weakly referenceable
+        slot_names += ("__weakref__",)
+    cls_dict["__slots__"] = slot_names
+    for name in slot_names:
+        # the default values are class attributes that would conflict with the slots, but the generated
+        # __init__ holds them anyway
+        cls_dict.pop(name, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+    new_cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    new_cls.__qualname__ = cls.__qualname__
+    if not any(
+        field._field_type is dataclasses._FIELD_INITVAR  # type: ignore
+        for field in cls.__dataclass_fields__.values()  # type: ignore
+    ):
+        new_cls.__init__ = _create_slots_init(new_cls)  # type: ignore
+    # let zero-argument super() in the methods refer to the new class
+    for value in cls_dict.values():
+        for func in (
+            value,
+            getattr(value, "__func__", None),
+            getattr(value, "fget", None),
+            getattr(value, "fset", None),
+        ):
+            if getattr(func, "__closure__", None) is None:
+                continue
+            for name, cell in zip(func.__code__.co_freevars, func.__closure__):
+                if name == "__class__" and cell.cell_contents is cls:
+                    cell.cell_contents = new_cls
+    return new_cls
+
+
+# fields of the Annotation base class that are not part of the serialized annotations
+_INTERNAL_FIELD_NAMES = ("_targets",)
+
+# Attributes of annotations that are stored in slots of the Annotation base class, but are not dataclass fields,
+# so that they are not exposed by dataclasses.fields(), asdict() or replace(). They are not set initially:
+# _hash is the cached hash (see Annotation.__hash__()) and _allocated_id the id allocated by the document (see
+# Document.ALLOCATE_ANNOTATION_IDS).
+_INTERNAL_SLOT_NAMES = ("_hash", "_allocated_id")
+
+# values of these types can be serialized as they are (_asdict_inner would deepcopy them)
+_ATOMIC_TYPES = (str, int, float, bool, type(None))
+
+
+def _copy_annotation(
+    annotation: "Annotation",
+    copies: Dict[int, "Annotation"],
+    excluded: Optional[Callable[["Annotation"], bool]] = None,
+) -> "Annotation":
+    """
+    Creates a shallow copy of the annotation without targets. References to other annotations are replaced
+    with their copies, if available in `copies` (a mapping from id(original) to copy). Raises a ValueError if
+    the annotation references an annotation for which `excluded` returns True, i.e. one that is not copied.
+    """
+
+    def copy_reference(anno: "Annotation") -> "Annotation":
+        anno_copy = copies.get(id(anno))
+        if anno_copy is not None:
+            return anno_copy
+        if excluded is not None and excluded(anno):
+            raise ValueError(
+                f"can not copy the annotation {annotation!r} because it references the annotation {anno!r} "
+                f"which is not copied"
+            )
+        return anno
+
+    state = _get_annotation_state(annotation)
+    state["_allocated_id"] = None
+    state["_targets"] = None
+    reference_fields = _get_reference_fields_and_container_types(type(annotation))
+    for field_name, container_type in reference_fields.items():
+        value = getattr(annotation, field_name)
+        if value is None:
+            continue
+        if container_type == tuple:
+            new_value = tuple(copy_reference(anno) for anno in value)
+        else:
+            new_value = copy_reference(value)
+        state[field_name] = new_value
+    annotation_copy = object.__new__(type(annotation))
+    _set_annotation_state(annotation_copy, state)
+    return annotation_copy
+
+
 def _get_annotation_fields(fields: List[dataclasses.Field]) -> Set[dataclasses.Field]:
     return {field for field in fields if typing.get_origin(field.type) is AnnotationList}
 
@@ -122,6 +366,7 @@ def annotation_field(
     target: Optional[str] = None,
     targets: Optional[List[str]] = None,
     named_targets: Optional[Dict[str, str]] = None,
+    columnar: bool = False,
 ):
     """
     We allow 3 variants to pass targets:
@@ -132,6 +377,10 @@ def annotation_field(
     3) as a mapping `named_targets: Dict[str, str]` from entries in Annotation.TARGET_NAMES to field names of the
         Document: This should be used if the respective Annotation class defines `TARGET_NAMES`, and thus,
         makes use of the `named_targets` property.
+
+    If `columnar` is set, the annotations (and predictions) are stored column-wise in NumPy arrays instead of a
+    list of Annotation objects (see ColumnarAnnotationList). This is only possible for Annotation classes whose
+    fields are plain int, float or str values, e.g. Span or LabeledSpan.
     """
     target_names = None
     new_targets = []
@@ -149,7 +398,9 @@ def annotation_field(
         new_targets = list(named_targets.values())
         target_names = list(named_targets.keys())
     return dataclasses.field(
-        metadata=dict(targets=new_targets, target_names=target_names), init=False, repr=False
+        metadata=dict(targets=new_targets, target_names=target_names, columnar=columnar),
+        init=False,
+        repr=False,
     )
 
 
@@ -157,13 +408,41 @@ def annotation_field(
 TARGET_TYPE = Union["AnnotationList", str]
 
 
+@with_slots
 @dataclasses.dataclass(eq=True, frozen=True)
 class Annotation:
+    # The internal field uses a default_factory, so that the generated __init__ sets its value. A plain default
+    # would be a class attribute which does not work with slots (see with_slots).
     _targets: Optional[Tuple[TARGET_TYPE, ...]] = dataclasses.field(
-        default=None, init=False, repr=False, hash=False
+        default_factory=lambda: None, init=False, repr=False, hash=False
     )
     TARGET_NAMES: ClassVar[Optional[Tuple[str, ...]]] = None
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Use the caching __hash__ below also for subclasses. Otherwise, dataclass() would generate a new one
+        # (if the subclass does not define __hash__ by itself).
+        if "__hash__" not in cls.__dict__:
+            cls.__hash__ = Annotation.__hash__  # type: ignore
+
+    def __hash__(self) -> int:
+        # Annotations are immutable, so we can cache the hash. This avoids recomputing the hashes of all
+        # referenced annotations, e.g. the head and tail of a relation.
+        cached_hash = getattr(self, "_hash", None)
+        if cached_hash is None:
+            cached_hash = hash(_get_hash_values_getter(type(self))(self))
+            object.__setattr__(self, "_hash", cached_hash)
+        return cached_hash
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # do not pickle the cached hash since string hashes differ between Python processes
+        state = _get_annotation_state(self)
+        state.pop("_hash", None)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        _set_annotation_state(self, {"_hash": None, "_allocated_id": None, **state})
+
     def set_targets(self, value: Optional[Tuple[TARGET_TYPE, ...]]):
         if value is not None and self._targets is not None:
             raise ValueError(
@@ -171,10 +450,20 @@ class Annotation:
                 f"annotation list container or remove the annotation with pop() "
                 f"to assign it to a new annotation list with other targets."
             )
+        if value is None:
+            object.__setattr__(self, "_allocated_id", None)
         object.__setattr__(self, "_targets", value)
 
     @property
     def _id(self) -> int:
+        """
+        The id that is used to reference this annotation when serialized. This is the id that was allocated by
+        the document the annotation is attached to (see Document.ALLOCATE_ANNOTATION_IDS), or the hash of the
+        annotation otherwise.
+        """
+        allocated_id = getattr(self, "_allocated_id", None)
+        if allocated_id is not None:
+            return allocated_id
         return hash(self)
 
     @property
@@ -208,19 +497,16 @@ class Annotation:
         exclude_fields: Optional[List[str]] = None,
         overrides: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
-        result: List[Tuple[str, Any]] = []
+        dct: Dict[str, Any] = dict(overrides) if overrides is not None else {}
         _exclude_fields = set(exclude_fields) if exclude_fields is not None else set()
-        _exclude_fields.add("_targets")
-        if overrides is not None:
-            _exclude_fields.update(overrides)
-            result.extend(overrides.items())
-        for f in dataclasses.fields(self):
-            if f.name in _exclude_fields:
+        for field_name in _get_field_names(type(self)):
+            if field_name in dct or field_name in _exclude_fields:
                 continue
-            field_value = getattr(self, f.name)
-            value = _asdict_inner(field_value, dict)
-            result.append((f.name, value))
-        dct = dict(result)
+            field_value = getattr(self, field_name)
+            if isinstance(field_value, _ATOMIC_TYPES):
+                dct[field_name] = field_value
+            else:
+                dct[field_name] = _asdict_inner(field_value, dict)
         dct["_id"] = self._id
         return dct
 
@@ -248,7 +534,7 @@ class Annotation:
     def fromdict(
         cls,
         dct: Dict[str, Any],
-        annotation_store: Optional[Dict[int, "Annotation"]] = None,
+        annotation_store: Optional[Mapping[int, "Annotation"]] = None,
     ):
         tmp_dct = dict(dct)
         reference_fields_with_container_type = _get_reference_fields_and_container_types(cls)
@@ -276,6 +562,37 @@ class Annotation:
         return cls(**tmp_dct)
 
 
+class _SpanIndex:
+    """
+    Index over (start, end) pairs that are sorted by their start positions. Together with the maximum span
+    length, this allows to answer span queries with binary search in O(log N + k) (k: number of candidates).
+    All query methods return positions into the indexed sequence in ascending order.
+    """
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray):
+        self.order = np.argsort(starts, kind="stable")
+        self.starts = starts[self.order]
+        self.ends = ends[self.order]
+        self.max_length = int((ends - starts).max()) if len(starts) > 0 else 0
+
+    def within(self, start: int, end: int) -> np.ndarray:
+        lo = np.searchsorted(self.starts, start, side="left")
+        hi = np.searchsorted(self.starts, end, side="right")
+        return np.sort(self.order[lo:hi][self.ends[lo:hi] <= end])
+
+    def overlapping(self, start: int, end: int) -> np.ndarray:
+        # a span overlaps if span.start < end and span.end > start, the latter requires
+        # span.start > start - max_length
+        lo = np.searchsorted(self.starts, start - self.max_length, side="right")
+        hi = np.searchsorted(self.starts, end, side="left")
+        return np.sort(self.order[lo:hi][self.ends[lo:hi] > start])
+
+    def containing(self, position: int) -> np.ndarray:
+        lo = np.searchsorted(self.starts, position - self.max_length, side="right")
+        hi = np.searchsorted(self.starts, position, side="right")
+        return np.sort(self.order[lo:hi][self.ends[lo:hi] > position])
+
+
 T = TypeVar("T", covariant=False, bound="Annotation")
 
 
@@ -284,12 +601,14 @@ class BaseAnnotationList(Sequence[T]):
         self._document = document
         self._targets = targets
         self._annotations: List[T] = []
+        self._span_index: Optional[_SpanIndex] = None
+        self._init_change_tracking()
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, BaseAnnotationList):
             return NotImplemented
 
-        return self._targets == other._targets and self._annotations == other._annotations
+        return self._targets == other._targets and self[:] == other[:]
 
     @overload
     def __getitem__(self, index: int) -> T:
@@ -308,11 +627,45 @@ class BaseAnnotationList(Sequence[T]):
     def append(self, annotation: T) -> None:
         targets = tuple(getattr(self._document, target_name) for target_name in self._targets)
         annotation.set_targets(targets)
+        self._document._allocate_annotation_id(annotation)
         self._annotations.append(annotation)
+        self._span_index = None
 
-    def extend(self, annotations: Iterable[T]) -> None:
+    def _attach(self, annotations: List[T], allocate_ids: bool = True) -> None:
+        # validate the whole batch before modifying anything
+        if any(annotation._targets is not None for annotation in annotations) or len(
+            {id(annotation) for annotation in annotations}
+        ) != len(annotations):
+            raise ValueError(
+                f"Annotation already has assigned targets. Clear the "
+                f"annotation list container or remove the annotation with pop() "
+                f"to assign it to a new annotation list with other targets."
+            )
+        # the targets are the same for all annotations, so we compute them only once
+        targets = tuple(getattr(self._document, target_name) for target_name in self._targets)
+        allocate_ids = allocate_ids and self._document.ALLOCATE_ANNOTATION_IDS
         for annotation in annotations:
-            self.append(annotation)
+            object.__setattr__(annotation, "_targets", targets)
+            if allocate_ids:
+                self._document._allocate_annotation_id(annotation)
+
+    def extend(self, annotations: Iterable[T]) -> None:
+        """
+        Adds all annotations at once. This is much faster than calling append() for each of them. If any of
+        the annotations is already attached to a document, none of them is added.
+        """
+        annotations = list(annotations)
+        self._attach(annotations)
+        self._annotations.extend(annotations)
+        self._span_index = None
+
+    @classmethod
+    def from_iterable(
+        cls, document: "Document", targets: List[str], annotations: Iterable[T], **kwargs
+    ):
+        annotation_list = cls(document=document, targets=targets, **kwargs)
+        annotation_list.extend(annotations)
+        return annotation_list
 
     def __repr__(self) -> str:
         return f"BaseAnnotationList({str(self._annotations)})"
@@ -321,12 +674,98 @@ class BaseAnnotationList(Sequence[T]):
         for annotation in self._annotations:
             annotation.set_targets(None)
         self._annotations = []
+        self._span_index = None
+        self._track_clear()
 
     def pop(self, index=None):
+        index = self._normalize_pop_index(index)
         ann = self._annotations.pop(index)
+        self._track_pop(index)
         ann.set_targets(None)
+        self._span_index = None
         return ann
 
+    def _normalize_pop_index(self, index: Optional[int]) -> int:
+        if index is None:
+            index = -1
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("pop index out of range")
+        return index
+
+    # Change tracking: New annotations are always appended, so the annotations that were already there at the
+    # last checkpoint (minus the removed ones) form a prefix of the list. It suffices to keep track of the length
+    # of that prefix, the positions of the removed entries (at the time they were removed) and if the list was
+    # cleared in between.
+
+    def _init_change_tracking(self) -> None:
+        self._num_unchanged = 0
+        self._removed_indices: List[int] = []
+        self._cleared = False
+
+    def _track_pop(self, index: int) -> None:
+        if index < self._num_unchanged:
+            self._removed_indices.append(index)
+            self._num_unchanged -= 1
+
+    def _track_clear(self) -> None:
+        self._num_unchanged = 0
+        self._removed_indices = []
+        self._cleared = True
+
+    def checkpoint(self) -> None:
+        """Marks the current state as unchanged, see Document.asdict_delta()."""
+        self._num_unchanged = len(self)
+        self._removed_indices = []
+        self._cleared = False
+
+    @property
+    def is_changed(self) -> bool:
+        """True, if any annotation was added or removed since the last checkpoint."""
+        return self._cleared or len(self._removed_indices) > 0 or self._num_unchanged < len(self)
+
+    @property
+    def num_unchanged(self) -> int:
+        """The number of annotations at the beginning of the list that were already there at the last checkpoint."""
+        return self._num_unchanged
+
+    def _get_starts_and_ends(self) -> Tuple[np.ndarray, np.ndarray]:
+        try:
+            starts = np.fromiter((ann.start for ann in self._annotations), dtype=np.int64)
+            ends = np.fromiter((ann.end for ann in self._annotations), dtype=np.int64)
+        except AttributeError:
+            raise TypeError(
+                f"span queries are only supported for annotations with start and end, but the annotation list "
+                f"contains: {sorted({type(ann).__name__ for ann in self._annotations})}"
+            )
+        return starts, ends
+
+    def _get_span_index(self) -> _SpanIndex:
+        # the index is created lazily and gets invalidated when the annotation list is modified
+        if self._span_index is None:
+            starts, ends = self._get_starts_and_ends()
+            self._span_index = _SpanIndex(starts=starts, ends=ends)
+        return self._span_index
+
+    def spans_within(self, start: int, end: int) -> List[T]:
+        """
+        Returns all span annotations that are contained in [start, end) in the order of this list.
+        """
+        return [self[int(idx)] for idx in self._get_span_index().within(start, end)]
+
+    def spans_overlapping(self, start: int, end: int) -> List[T]:
+        """
+        Returns all span annotations that overlap with [start, end) in the order of this list.
+        """
+        return [self[int(idx)] for idx in self._get_span_index().overlapping(start, end)]
+
+    def spans_containing(self, position: int) -> List[T]:
+        """
+        Returns all span annotations that contain the position in the order of this list.
+        """
+        return [self[int(idx)] for idx in self._get_span_index().containing(position)]
+
 
 class AnnotationList(BaseAnnotationList[T]):
     def __init__(self, document: "Document", targets: List["str"]):
@@ -347,15 +786,524 @@ class AnnotationList(BaseAnnotationList[T]):
         return f"AnnotationList({str(self._annotations)})"
 
 
+# NumPy dtypes used to store the values of the respective annotation fields in a ColumnarAnnotationList.
+# String values are stored as indices into a per-column vocabulary.
+_COLUMN_DTYPES = {int: np.int64, float: np.float64, str: np.int32}
+
+
+def _get_column_types(annotation_class: typing.Type[Annotation]) -> Dict[str, type]:
+    column_types = {}
+    for field in dataclasses.fields(annotation_class):
+        if field.name in _INTERNAL_FIELD_NAMES:
+            continue
+        if field.type not in _COLUMN_DTYPES:
+            raise TypeError(
+                f"The type '{field.type}' of the field '{field.name}' from Annotation subclass "
+                f"'{annotation_class.__name__}' can not be stored column-wise. Only fields of the types "
+                f"{[t.__name__ for t in _COLUMN_DTYPES]} are supported."
+            )
+        column_types[field.name] = field.type
+    return column_types
+
+
+class ColumnarBaseAnnotationList(BaseAnnotationList[T]):
+    """
+    A BaseAnnotationList that stores the field values of its annotations column-wise in NumPy arrays instead of
+    holding one Annotation object per entry. Annotation objects are only created on access (indexing or
+    iteration), so accessing the same entry twice returns two equal, but not identical, objects. Note that the
+    appended annotation objects themselves are not kept: they get their targets assigned on append() as usual,
+    but clear() and pop() can not reset them.
+
+    The raw columns can be accessed via column() (string fields are returned as ids into vocabulary()) and
+    used to select annotations with select(), e.g. `spans.select(spans.column("end") - spans.column("start") > 3)`.
+    """
+
+    def __init__(self, document: "Document", targets: List[str], annotation_type: typing.Type[T]):
+        self._document = document
+        self._targets = targets
+        self._annotation_type = annotation_type
+        self._column_types = _get_column_types(annotation_type)
+        self._columns: Dict[str, np.ndarray] = {
+            name: np.empty(0, dtype=_COLUMN_DTYPES[column_type])
+            for name, column_type in self._column_types.items()
+        }
+        self._vocabularies: Dict[str, List[str]] = {
+            name: [] for name, column_type in self._column_types.items() if column_type is str
+        }
+        self._vocabulary_indices: Dict[str, Dict[str, int]] = {
+            name: {} for name in self._vocabularies
+        }
+        self._size = 0
+        self._span_index = None
+        self._init_change_tracking()
+
+    @property
+    def annotation_type(self) -> typing.Type[T]:
+        return self._annotation_type
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Returns a read-only view on the values of the field `name` for all annotations. For string fields,
+        this contains the ids of the values in vocabulary(name).
+        """
+        view = self._columns[name][: self._size]
+        view.flags.writeable = False
+        return view
+
+    def vocabulary(self, name: str) -> List[str]:
+        return list(self._vocabularies[name])
+
+    def _build(self, index: int) -> T:
+        kwargs: Dict[str, Any] = {}
+        for name, column_type in self._column_types.items():
+            value = self._columns[name][index].item()
+            if column_type is str:
+                value = self._vocabularies[name][value]
+            kwargs[name] = value
+        annotation = self._annotation_type(**kwargs)
+        annotation.set_targets(
+            tuple(getattr(self._document, target_name) for target_name in self._targets)
+        )
+        return annotation
+
+    def select(self, indices: Union[np.ndarray, Sequence[int]]) -> List[T]:
+        """
+        Creates the annotations at the given indices. Also accepts a boolean mask of length len(self).
+        """
+        indices = np.asarray(indices)
+        if indices.dtype != np.bool_:
+            indices = indices.astype(np.int64)
+        positions = np.arange(self._size)[indices]
+        return [self._build(int(position)) for position in positions]
+
+    @overload
+    def __getitem__(self, index: int) -> T:
+        ...
+
+    @overload
+    def __getitem__(self, s: slice) -> List[T]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[T, List[T]]:
+        if isinstance(index, slice):
+            return [self._build(i) for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("annotation list index out of range")
+        return self._build(index)
+
+    def __iter__(self):
+        for i in range(self._size):
+            yield self._build(i)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _grow(self, min_capacity: int) -> None:
+        capacity = len(next(iter(self._columns.values()), []))
+        if capacity >= min_capacity:
+            return
+        new_capacity = max(8, 2 * capacity, min_capacity)
+        for name, column in self._columns.items():
+            new_column = np.empty(new_capacity, dtype=column.dtype)
+            new_column[: self._size] = column[: self._size]
+            self._columns[name] = new_column
+
+    def _encode_value(self, name: str, value: Any) -> Any:
+        if self._column_types[name] is not str:
+            return value
+        vocabulary_index = self._vocabulary_indices[name]
+        value_id = vocabulary_index.get(value)
+        if value_id is None:
+            value_id = len(self._vocabularies[name])
+            vocabulary_index[value] = value_id
+            self._vocabularies[name].append(value)
+        return value_id
+
+    def append(self, annotation: T) -> None:
+        if type(annotation) is not self._annotation_type:
+            raise TypeError(
+                f"can only append annotations of type {self._annotation_type.__name__} to this columnar "
+                f"annotation list, but got: {type(annotation).__name__}"
+            )
+        annotation.set_targets(
+            tuple(getattr(self._document, target_name) for target_name in self._targets)
+        )
+        self._grow(self._size + 1)
+        for name, column in self._columns.items():
+            column[self._size] = self._encode_value(name, getattr(annotation, name))
+        self._size += 1
+        self._span_index = None
+
+    def extend(self, annotations: Iterable[T]) -> None:
+        annotations = list(annotations)
+        for annotation in annotations:
+            if type(annotation) is not self._annotation_type:
+                raise TypeError(
+                    f"can only append annotations of type {self._annotation_type.__name__} to this columnar "
+                    f"annotation list, but got: {type(annotation).__name__}"
+                )
+        # the annotation objects are not kept, so allocated ids would get lost
+        self._attach(annotations, allocate_ids=False)
+        new_size = self._size + len(annotations)
+        self._grow(new_size)
+        for name, column in self._columns.items():
+            values = [getattr(annotation, name) for annotation in annotations]
+            if self._column_types[name] is str:
+                values = [self._encode_value(name, value) for value in values]
+            column[self._size : new_size] = values
+        self._size = new_size
+        self._span_index = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({str(self[:])})"
+
+    def clear(self):
+        self._size = 0
+        self._span_index = None
+        self._track_clear()
+
+    def pop(self, index=None):
+        index = self._normalize_pop_index(index)
+        ann = self[index]
+        ann.set_targets(None)
+        for column in self._columns.values():
+            column[index : self._size - 1] = column[index + 1 : self._size]
+        self._size -= 1
+        self._track_pop(index)
+        self._span_index = None
+        return ann
+
+    def _get_starts_and_ends(self) -> Tuple[np.ndarray, np.ndarray]:
+        if "start" not in self._columns or "end" not in self._columns:
+            raise TypeError(
+                f"span queries are only supported for annotations with start and end, but the annotation list "
+                f"contains: {[self._annotation_type.__name__]}"
+            )
+        return self._columns["start"][: self._size], self._columns["end"][: self._size]
+
+
+class ColumnarAnnotationList(ColumnarBaseAnnotationList[T], AnnotationList[T]):
+    """
+    An AnnotationList that stores its annotations and predictions column-wise, see ColumnarBaseAnnotationList.
+    Use annotation_field(..., columnar=True) to create it as part of a Document.
+    """
+
+    def __init__(self, document: "Document", targets: List[str], annotation_type: typing.Type[T]):
+        super().__init__(document=document, targets=targets, annotation_type=annotation_type)
+        self._predictions = ColumnarBaseAnnotationList(
+            document, targets=targets, annotation_type=annotation_type
+        )
+
+
 D = TypeVar("D", bound="Document")
 
 
+@dataclasses.dataclass(frozen=True)
+class _AnnotationFieldSchema:
+    name: str
+    annotation_type: typing.Type[Annotation]
+    # the target field names, ordered according to annotation_type.TARGET_NAMES (if available)
+    targets: Tuple[str, ...]
+    columnar: bool
+
+
+@dataclasses.dataclass(frozen=True)
+class _DocumentSchema:
+    # all fields except the internal ones (_annotation_graph and _annotation_fields)
+    fields: Tuple[dataclasses.Field, ...]
+    # names of the fields that are passed to the constructor in Document.fromdict()
+    init_field_names: Tuple[str, ...]
+    annotation_fields: Tuple[_AnnotationFieldSchema, ...]
+    annotation_graph: Dict[str, Tuple[str, ...]]
+    # annotation fields ordered so that each field comes after all fields it targets
+    dependency_ordered_annotation_fields: Tuple[_AnnotationFieldSchema, ...]
+
+
+def _get_annotation_field_schema(
+    field: dataclasses.Field, field_names: Set[str]
+) -> _AnnotationFieldSchema:
+    targets = field.metadata.get("targets")
+    for target in targets:
+        if target not in field_names:
+            raise TypeError(
+                f'annotation target "{target}" is not in field names of the document: {field_names}'
+            )
+
+    # check annotation target names and use them together with target names from the AnnotationList
+    # to reorder targets, if available
+    target_names = field.metadata.get("target_names")
+    annotation_type = typing.get_args(field.type)[0]
+    annotation_target_names = annotation_type.TARGET_NAMES
+    if annotation_target_names is not None:
+        if target_names is not None:
+            if set(target_names) != set(annotation_target_names):
+                raise TypeError(
+                    f"keys of targets {sorted(target_names)} do not match "
+                    f"{annotation_type.__name__}.TARGET_NAMES {sorted(annotation_target_names)}"
+                )
+            # reorder targets according to annotation_target_names
+            target_name_mapping = dict(zip(target_names, targets))
+            target_position_mapping = {
+                i: target_name_mapping[name] for i, name in enumerate(annotation_target_names)
+            }
+            targets = [target_position_mapping[i] for i in range(len(targets))]
+        else:
+            if len(annotation_target_names) != len(targets):
+                raise TypeError(
+                    f"number of targets {sorted(targets)} does not match number of entries in "
+                    f"{annotation_type.__name__}.TARGET_NAMES: {sorted(annotation_target_names)}"
+                )
+            # disallow multiple targets when target names are specified in the definition of the Annotation
+            if len(annotation_target_names) > 1:
+                raise TypeError(
+                    f"A target name mapping is required for AnnotationLists containing Annotations with "
+                    f'TARGET_NAMES, but AnnotationList "{field.name}" has no target_names. You should '
+                    f"pass the named_targets dict containing the following keys (see Annotation "
+                    f'"{annotation_type.__name__}") to annotation_field: {annotation_target_names}'
+                )
+
+    return _AnnotationFieldSchema(
+        name=field.name,
+        annotation_type=annotation_type,
+        targets=tuple(targets),
+        columnar=field.metadata.get("columnar", False),
+    )
+
+
+# The schema is computed once per Document subclass and used to create, serialize and deserialize its instances.
+@functools.lru_cache(maxsize=None)
+def _get_document_schema(document_class: typing.Type["Document"]) -> _DocumentSchema:
+    all_fields = dataclasses.fields(document_class)
+    field_names = {field.name for field in all_fields}
+    fields = tuple(
+        field
+        for field in all_fields
+        if field.name not in {"_annotation_graph", "_annotation_fields"}
+    )
+
+    annotation_fields = []
+    annotation_graph: Dict[str, List[str]] = {}
+    targeted = set()
+    for field in fields:
+        if typing.get_origin(field.type) is not AnnotationList:
+            continue
+        annotation_field_schema = _get_annotation_field_schema(field, field_names=field_names)
+        annotation_fields.append(annotation_field_schema)
+        # the graph uses the targets in the order of their definition
+        for target in field.metadata.get("targets"):
+            targeted.add(target)
+            annotation_graph.setdefault(field.name, []).append(target)
+
+    if "_artificial_root" in annotation_graph:
+        raise ValueError(
+            'Failed to add the "_artificial_root" node to the annotation graph because it already exists. Note '
+            "that AnnotationList entries with that name are not allowed."
+        )
+    annotation_graph["_artificial_root"] = [
+        field_schema.name
+        for field_schema in annotation_fields
+        if field_schema.name not in targeted
+    ]
+
+    dependency_ordered_field_names: List[str] = []
+    _enumerate_dependencies(
+        dependency_ordered_field_names,
+        dependency_graph=annotation_graph,
+        nodes=annotation_graph["_artificial_root"],
+    )
+    name_to_annotation_field = {
+        field_schema.name: field_schema for field_schema in annotation_fields
+    }
+
+    return _DocumentSchema(
+        fields=fields,
+        init_field_names=tuple(
+            field.name
+            for field in fields
+            if field.init and field.name not in name_to_annotation_field
+        ),
+        annotation_fields=tuple(annotation_fields),
+        annotation_graph={node: tuple(targets) for node, targets in annotation_graph.items()},
+        dependency_ordered_annotation_fields=tuple(
+            name_to_annotation_field[field_name]
+            for field_name in dependency_ordered_field_names
+            # terminal nodes do not have to be an annotation field (e.g. the text field)
+            if field_name in name_to_annotation_field
+        ),
+    )
+
+
+_BINARY_FORMAT_HEADER = b"PIE-DOC\x01"
+
+
+def _encode_annotation_columns(
+    annotations: Iterable[Annotation],
+    annotation_class: typing.Type[Annotation],
+    start_position: int,
+    positions: Dict[int, int],
+    positions_by_value: Optional[Dict[Annotation, int]],
+    reference_positions_by_value: List[Dict[Annotation, int]],
+) -> List[Any]:
+    """
+    Encodes the annotations as a pair (number of annotations, columns) where the columns map the annotation
+    field names to the lists of their values. References to other annotations are encoded as positions into the
+    sequence of all encoded annotations (see Document.to_bytes()).
+    """
+
+    def get_position(annotation: Annotation) -> int:
+        position = positions.get(id(annotation))
+        if position is not None:
+            return position
+        for positions_dict in reference_positions_by_value:
+            position = positions_dict.get(annotation)
+            if position is not None:
+                return position
+        raise ValueError(f"the referenced annotation {annotation} is not part of the document")
+
+    annotations = list(annotations)
+    reference_fields = _get_reference_fields_and_container_types(annotation_class)
+    columns: Dict[str, List[Any]] = {}
+    for field_name in _get_field_names(annotation_class):
+        values = [getattr(annotation, field_name) for annotation in annotations]
+        container_type = reference_fields.get(field_name, False)
+        if container_type is False:
+            if not set(map(type, values)).issubset(_ATOMIC_TYPES):
+                values = [_asdict_inner(value, dict) for value in values]
+        elif container_type == tuple:
+            values = [[get_position(anno) for anno in value] for value in values]
+        else:
+            values = [None if value is None else get_position(value) for value in values]
+        columns[field_name] = values
+
+    for position, annotation in enumerate(annotations, start=start_position):
+        if positions_by_value is not None:
+            # do not use the ids of annotations that are created on the fly, they may be reused
+            positions_by_value.setdefault(annotation, position)
+        else:
+            positions[id(annotation)] = position
+    return [len(annotations), columns]
+
+
+def _decode_annotation_columns(
+    encoded: List[Any],
+    annotation_class: typing.Type[Annotation],
+    decoded: List[Annotation],
+    interned_field_names: Iterable[str] = (),
+) -> List[Annotation]:
+    num_annotations, columns = encoded
+    for field_name in interned_field_names:
+        if field_name in columns:
+            columns[field_name] = [_intern_strings(value) for value in columns[field_name]]
+    for field_name, container_type in _get_reference_fields_and_container_types(
+        annotation_class
+    ).items():
+        if container_type == tuple:
+            columns[field_name] = [
+                tuple(decoded[position] for position in value) for value in columns[field_name]
+            ]
+        else:
+            columns[field_name] = [
+                None if value is None else decoded[value] for value in columns[field_name]
+            ]
+    # the values come from valid annotations, so we can skip __init__ and __post_init__ (see _copy_annotation)
+    for field_name in _INTERNAL_FIELD_NAMES:
+        columns[field_name] = [None] * num_annotations
+    field_names = tuple(columns)
+    annotations = []
+    for values in zip(*columns.values()):
+        annotation = object.__new__(annotation_class)
+        _set_annotation_state(annotation, dict(zip(field_names, values)))
+        annotations.append(annotation)
+    decoded.extend(annotations)
+    return annotations
+
+
+def _intern_strings(value: Any) -> Any:
+    """Interns the value if it is a string, or its entries if it is a list or tuple of strings."""
+    value_type = type(value)
+    if value_type is str:
+        return sys.intern(value)
+    if value_type is tuple or value_type is list:
+        return value_type(sys.intern(v) if type(v) is str else v for v in value)
+    return value
+
+
+@functools.lru_cache(maxsize=None)
+def _get_interned_field_names(
+    document_class: typing.Type["Document"], annotation_class: typing.Type[Annotation]
+) -> Tuple[str, ...]:
+    field_names = _get_field_names(annotation_class)
+    return tuple(name for name in document_class.INTERNED_ANNOTATION_FIELDS if name in field_names)
+
+
+def _annotation_field_fromdict(
+    document: "Document",
+    field_schema: _AnnotationFieldSchema,
+    value: Optional[Dict[str, List[Dict[str, Any]]]],
+    annotations: Dict[int, Annotation],
+    predictions: Dict[int, Annotation],
+) -> None:
+    """
+    Decodes the serialized annotations and predictions of a single annotation field and adds them to the document.
+    The annotations and predictions of the fields this one depends on have to be already decoded: they are looked
+    up by id in `annotations` and `predictions` which get the newly created ones added.
+    """
+    if value is None or not value:
+        return
+
+    # TODO: handle single annotations, e.g. a document-level label
+    annotation_class = field_schema.annotation_type
+    interned_field_names = _get_interned_field_names(type(document), annotation_class)
+    # build annotations
+    field_annotations = []
+    for annotation_data in value["annotations"]:
+        annotation_dict = dict(annotation_data)
+        annotation_id = annotation_dict.pop("_id")
+        for field_name in interned_field_names:
+            if field_name in annotation_dict:
+                annotation_dict[field_name] = _intern_strings(annotation_dict[field_name])
+        # annotations can only reference annotations
+        annotation = annotation_class.fromdict(annotation_dict, annotations)
+        annotations[annotation_id] = annotation
+        field_annotations.append(annotation)
+    # build predictions
+    # predictions can reference annotations and predictions, the latter take precedence
+    annotations_and_predictions = ChainMap(predictions, annotations)
+    field_predictions = []
+    for annotation_data in value["predictions"]:
+        annotation_dict = dict(annotation_data)
+        annotation_id = annotation_dict.pop("_id")
+        for field_name in interned_field_names:
+            if field_name in annotation_dict:
+                annotation_dict[field_name] = _intern_strings(annotation_dict[field_name])
+        annotation = annotation_class.fromdict(annotation_dict, annotations_and_predictions)
+        predictions[annotation_id] = annotation
+        field_predictions.append(annotation)
+
+    annotation_list = getattr(document, field_schema.name)
+    annotation_list.extend(field_annotations)
+    annotation_list.predictions.extend(field_predictions)
+    # the deserialized annotations are the starting point for change tracking
+    annotation_list.checkpoint()
+    annotation_list.predictions.checkpoint()
+
+
 @dataclasses.dataclass
 class Document(Mapping[str, Any]):
     _annotation_graph: Dict[str, List[str]] = dataclasses.field(
         default_factory=dict, init=False, repr=False
     )
     _annotation_fields: Set[str] = dataclasses.field(default_factory=set, init=False, repr=False)
+    # If enabled, annotations get a unique integer id when they are added to the document (this excludes
+    # columnar annotation lists). This id is used for serialization instead of the annotation hash, so
+    # equal annotations, e.g. in annotations and predictions, can be distinguished.
+    ALLOCATE_ANNOTATION_IDS: ClassVar[bool] = False
+    # The string values (or tuples of strings) of these annotation fields are interned when documents are
+    # deserialized, i.e. equal labels share a single string object across all documents. This saves memory and
+    # speeds up lookups, e.g. label_to_id[entity.label]. Set to an empty tuple to disable this.
+    INTERNED_ANNOTATION_FIELDS: ClassVar[Tuple[str, ...]] = ("label",)
 
     @classmethod
     def fields(cls):
@@ -381,75 +1329,32 @@ class Document(Mapping[str, Any]):
         return len(self._annotation_fields)
 
     def __post_init__(self):
-        targeted = set()
-        field_names = {field.name for field in dataclasses.fields(self)}
-        for field in dataclasses.fields(self):
-            if field.name == "_annotation_graph":
-                continue
-
-            field_origin = typing.get_origin(field.type)
-
-            if field_origin is AnnotationList:
-                self._annotation_fields.add(field.name)
-
-                targets = field.metadata.get("targets")
-                for target in targets:
-                    targeted.add(target)
-                    if field.name not in self._annotation_graph:
-                        self._annotation_graph[field.name] = []
-                    self._annotation_graph[field.name].append(target)
-                    if target not in field_names:
-                        raise TypeError(
-                            f'annotation target "{target}" is not in field names of the document: {field_names}'
-                        )
-
-                # check annotation target names and use them together with target names from the AnnotationList
-                # to reorder targets, if available
-                target_names = field.metadata.get("target_names")
-                annotation_type = typing.get_args(field.type)[0]
-                annotation_target_names = annotation_type.TARGET_NAMES
-                if annotation_target_names is not None:
-                    if target_names is not None:
-                        if set(target_names) != set(annotation_target_names):
-                            raise TypeError(
-                                f"keys of targets {sorted(target_names)} do not match "
-                                f"{annotation_type.__name__}.TARGET_NAMES {sorted(annotation_target_names)}"
-                            )
-                        # reorder targets according to annotation_target_names
-                        target_name_mapping = dict(zip(target_names, targets))
-                        target_position_mapping = {
-                            i: target_name_mapping[name]
-                            for i, name in enumerate(annotation_target_names)
-                        }
-                        targets = [target_position_mapping[i] for i in range(len(targets))]
-                    else:
-                        if len(annotation_target_names) != len(targets):
-                            raise TypeError(
-                                f"number of targets {sorted(targets)} does not match number of entries in "
-                                f"{annotation_type.__name__}.TARGET_NAMES: {sorted(annotation_target_names)}"
-                            )
-                        # disallow multiple targets when target names are specified in the definition of the Annotation
-                        if len(annotation_target_names) > 1:
-                            raise TypeError(
-                                f"A target name mapping is required for AnnotationLists containing Annotations with "
-                                f'TARGET_NAMES, but AnnotationList "{field.name}" has no target_names. You should '
-                                f"pass the named_targets dict containing the following keys (see Annotation "
-                                f'"{annotation_type.__name__}") to annotation_field: {annotation_target_names}'
-                            )
+        self._next_annotation_id = 0
+        schema = _get_document_schema(type(self))
+        for field_schema in schema.annotation_fields:
+            self._annotation_fields.add(field_schema.name)
+            if field_schema.columnar:
+                field_value = ColumnarAnnotationList(
+                    document=self,
+                    targets=list(field_schema.targets),
+                    annotation_type=field_schema.annotation_type,
+                )
+            else:
+                field_value = AnnotationList(document=self, targets=list(field_schema.targets))
+            setattr(self, field_schema.name, field_value)
+        self._annotation_graph.update(
+            (node, list(dependencies)) for node, dependencies in schema.annotation_graph.items()
+        )
 
-                field_value = field.type(document=self, targets=targets)
-                setattr(self, field.name, field_value)
-
-        if "_artificial_root" in self._annotation_graph:
-            raise ValueError(
-                'Failed to add the "_artificial_root" node to the annotation graph because it already exists. Note '
-                "that AnnotationList entries with that name are not allowed."
-            )
-        self._annotation_graph["_artificial_root"] = list(self._annotation_fields - targeted)
+    def _allocate_annotation_id(self, annotation: Annotation) -> None:
+        if self.ALLOCATE_ANNOTATION_IDS:
+            object.__setattr__(annotation, "_allocated_id", self._next_annotation_id)
+            self._next_annotation_id += 1
 
     def asdict(self):
         dct = {}
-        for field in self.fields():
+        schema = _get_document_schema(type(self))
+        for field in schema.fields:
             value = getattr(self, field.name)
 
             if isinstance(value, AnnotationList):
@@ -466,74 +1371,318 @@ class Document(Mapping[str, Any]):
 
     @classmethod
     def fromdict(cls, dct):
-        fields = dataclasses.fields(cls)
-        annotation_fields = _get_annotation_fields(fields)
+        schema = _get_document_schema(cls)
 
         cls_kwargs = {}
-        for field in fields:
-            if field not in annotation_fields:
-                value = dct.get(field.name)
+        for field_name in schema.init_field_names:
+            value = dct.get(field_name)
 
-                if value is not None:
-                    cls_kwargs[field.name] = value
+            if value is not None:
+                cls_kwargs[field_name] = value
 
         doc = cls(**cls_kwargs)
 
-        name_to_field = {f.name: f for f in annotation_fields}
-
-        dependency_ordered_fields: List[str] = []
-        _enumerate_dependencies(
-            dependency_ordered_fields,
-            dependency_graph=doc._annotation_graph,
-            nodes=doc._annotation_graph["_artificial_root"],
-        )
-
-        annotations = {}
-        predictions = {}
-        annotations_per_field = defaultdict(list)
-        predictions_per_field = defaultdict(list)
-        for field_name in dependency_ordered_fields:
-            # terminal nodes do not have to be an annotation field (e.g. the text field)
-            if field_name not in name_to_field:
-                continue
+        annotations: Dict[int, Annotation] = {}
+        predictions: Dict[int, Annotation] = {}
+        for field_schema in schema.dependency_ordered_annotation_fields:
+            _annotation_field_fromdict(
+                doc, field_schema, dct.get(field_schema.name), annotations, predictions
+            )
 
-            field = name_to_field[field_name]
+        return doc
 
-            value = dct.get(field.name)
+    def checkpoint(self) -> None:
+        """
+        Marks the current annotations and predictions as unchanged, see asdict_delta(). Deserialized and copied
+        documents start with a checkpoint.
+        """
+        for field_schema in _get_document_schema(type(self)).annotation_fields:
+            annotation_list = getattr(self, field_schema.name)
+            annotation_list.checkpoint()
+            annotation_list.predictions.checkpoint()
+
+    def asdict_delta(self) -> Dict[str, Any]:
+        """
+        Serializes the changes of the annotations and predictions since the last checkpoint, i.e. the added and
+        removed entries per annotation field (non-annotation fields like the text are not tracked). Use
+        apply_delta() to replay them on a copy of the document in the checkpoint state, e.g. one that was loaded
+        from the same serialized data. This is much cheaper than asdict() if only some predictions were added.
+
+        The result maps the names of the changed annotation fields to {"annotations": ..., "predictions": ...}
+        with entries {"cleared": bool, "removed": [index, ...], "added": [annotation dict, ...]} for the changed
+        ones. The removed indices are the positions at the time of removal. The added annotations are serialized
+        like in asdict(), except that references to unchanged annotations are encoded as
+        {"field": field name, "predictions": bool, "index": position}.
+        """
+        schema = _get_document_schema(type(self))
+        changed_lists = []
+        for field_schema in schema.annotation_fields:
+            annotation_list = getattr(self, field_schema.name)
+            for is_prediction, base_list in [
+                (False, annotation_list),
+                (True, annotation_list.predictions),
+            ]:
+                if base_list.is_changed:
+                    changed_lists.append((field_schema.name, is_prediction, base_list))
+        if len(changed_lists) == 0:
+            return {}
+
+        # locations of all unchanged annotations that may be referenced by added ones (created on demand)
+        unchanged_locations: Optional[Dict[Any, Dict[str, Any]]] = None
+
+        def get_unchanged_locations() -> Dict[Any, Dict[str, Any]]:
+            nonlocal unchanged_locations
+            # an empty result is cached as well
+            if unchanged_locations is None:
+                unchanged_locations = {}
+                for field_schema in schema.annotation_fields:
+                    annotation_list = getattr(self, field_schema.name)
+                    for is_prediction, base_list in [
+                        (False, annotation_list),
+                        (True, annotation_list.predictions),
+                    ]:
+                        for index, annotation in enumerate(base_list[: base_list.num_unchanged]):
+                            # columnar annotation lists create new objects on access, so we use the
+                            # annotation itself as key
+                            key = annotation if field_schema.columnar else id(annotation)
+                            unchanged_locations.setdefault(
+                                key,
+                                {
+                                    "field": field_schema.name,
+                                    "predictions": is_prediction,
+                                    "index": index,
+                                },
+                            )
+            return unchanged_locations
+
+        def encode_reference(annotation: Annotation) -> Union[int, Dict[str, Any]]:
+            locations = get_unchanged_locations()
+            location = locations.get(id(annotation))
+            if location is None:
+                location = locations.get(annotation)
+            return annotation._id if location is None else location
+
+        delta: Dict[str, Any] = {}
+        for field_name, is_prediction, base_list in changed_lists:
+            added = []
+            for annotation in base_list[base_list.num_unchanged :]:
+                overrides: Dict[str, Any] = {}
+                for reference_field, container_type in _get_reference_fields_and_container_types(
+                    type(annotation)
+                ).items():
+                    value = getattr(annotation, reference_field)
+                    if value is None:
+                        overrides[reference_field] = None
+                    elif container_type == tuple:
+                        overrides[reference_field] = [encode_reference(v) for v in value]
+                    else:
+                        overrides[reference_field] = encode_reference(value)
+                added.append(annotation._asdict(overrides=overrides))
+            field_delta = delta.setdefault(field_name, {})
+            field_delta["predictions" if is_prediction else "annotations"] = {
+                "cleared": base_list._cleared,
+                "removed": list(base_list._removed_indices),
+                "added": added,
+            }
+        return delta
 
-            if value is None or not value:
+    def _resolve_delta_references(
+        self, annotation_dict: Dict[str, Any], annotation_class: typing.Type[Annotation]
+    ) -> Dict[str, Any]:
+        # replaces the references to unchanged annotations (see asdict_delta) by the annotations themselves
+        def resolve(value: Any) -> Any:
+            if not isinstance(value, dict):
+                return value
+            annotation_list = getattr(self, value["field"])
+            if value["predictions"]:
+                annotation_list = annotation_list.predictions
+            return annotation_list[value["index"]]
+
+        result = dict(annotation_dict)
+        for reference_field in _get_reference_fields_and_container_types(annotation_class):
+            value = result.get(reference_field)
+            if isinstance(value, list):
+                result[reference_field] = [resolve(v) for v in value]
+            else:
+                result[reference_field] = resolve(value)
+        return result
+
+    def apply_delta(self, delta: Dict[str, Any]) -> None:
+        """
+        Applies the changes serialized with asdict_delta(). The document has to be in the state of the checkpoint
+        the delta is relative to.
+        """
+        schema = _get_document_schema(type(self))
+        added_annotations: Dict[int, Annotation] = {}
+        added_predictions: Dict[int, Annotation] = {}
+        for field_schema in schema.dependency_ordered_annotation_fields:
+            field_delta = delta.get(field_schema.name)
+            if field_delta is None:
                 continue
-
-            # TODO: handle single annotations, e.g. a document-level label
-            if typing.get_origin(field.type) is AnnotationList:
-                annotation_class = typing.get_args(field.type)[0]
-                # build annotations
-                for annotation_data in value["annotations"]:
-                    annotation_dict = dict(annotation_data)
-                    annotation_id = annotation_dict.pop("_id")
-                    # annotations can only reference annotations
-                    annotation = annotation_class.fromdict(annotation_dict, annotations)
-                    annotations[annotation_id] = annotation
-                    annotations_per_field[field.name].append(annotation)
-                # build predictions
-                for annotation_data in value["predictions"]:
-                    annotation_dict = dict(annotation_data)
-                    annotation_id = annotation_dict.pop("_id")
-                    # predictions can reference annotations and predictions
-                    annotation = annotation_class.fromdict(
-                        annotation_dict, {**annotations, **predictions}
+            annotation_class = field_schema.annotation_type
+            annotation_list = getattr(self, field_schema.name)
+            for key, base_list, added, store in [
+                # like in fromdict(), annotations can only reference annotations
+                ("annotations", annotation_list, added_annotations, added_annotations),
+                (
+                    "predictions",
+                    annotation_list.predictions,
+                    added_predictions,
+                    ChainMap(added_predictions, added_annotations),
+                ),
+            ]:
+                list_delta = field_delta.get(key)
+                if list_delta is None:
+                    continue
+                if list_delta["cleared"]:
+                    base_list.clear()
+                for index in list_delta["removed"]:
+                    base_list.pop(index)
+                new_annotations = []
+                for annotation_dict in list_delta["added"]:
+                    annotation_dict = self._resolve_delta_references(
+                        annotation_dict, annotation_class
                     )
-                    predictions[annotation_id] = annotation
-                    predictions_per_field[field.name].append(annotation)
-            else:
-                raise Exception("Error")
+                    annotation_id = annotation_dict.pop("_id")
+                    annotation = annotation_class.fromdict(annotation_dict, store)
+                    added[annotation_id] = annotation
+                    new_annotations.append(annotation)
+                base_list.extend(new_annotations)
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the document into a compact binary format (see from_bytes()). In contrast to asdict(), the
+        annotations are stored column-wise per annotation field and references between annotations are stored as
+        positions instead of annotation ids. All field values have to be JSON-like (see pytorch_ie.utils.binary).
+        """
+        schema = _get_document_schema(type(self))
+        fields = {field_name: getattr(self, field_name) for field_name in schema.init_field_names}
+
+        # positions of the already encoded annotations (by object id), in the order of encoding
+        positions: Dict[int, int] = {}
+        # columnar annotation lists create new annotation objects on access, so references to them need to be
+        # resolved by value (see _encode_annotation_columns)
+        positions_by_value: Dict[Annotation, int] = {}
+        prediction_positions_by_value: Dict[Annotation, int] = {}
+        num_encoded = 0
+        layers = []
+        for field_schema in schema.dependency_ordered_annotation_fields:
+            annotation_list = getattr(self, field_schema.name)
+            encoded_annotations = _encode_annotation_columns(
+                annotations=annotation_list,
+                annotation_class=field_schema.annotation_type,
+                start_position=num_encoded,
+                positions=positions,
+                positions_by_value=positions_by_value if field_schema.columnar else None,
+                reference_positions_by_value=[positions_by_value],
+            )
+            num_encoded += encoded_annotations[0]
+            encoded_predictions = _encode_annotation_columns(
+                annotations=annotation_list.predictions,
+                annotation_class=field_schema.annotation_type,
+                start_position=num_encoded,
+                positions=positions,
+                positions_by_value=(
+                    prediction_positions_by_value if field_schema.columnar else None
+                ),
+                # like in fromdict(), predictions can reference annotations and predictions
+                reference_positions_by_value=[prediction_positions_by_value, positions_by_value],
+            )
+            num_encoded += encoded_predictions[0]
+            layers.append([encoded_annotations, encoded_predictions])
 
-        for field_name, field_annotations in annotations_per_field.items():
-            getattr(doc, field_name).extend(field_annotations)
+        return _BINARY_FORMAT_HEADER + binary.dumps([fields, layers])
 
-        for field_name, field_annotations in predictions_per_field.items():
-            getattr(doc, field_name).predictions.extend(field_annotations)
+    @classmethod
+    def from_bytes(cls: typing.Type[D], data: bytes) -> D:
+        """Deserializes a document that was serialized with to_bytes()."""
+        if data[: len(_BINARY_FORMAT_HEADER)] != _BINARY_FORMAT_HEADER:
+            raise ValueError("the data was not created with Document.to_bytes()")
+        fields, layers = binary.loads(data[len(_BINARY_FORMAT_HEADER) :])
+        schema = _get_document_schema(cls)
+        if len(layers) != len(schema.dependency_ordered_annotation_fields):
+            raise ValueError(
+                f"the data contains {len(layers)} annotation fields, but {cls.__name__} has "
+                f"{len(schema.dependency_ordered_annotation_fields)}"
+            )
+        doc = cls(**{name: value for name, value in fields.items() if value is not None})
+
+        decoded: List[Annotation] = []
+        for field_schema, (annotation_columns, prediction_columns) in zip(
+            schema.dependency_ordered_annotation_fields, layers
+        ):
+            annotation_class = field_schema.annotation_type
+            interned_field_names = _get_interned_field_names(cls, annotation_class)
+            annotation_list = getattr(doc, field_schema.name)
+            annotation_list.extend(
+                _decode_annotation_columns(
+                    annotation_columns, annotation_class, decoded, interned_field_names
+                )
+            )
+            annotation_list.predictions.extend(
+                _decode_annotation_columns(
+                    prediction_columns, annotation_class, decoded, interned_field_names
+                )
+            )
+
+        doc.checkpoint()
+        return doc
 
+    def copy(self: D, with_annotations: bool = True, with_predictions: bool = True) -> D:
+        """
+        Creates a copy of the document that is much cheaper than copy.deepcopy(): Immutable field values (e.g. the
+        text) are shared, other values are deep-copied. The annotation lists are rebuilt with shallow copies of
+        the annotations whose references point to the copied annotations. Set `with_annotations` or
+        `with_predictions` to False to leave out the annotations or predictions, respectively. This raises a
+        ValueError if a copied annotation references one that is left out, e.g. a predicted relation between gold
+        entities with `with_annotations=False`.
+        """
+        schema = _get_document_schema(type(self))
+        cls_kwargs = {}
+        for field_name in schema.init_field_names:
+            value = getattr(self, field_name)
+            if not isinstance(value, _ATOMIC_TYPES):
+                value = copy.deepcopy(value)
+            cls_kwargs[field_name] = value
+        doc = type(self)(**cls_kwargs)
+
+        copies: Dict[int, Annotation] = {}
+        # the annotations that are left out (columnar annotation lists create new annotation objects on access,
+        # so references to them are resolved by value)
+        excluded_ids: Set[int] = set()
+        excluded_values: Set[Annotation] = set()
+        columnar_copied_values: Set[Annotation] = set()
+
+        def is_excluded(annotation: Annotation) -> bool:
+            if id(annotation) in excluded_ids:
+                return True
+            return annotation in excluded_values and annotation not in columnar_copied_values
+
+        for field_schema in schema.dependency_ordered_annotation_fields:
+            annotation_list = getattr(self, field_schema.name)
+            new_annotation_list = getattr(doc, field_schema.name)
+            annotations_and_containers = []
+            for annotations, new_annotations, copy_annotations in [
+                (annotation_list, new_annotation_list, with_annotations),
+                (annotation_list.predictions, new_annotation_list.predictions, with_predictions),
+            ]:
+                if copy_annotations:
+                    annotations_and_containers.append((annotations, new_annotations))
+                    if field_schema.columnar:
+                        columnar_copied_values.update(annotations)
+                elif field_schema.columnar:
+                    excluded_values.update(annotations)
+                else:
+                    excluded_ids.update(id(annotation) for annotation in annotations)
+            for annotations, new_annotations in annotations_and_containers:
+                annotation_copies = []
+                for annotation in annotations:
+                    annotation_copy = _copy_annotation(annotation, copies, excluded=is_excluded)
+                    copies[id(annotation)] = annotation_copy
+                    annotation_copies.append(annotation_copy)
+                new_annotations.extend(annotation_copies)
+
+        doc.checkpoint()
         return doc
 
     def as_type(
@@ -555,7 +1704,7 @@ class Document(Mapping[str, Any]):
 
 def resolve_annotation(
     id_or_annotation: Union[int, Annotation],
-    store: Optional[Dict[int, Annotation]],
+    store: Optional[Mapping[int, Annotation]],
 ) -> Annotation:
     if isinstance(id_or_annotation, Annotation):
         return id_or_annotation
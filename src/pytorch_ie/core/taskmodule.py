@@ -1,7 +1,18 @@
 import collections.abc
-import copy
+import dataclasses
+import hashlib
+import io
+import itertools
+import json
 import logging
+import math
+import os
+import pickle
+import queue
+import tempfile
+import threading
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor
 from typing import (
     Any,
     Dict,
@@ -17,14 +28,18 @@ from typing import (
     overload,
 )
 
+import pyarrow as pa
 import torch.utils.data.dataset as torch_dataset
 from lightning.pytorch.core.mixins import HyperparametersMixin
+from torch.utils.data import get_worker_info
 from tqdm import tqdm
 
+import datasets
 from pytorch_ie.core.document import Annotation, Document
 from pytorch_ie.core.hf_hub_mixin import PyTorchIETaskmoduleModelHubMixin
 from pytorch_ie.core.registrable import Registrable
 from pytorch_ie.data import Dataset, IterableDataset
+from pytorch_ie.utils import binary
 
 """
 workflow:
@@ -108,11 +123,25 @@ class TaskEncodingDataset(torch_dataset.Dataset[TaskEncodingType]):
 
 
 class IterableTaskEncodingDataset(torch_dataset.IterableDataset[TaskEncodingType]):
+    """
+    An IterableDataset over task encodings. When used with multiple DataLoader workers, each worker yields only
+    every num_workers-th task encoding, so that the data is not duplicated. Set shard_by_worker=False if the
+    encodings already take care of that (e.g. when created with TaskModule.encode(), the documents are sharded
+    before encoding them).
+    """
+
     def __iter__(self) -> Iterator[TaskEncodingType]:
-        yield from self._encodings
+        worker_info = get_worker_info()
+        if self.shard_by_worker and worker_info is not None and worker_info.num_workers > 1:
+            yield from itertools.islice(
+                self._encodings, worker_info.id, None, worker_info.num_workers
+            )
+        else:
+            yield from self._encodings
 
-    def __init__(self, encodings: Iterator[TaskEncodingType]):
+    def __init__(self, encodings: Iterable[TaskEncodingType], shard_by_worker: bool = True):
         self._encodings = encodings
+        self.shard_by_worker = shard_by_worker
 
 
 class TaskEncodingSequence(
@@ -143,6 +172,416 @@ class TaskEncodingSequence(
         return len(self.task_encodings)
 
 
+T = TypeVar("T")
+
+
+def _iterate_batches(items: Iterable[T], batch_size: Optional[int]) -> Iterator[List[T]]:
+    """Splits the items into lists of batch_size items (the last one may be smaller). Consumes items lazily."""
+    iterator = iter(items)
+    while True:
+        # batch_size=None takes all remaining items
+        batch = list(itertools.islice(iterator, batch_size))
+        if len(batch) == 0:
+            return
+        yield batch
+
+
+_END_OF_ITERATION = object()
+
+
+def _iterate_in_background(iterable: Iterable[T], max_prefetch: int) -> Iterator[T]:
+    """
+    Consumes the iterable in a background thread that stays at most max_prefetch items ahead of the caller.
+    Exceptions are re-raised in the caller. Closing the returned iterator stops the background thread.
+    """
+    items: "queue.Queue[Tuple[Any, Optional[BaseException]]]" = queue.Queue(maxsize=max_prefetch)
+    stop = threading.Event()
+
+    def put(item: Any, error: Optional[BaseException] = None) -> bool:
+        while not stop.is_set():
+            try:
+                items.put((item, error), timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce() -> None:
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+            put(_END_OF_ITERATION)
+        except BaseException as e:
+            put(_END_OF_ITERATION, e)
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is _END_OF_ITERATION:
+                return
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+class ArrowTaskEncodingSequence(collections.abc.Sequence[TaskEncodingType]):
+    """
+    A read-only sequence of task encodings whose inputs and targets are stored in a (memory-mapped) Arrow file,
+    see write_task_encodings(). The documents are stored as indices into the passed documents. The task encodings
+    are decoded on access and have no metadata.
+    """
+
+    def __init__(self, path: str, documents: Sequence[Document]):
+        self.path = path
+        self.documents = documents
+        with pa.memory_map(path) as source:
+            # this does not copy the data, the buffers of the table point into the memory map
+            self._table = pa.ipc.open_file(source).read_all()
+        self._document_indices = self._table.column("document_index")
+        self._inputs = self._table.column("inputs")
+        self._targets = self._table.column("targets")
+
+    def _get_task_encoding(self, index: int) -> TaskEncodingType:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f"index {index} is out of range")
+        targets = self._targets[index].as_py()
+        return TaskEncoding(
+            document=self.documents[self._document_indices[index].as_py()],
+            inputs=binary.loads(self._inputs[index].as_py()),
+            targets=binary.loads(targets) if targets is not None else None,
+        )
+
+    @overload
+    def __getitem__(self, index: int) -> TaskEncodingType:
+        ...
+
+    @overload
+    def __getitem__(self, s: slice) -> Sequence[TaskEncodingType]:
+        ...
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[TaskEncodingType, Sequence[TaskEncodingType]]:
+        if isinstance(index, slice):
+            return [self._get_task_encoding(idx) for idx in range(*index.indices(len(self)))]
+        return self._get_task_encoding(index)
+
+    def __len__(self) -> int:
+        return self._table.num_rows
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # the table is memory-mapped again when unpickled, e.g. in a DataLoader worker
+        return {"path": self.path, "documents": self.documents}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)  # type: ignore
+
+
+class MemmapTaskEncodingDataset(TaskEncodingDataset[TaskEncodingType]):
+    """
+    A TaskEncodingDataset whose inputs and targets are stored in a memory-mapped Arrow file (see
+    write_task_encodings() and ArrowTaskEncodingSequence): flat data buffers with an offsets index, so that
+    DataLoader workers share the pages of the file instead of holding (and touching) Python objects. The task
+    encodings are created on access and have no metadata, their documents are stored as indices into documents.
+    """
+
+    def __init__(self, path: str, documents: Sequence[Document]):
+        super().__init__(encodings=ArrowTaskEncodingSequence(path=path, documents=documents))
+        self.path = path
+        self.documents = documents
+
+    @classmethod
+    def from_task_encodings(
+        cls,
+        path: str,
+        task_encodings: Iterable[TaskEncoding],
+        documents: Sequence[Document],
+    ) -> "MemmapTaskEncodingDataset":
+        """Writes the inputs and targets of the task encodings to path and loads them from there."""
+        write_task_encodings(path=path, task_encodings=task_encodings, documents=documents)
+        return cls(path=path, documents=documents)
+
+
+def write_task_encodings(
+    path: str,
+    task_encodings: Iterable[TaskEncoding],
+    documents: Sequence[Document],
+    batch_size: int = 10000,
+) -> None:
+    """
+    Writes the inputs and targets of the task encodings to an Arrow file that can be loaded with
+    ArrowTaskEncodingSequence. The inputs and targets need to be JSON-like (see pytorch_ie.utils.binary), the
+    documents of the task encodings need to be contained in documents. The file is written atomically.
+    """
+    document_indices = {id(document): idx for idx, document in enumerate(documents)}
+    schema = pa.schema(
+        [
+            ("document_index", pa.int64()),
+            ("inputs", pa.large_binary()),
+            ("targets", pa.large_binary()),
+        ]
+    )
+
+    def create_record_batch(rows: List[Tuple[int, bytes, Optional[bytes]]]) -> pa.RecordBatch:
+        columns = list(zip(*rows)) if len(rows) > 0 else [[], [], []]
+        return pa.RecordBatch.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+            schema=schema,
+        )
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=directory, suffix=".tmp", delete=False) as f:
+        tmp_path = f.name
+    try:
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+            rows: List[Tuple[int, bytes, Optional[bytes]]] = []
+            for task_encoding in task_encodings:
+                inputs = task_encoding.inputs
+                if isinstance(inputs, collections.abc.Mapping):
+                    # e.g. a BatchEncoding
+                    inputs = dict(inputs)
+                rows.append(
+                    (
+                        document_indices[id(task_encoding.document)],
+                        binary.dumps(inputs),
+                        binary.dumps(task_encoding.targets) if task_encoding.has_targets else None,
+                    )
+                )
+                if len(rows) >= batch_size:
+                    writer.write_batch(create_record_batch(rows))
+                    rows = []
+            writer.write_batch(create_record_batch(rows))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _canonical_json_default(value: Any) -> Any:
+    # converts values that are not JSON serializable into a form that does not depend on the Python process
+    if isinstance(value, (set, frozenset)):
+        # the iteration order of sets depends on the (randomized) hashes of their items
+        return sorted(
+            json.dumps(item, sort_keys=True, default=_canonical_json_default) for item in value
+        )
+    if hasattr(value, "tolist"):
+        # e.g. NumPy arrays and scalars
+        return value.tolist()
+    if hasattr(value, "__dict__"):
+        # unlike repr(), this does not contain object addresses
+        return {"__type__": f"{type(value).__module__}.{type(value).__qualname__}", **vars(value)}
+    return repr(value)
+
+
+def _canonical_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, default=_canonical_json_default)
+
+
+def _fingerprint_taskmodule(taskmodule: "TaskModule") -> str:
+    # the config contains the hyperparameters and the prepared attributes
+    config = _canonical_json(taskmodule._config())
+    return hashlib.sha256(config.encode("utf-8")).hexdigest()
+
+
+def _document_as_canonical_json(document: Document) -> str:
+    """
+    Returns a JSON representation of the document that, in contrast to Document.asdict(), does not depend on the
+    Python process: references between annotations are stored as (field name, "annotations" or "predictions",
+    position) instead of annotation ids which are hashes if not allocated by the document.
+    """
+    annotation_field_names = sorted(field.name for field in document.annotation_fields())
+    layers: Dict[Tuple[str, str], List[Annotation]] = {}
+    positions: Dict[int, Tuple[str, str, int]] = {}
+    # columnar annotation lists create new annotation objects on access, so references to them are resolved by value
+    positions_by_value: Dict[Annotation, Tuple[str, str, int]] = {}
+    for field_name in annotation_field_names:
+        annotation_list = getattr(document, field_name)
+        for layer_name, annotations in [
+            ("annotations", annotation_list),
+            ("predictions", annotation_list.predictions),
+        ]:
+            layer = layers[(field_name, layer_name)] = list(annotations)
+            for idx, annotation in enumerate(layer):
+                position = (field_name, layer_name, idx)
+                positions[id(annotation)] = position
+                positions_by_value.setdefault(annotation, position)
+
+    def encode_value(value: Any) -> Any:
+        if isinstance(value, Annotation):
+            position = positions.get(id(value))
+            return position if position is not None else positions_by_value.get(value)
+        if isinstance(value, tuple):
+            return [encode_value(item) for item in value]
+        return value
+
+    data: Dict[str, Any] = {
+        field.name: getattr(document, field.name)
+        for field in document.fields()
+        if field.name not in annotation_field_names
+    }
+    for (field_name, layer_name), layer in layers.items():
+        data.setdefault(field_name, {})[layer_name] = [
+            {
+                field.name: encode_value(getattr(annotation, field.name))
+                for field in dataclasses.fields(annotation)
+                if not field.name.startswith("_")
+            }
+            for annotation in layer
+        ]
+    return _canonical_json(data)
+
+
+def _fingerprint_documents(documents: Iterable[Document]) -> str:
+    hasher = hashlib.sha256()
+    for document in documents:
+        try:
+            data = document.to_bytes()
+        except TypeError:
+            # some field value is not supported by the binary format
+            data = _document_as_canonical_json(document).encode("utf-8")
+        hasher.update(hashlib.sha256(data).digest())
+    return hasher.hexdigest()
+
+
+class TaskEncodingCache:
+    """
+    An on-disk cache for the task encodings of a taskmodule and a collection of documents. The cache key is a
+    fingerprint of the config of the taskmodule (its hyperparameters and prepared attributes) and the content of
+    all documents. Note that code changes of the taskmodule are not reflected in the fingerprint.
+
+    Only the inputs and targets of the task encodings are cached, so the loaded task encodings have no metadata.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def get_path(self, taskmodule: "TaskModule", documents: Sequence[Document]) -> str:
+        fingerprint = hashlib.sha256(
+            f"{_fingerprint_taskmodule(taskmodule)}:{_fingerprint_documents(documents)}".encode()
+        ).hexdigest()
+        return os.path.join(self.cache_dir, f"task_encodings-{fingerprint}.arrow")
+
+    def load(
+        self, taskmodule: "TaskModule", documents: Sequence[Document]
+    ) -> Optional[ArrowTaskEncodingSequence]:
+        path = self.get_path(taskmodule, documents)
+        if not os.path.exists(path):
+            return None
+        logger.info(f"load cached task encodings from {path}")
+        return ArrowTaskEncodingSequence(path=path, documents=documents)
+
+    def save(
+        self,
+        taskmodule: "TaskModule",
+        documents: Sequence[Document],
+        task_encodings: Iterable[TaskEncoding],
+    ) -> ArrowTaskEncodingSequence:
+        path = self.get_path(taskmodule, documents)
+        logger.info(f"cache task encodings in {path}")
+        write_task_encodings(path=path, task_encodings=task_encodings, documents=documents)
+        return ArrowTaskEncodingSequence(path=path, documents=documents)
+
+
+class _ShardedDocumentEncodings(Iterable[TaskEncoding]):
+    """
+    Encodes the documents with the taskmodule each time it is iterated (see TaskModule._encoding_iterator()). In a
+    DataLoader worker, only every num_workers-th document is encoded, unless the documents are an iterable dataset
+    that is sharded by the DataLoader workers itself.
+    """
+
+    def __init__(
+        self,
+        taskmodule: "TaskModule",
+        documents: Iterable[Document],
+        encoding_kwargs: Dict[str, Any],
+    ):
+        self.taskmodule = taskmodule
+        self.documents = documents
+        self.encoding_kwargs = encoding_kwargs
+
+    def __iter__(self) -> Iterator[TaskEncoding]:
+        documents = self.documents
+        worker_info = get_worker_info()
+        # (Hugging Face) iterable datasets already yield only the shards of the current worker
+        is_sharded = isinstance(
+            documents, (datasets.IterableDataset, torch_dataset.IterableDataset)
+        )
+        if worker_info is not None and worker_info.num_workers > 1 and not is_sharded:
+            documents = itertools.islice(documents, worker_info.id, None, worker_info.num_workers)
+        return self.taskmodule._encoding_iterator(documents=documents, **self.encoding_kwargs)
+
+
+class _DocumentReferencePickler(pickle.Pickler):
+    """
+    Pickles task encodings without the documents they were created from: the documents and their annotations are
+    stored as references (their position) that get resolved by _DocumentReferenceUnpickler.
+    """
+
+    def __init__(self, file, documents: Sequence[Document]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        # we keep the objects to make sure that their ids are not reused
+        self._references: Dict[int, Tuple[Any, Tuple]] = {}
+        for document_idx, document in enumerate(documents):
+            self._references[id(document)] = (document, (document_idx,))
+            for field in document.annotation_fields():
+                annotations = document[field.name]
+                layers = ((False, annotations), (True, annotations.predictions))
+                for is_prediction, layer in layers:
+                    for annotation_idx, annotation in enumerate(layer):
+                        self._references[id(annotation)] = (
+                            annotation,
+                            (document_idx, field.name, is_prediction, annotation_idx),
+                        )
+
+    def persistent_id(self, obj: Any) -> Optional[Tuple]:
+        reference = self._references.get(id(obj))
+        if reference is None or reference[0] is not obj:
+            return None
+        return reference[1]
+
+
+class _DocumentReferenceUnpickler(pickle.Unpickler):
+    def __init__(self, file, documents: Sequence[Document]):
+        super().__init__(file)
+        self._documents = documents
+
+    def persistent_load(self, pid: Tuple) -> Any:
+        document = self._documents[pid[0]]
+        if len(pid) == 1:
+            return document
+        _, field_name, is_prediction, annotation_idx = pid
+        annotations = document[field_name]
+        return (annotations.predictions if is_prediction else annotations)[annotation_idx]
+
+
+# the taskmodule of an encoding worker process, see TaskModule._batch_encode_parallel()
+_worker_taskmodule: Optional["TaskModule"] = None
+
+
+def _init_encoding_worker(taskmodule: "TaskModule") -> None:
+    global _worker_taskmodule
+    _worker_taskmodule = taskmodule
+
+
+def _encode_in_worker(documents: Sequence[Document], encode_target: bool) -> bytes:
+    assert _worker_taskmodule is not None, "the encoding worker was not initialized"
+    task_encodings, _ = _worker_taskmodule.batch_encode(
+        documents=documents, encode_target=encode_target
+    )
+    buffer = io.BytesIO()
+    _DocumentReferencePickler(buffer, documents).dump(list(task_encodings))
+    return buffer.getvalue()
+
+
 class TaskModule(
     ABC,
     PyTorchIETaskmoduleModelHubMixin,
@@ -158,6 +597,9 @@ class TaskModule(
     ],
 ):
     PREPARED_ATTRIBUTES: List[str] = []
+    # per-document encoding methods that an encode_inputs_batched() implementation does not call, see
+    # _use_batched_encoding()
+    PER_DOCUMENT_ENCODING_METHODS: List[str] = ["encode_input"]
 
     def __init__(self, encode_document_batch_size: Optional[int] = None, **kwargs):
         super().__init__(**kwargs)
@@ -234,15 +676,67 @@ class TaskModule(
         taskmodule._post_prepare()
         return taskmodule
 
+    def _create_encoding_executor(self, num_workers: int) -> Executor:
+        return ProcessPoolExecutor(
+            max_workers=num_workers, initializer=_init_encoding_worker, initargs=(self,)
+        )
+
+    def _batch_encode_parallel(
+        self,
+        documents: Sequence[DocumentType],
+        encode_target: bool,
+        executor: Executor,
+        num_workers: int,
+        show_progress: bool = False,
+    ) -> Tuple[
+        Sequence[TaskEncoding[DocumentType, InputEncoding, TargetEncoding]],
+        Sequence[DocumentType],
+    ]:
+        """
+        Encodes contiguous chunks of the documents in the worker processes of the executor. The task encodings keep
+        the order of the sequential encoding and refer to the passed documents (and their annotations), not to
+        copies of them. Note that changes to the state of the taskmodule made during encoding are not transferred
+        back from the workers.
+        """
+        documents = list(documents)
+        # multiple chunks per worker to balance the load
+        chunk_size = max(math.ceil(len(documents) / (num_workers * 4)), 1)
+        chunks = [documents[i : i + chunk_size] for i in range(0, len(documents), chunk_size)]
+        results = executor.map(_encode_in_worker, chunks, [encode_target] * len(chunks))
+        task_encodings: List[TaskEncoding[DocumentType, InputEncoding, TargetEncoding]] = []
+        for chunk, result in tqdm(
+            zip(chunks, results),
+            total=len(chunks),
+            disable=not show_progress,
+            desc="encode document chunks",
+        ):
+            task_encodings.extend(_DocumentReferenceUnpickler(io.BytesIO(result), chunk).load())
+        return task_encodings, documents
+
     def batch_encode(
         self,
         documents: Union[Sequence[DocumentType], Dataset],
         encode_target: bool,
         show_progress: bool = False,
+        num_workers: int = 0,
     ) -> Tuple[
         Sequence[TaskEncoding[DocumentType, InputEncoding, TargetEncoding]],
         Sequence[DocumentType],
     ]:
+        """
+        Encodes the documents and returns the task encodings together with the documents in the order they were
+        encoded. If num_workers > 0, the documents are encoded in that many worker processes.
+        """
+        if num_workers > 0:
+            with self._create_encoding_executor(num_workers) as executor:
+                return self._batch_encode_parallel(
+                    documents=documents,
+                    encode_target=encode_target,
+                    executor=executor,
+                    num_workers=num_workers,
+                    show_progress=show_progress,
+                )
+
         ## TODO: revisit the assumption that encode_target=True always implies that
         ## is_training=True
         task_encodings, documents_in_order = self.encode_inputs(
@@ -253,45 +747,116 @@ class TaskModule(
             task_encodings = self.encode_targets(task_encodings, show_progress=show_progress)
         return task_encodings, documents_in_order
 
+    def _batch_encode_with_executor(
+        self,
+        documents: Sequence[DocumentType],
+        encode_target: bool,
+        executor: Optional[Executor],
+        num_workers: int,
+        show_progress: bool = False,
+    ) -> Tuple[
+        Sequence[TaskEncoding[DocumentType, InputEncoding, TargetEncoding]],
+        Sequence[DocumentType],
+    ]:
+        if executor is None:
+            return self.batch_encode(
+                documents=documents, encode_target=encode_target, show_progress=show_progress
+            )
+        return self._batch_encode_parallel(
+            documents=documents,
+            encode_target=encode_target,
+            executor=executor,
+            num_workers=num_workers,
+            show_progress=show_progress,
+        )
+
     def _encoding_iterator(
         self,
         documents: Iterable[DocumentType],
         encode_target: bool,
         batch_size: Optional[int] = None,
         show_progress: bool = False,
+        num_workers: int = 0,
+        prefetch: int = 0,
     ) -> Iterator[TaskEncoding[DocumentType, InputEncoding, TargetEncoding]]:
-        document_batch = []
         if show_progress and batch_size is not None:
             logger.warning(
                 "do not show document encoding progress because we encode lazily with an iterator"
             )
-        for i, doc in enumerate(documents):
-            document_batch.append(doc)
-
-            if batch_size is not None and len(document_batch) >= batch_size:
-                yield from self.batch_encode(
-                    documents=document_batch[:batch_size],
-                    encode_target=encode_target,
-                    show_progress=False,
-                )[0]
-                document_batch = document_batch[batch_size:]
-
-        if len(document_batch) > 0:
-            yield from self.batch_encode(
+        executor = self._create_encoding_executor(num_workers) if num_workers > 0 else None
+        encoded_batches: Iterator[
+            Sequence[TaskEncoding[DocumentType, InputEncoding, TargetEncoding]]
+        ] = (
+            self._batch_encode_with_executor(
                 documents=document_batch,
                 encode_target=encode_target,
+                executor=executor,
+                num_workers=num_workers,
                 show_progress=show_progress and batch_size is None,
             )[0]
+            for document_batch in _iterate_batches(documents, batch_size)
+        )
+        if prefetch > 0:
+            # encode the next batches while the current one is consumed
+            encoded_batches = _iterate_in_background(encoded_batches, max_prefetch=prefetch)
+        try:
+            for task_encodings in encoded_batches:
+                yield from task_encodings
+        finally:
+            # stop the background encoding before the executor is shut down
+            encoded_batches.close()  # type: ignore
+            if executor is not None:
+                executor.shutdown()
+
+    def _encode_document_list(
+        self,
+        documents: List[DocumentType],
+        encode_target: bool,
+        document_batch_size: Optional[int],
+        show_progress: bool,
+        num_workers: int,
+    ) -> Tuple[
+        List[TaskEncoding[DocumentType, InputEncoding, TargetEncoding]],
+        List[DocumentType],
+    ]:
+        encodings: List[TaskEncoding[DocumentType, InputEncoding, TargetEncoding]] = []
+        documents_in_order: List[DocumentType] = []
+        bs = document_batch_size or len(documents)
+        executor = self._create_encoding_executor(num_workers) if num_workers > 0 else None
+        try:
+            for i in tqdm(
+                range(0, len(documents), bs),
+                disable=not (show_progress and document_batch_size is not None),
+                desc="encode documents",
+            ):
+                cur_task_encodings, cur_documents_in_order = self._batch_encode_with_executor(
+                    documents=documents[i : i + bs],
+                    encode_target=encode_target,
+                    executor=executor,
+                    num_workers=num_workers,
+                    show_progress=show_progress and document_batch_size is None,
+                )
+                encodings.extend(cur_task_encodings)
+                documents_in_order.extend(cur_documents_in_order)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return encodings, documents_in_order
 
     def encode(
         self,
-        documents: Union[DocumentType, Sequence[DocumentType], Dataset, IterableDataset],
+        documents: Union[
+            DocumentType, Sequence[DocumentType], Iterator[DocumentType], Dataset, IterableDataset
+        ],
         encode_target: bool = False,
         document_batch_size: Optional[int] = None,
         as_task_encoding_sequence: Optional[bool] = None,
         as_iterator: Optional[bool] = None,
         as_dataset: bool = False,
         show_progress: bool = False,
+        num_workers: int = 0,
+        cache_dir: Optional[str] = None,
+        prefetch: int = 0,
     ) -> Union[
         Sequence[TaskEncoding[DocumentType, InputEncoding, TargetEncoding]],
         TaskEncodingSequence[
@@ -301,11 +866,29 @@ class TaskModule(
         TaskEncodingDataset[TaskEncoding[DocumentType, InputEncoding, TargetEncoding]],
         IterableTaskEncodingDataset[TaskEncoding[DocumentType, InputEncoding, TargetEncoding]],
     ]:
+        """
+        Encodes the documents, see the respective parameters for the type of the result. If num_workers > 0, the
+        documents are encoded in that many worker processes.
+
+        If a cache_dir is given, the inputs and targets of the task encodings are stored in and, in subsequent calls
+        with the same documents and taskmodule config, loaded from a memory-mapped file in that directory (see
+        TaskEncodingCache). Since the cached task encodings have no metadata, this requires encode_target=True.
+
+        When encoding with an iterator, the documents are encoded lazily in batches of document_batch_size and, if
+        prefetch > 0, up to that many batches are encoded in the background while the previous ones are consumed.
+        An IterableTaskEncodingDataset (as_dataset=True) can be iterated multiple times (if the documents can) and
+        encodes only the share of the documents of the current DataLoader worker.
+        """
         # backwards compatibility
         if as_task_encoding_sequence is None:
             as_task_encoding_sequence = not encode_target
 
-        if not isinstance(documents, (Sequence, Dataset, IterableDataset)):
+        if cache_dir is not None and not encode_target:
+            raise ValueError(
+                "caching task encodings requires encode_target=True because metadata is not cached"
+            )
+
+        if not isinstance(documents, (Sequence, Dataset, IterableDataset, Iterator)):
             documents = [documents]
 
         if as_iterator is None:
@@ -317,33 +900,43 @@ class TaskModule(
         if as_iterator:
             if as_task_encoding_sequence:
                 raise ValueError(f"can not return a TaskEncodingSequence as Iterator")
-            encodings_iterator = self._encoding_iterator(
-                documents=documents,
+            if cache_dir is not None:
+                raise ValueError(f"can not cache task encodings when encoding with an iterator")
+            encoding_kwargs = dict(
                 encode_target=encode_target,
                 batch_size=document_batch_size,
                 show_progress=show_progress,
+                num_workers=num_workers,
+                prefetch=prefetch,
             )
             if as_dataset:
-                return IterableTaskEncodingDataset(encodings=encodings_iterator)
+                return IterableTaskEncodingDataset(
+                    encodings=_ShardedDocumentEncodings(
+                        taskmodule=self, documents=documents, encoding_kwargs=encoding_kwargs
+                    ),
+                    shard_by_worker=False,
+                )
             else:
-                return encodings_iterator
+                return self._encoding_iterator(documents=documents, **encoding_kwargs)
         else:
-            encodings: List[TaskEncoding[DocumentType, InputEncoding, TargetEncoding]] = []
-            documents_in_order: List[DocumentType] = []
             docs_as_list = list(documents)
-            bs = document_batch_size or len(docs_as_list)
-            for i in tqdm(
-                range(0, len(docs_as_list), bs),
-                disable=not (show_progress and document_batch_size is not None),
-                desc="encode documents",
-            ):
-                cur_task_encodings, cur_documents_in_order = self.batch_encode(
-                    documents=docs_as_list[i : i + bs],
+            cache = TaskEncodingCache(cache_dir) if cache_dir is not None else None
+            encodings: Optional[
+                Sequence[TaskEncoding[DocumentType, InputEncoding, TargetEncoding]]
+            ] = None
+            documents_in_order: Sequence[DocumentType] = docs_as_list
+            if cache is not None:
+                encodings = cache.load(self, docs_as_list)
+            if encodings is None:
+                encodings, documents_in_order = self._encode_document_list(
+                    documents=docs_as_list,
                     encode_target=encode_target,
-                    show_progress=show_progress and document_batch_size is None,
+                    document_batch_size=document_batch_size,
+                    show_progress=show_progress,
+                    num_workers=num_workers,
                 )
-                encodings.extend(cur_task_encodings)
-                documents_in_order.extend(cur_documents_in_order)
+                if cache is not None:
+                    encodings = cache.save(self, docs_as_list, encodings)
 
             if as_task_encoding_sequence:
                 if as_dataset:
@@ -357,6 +950,11 @@ class TaskModule(
                 # we don't need the ordering of input documents and also don't re-assign
                 # task encodings to input documents
                 if as_dataset:
+                    if isinstance(encodings, ArrowTaskEncodingSequence):
+                        # the cached task encodings
+                        return MemmapTaskEncodingDataset(
+                            path=encodings.path, documents=encodings.documents
+                        )
                     return TaskEncodingDataset(encodings=encodings)
                 else:
                     return encodings
@@ -370,14 +968,21 @@ class TaskModule(
         Sequence[TaskEncoding[DocumentType, InputEncoding, TargetEncoding]],
         Sequence[DocumentType],
     ]:
-        documents_in_order: List[DocumentType] = []
+        # a document might be generated on the fly (e.g. with a Dataset), so we collect them here
+        documents_in_order: List[DocumentType] = list(documents)
         task_encodings: List[TaskEncoding[DocumentType, InputEncoding, TargetEncoding]] = []
-        for document in tqdm(documents, disable=not show_progress, desc="encode inputs"):
-            # a document might be generated on the fly (e.g. with a Dataset), so we add it here
-            documents_in_order.append(document)
-
-            possible_task_encodings = self.encode_input(document, is_training)
-
+        if self._use_batched_encoding():
+            encoded_documents = self.encode_inputs_batched(documents_in_order, is_training)
+        else:
+            encoded_documents = (
+                self.encode_input(document, is_training) for document in documents_in_order
+            )
+        for possible_task_encodings in tqdm(
+            encoded_documents,
+            total=len(documents_in_order),
+            disable=not show_progress,
+            desc="encode inputs",
+        ):
             # encode_input returns None or an empty list
             if possible_task_encodings is None or not possible_task_encodings:
                 continue
@@ -390,6 +995,41 @@ class TaskModule(
 
         return task_encodings, documents_in_order
 
+    def _use_batched_encoding(self) -> bool:
+        """
+        Returns False if a subclass overrides any of the PER_DOCUMENT_ENCODING_METHODS of the class that implements
+        encode_inputs_batched(), because the batched implementation would bypass that override. In this case, the
+        documents are encoded one by one with encode_input().
+        """
+        mro = type(self).__mro__
+
+        def get_defining_class(name: str) -> type:
+            return next(klass for klass in mro if name in klass.__dict__)
+
+        batched_class = get_defining_class("encode_inputs_batched")
+        return not any(
+            mro.index(get_defining_class(name)) < mro.index(batched_class)
+            for name in self.PER_DOCUMENT_ENCODING_METHODS
+        )
+
+    def encode_inputs_batched(
+        self,
+        documents: Sequence[DocumentType],
+        is_training: bool = False,
+    ) -> Iterable[
+        Optional[
+            Union[
+                TaskEncoding[DocumentType, InputEncoding, TargetEncoding],
+                Sequence[TaskEncoding[DocumentType, InputEncoding, TargetEncoding]],
+            ]
+        ]
+    ]:
+        """
+        Encodes the inputs of a batch of documents and returns, for each document, the result of encode_input().
+        Overwrite this to process the whole batch at once, e.g. to tokenize all texts with a single tokenizer call.
+        """
+        return (self.encode_input(document, is_training) for document in documents)
+
     @abstractmethod
     def encode_input(
         self,
@@ -465,7 +1105,7 @@ class TaskModule(
         if isinstance(task_encodings, TaskEncodingSequence):
             for document in task_encodings.documents_in_order:
                 document_id = id(document)
-                documents[document_id] = document if inplace else copy.deepcopy(document)
+                documents[document_id] = document if inplace else document.copy()
         # Otherwise we assume that documents are ordered according to the sequence of
         # unique documents defined by the sequence of task encodings
         else:
@@ -473,7 +1113,7 @@ class TaskModule(
                 document = task_encoding.document
                 document_id = id(document)
                 if document_id not in documents:
-                    documents[document_id] = document if inplace else copy.deepcopy(document)
+                    documents[document_id] = document if inplace else document.copy()
 
         if not inplace:
             task_encodings = [
@@ -5,6 +5,7 @@ from datasets import Split
 from .builder import GeneratorBasedBuilder
 from .dataset import Dataset, IterableDataset
 from .dataset_formatter import DocumentFormatter
+from .document_view import ArrowDocumentView
 
 DatasetDict = Dict[Union[str, Split], Dataset]
 
@@ -14,4 +15,5 @@ __all__ = [
     "IterableDataset",
     "DatasetDict",
     "DocumentFormatter",
+    "ArrowDocumentView",
 ]
@@ -149,6 +149,14 @@ class Dataset(datasets.Dataset):
         self.document_type = document_type
         self.set_format("document", document_type=document_type)
 
+    def set_lazy_documents(self, lazy: bool = True) -> None:
+        """
+        If enabled, indexing and iterating the dataset yields ArrowDocumentViews instead of documents. These decode
+        the underlying Arrow data only when the respective fields are accessed, which is much cheaper if only some
+        annotation layers are used. Note that this is reset for datasets derived from this one, e.g. via map().
+        """
+        self.set_format("document", document_type=self.document_type, lazy=lazy)
+
     @classmethod
     def get_base_kwargs(cls, dataset: datasets.Dataset):
         return dict(
@@ -1,23 +1,30 @@
-from typing import List
+from typing import List, Union
 
 import pyarrow as pa
 from datasets.formatting.formatting import Formatter
 
 from pytorch_ie.core.document import Document
+from pytorch_ie.data.document_view import ArrowDocumentView, arrow_table_to_document_views
 
 
 class DocumentFormatter(Formatter[Document, list, List[Document]]):
-    def __init__(self, document_type, features=None, **kwargs):
+    def __init__(self, document_type, features=None, lazy: bool = False, **kwargs):
         super().__init__(features=None)
         self.document_type = document_type
+        # if enabled, return ArrowDocumentViews that decode the documents on demand
+        self.lazy = lazy
 
-    def format_row(self, pa_table: pa.Table) -> Document:
+    def format_row(self, pa_table: pa.Table) -> Union[Document, ArrowDocumentView]:
+        if self.lazy:
+            return ArrowDocumentView(self.document_type, pa_table)
         row = self.python_arrow_extractor().extract_row(pa_table)
         return self.document_type.fromdict(row)
 
     def format_column(self, pa_table: pa.Table) -> list:
         return []
 
-    def format_batch(self, pa_table: pa.Table) -> List[Document]:
+    def format_batch(self, pa_table: pa.Table) -> List[Union[Document, ArrowDocumentView]]:
+        if self.lazy:
+            return arrow_table_to_document_views(self.document_type, pa_table)
         batch = self.simple_arrow_extractor().extract_batch(pa_table).to_pylist()
         return [self.document_type.fromdict(b) for b in batch]
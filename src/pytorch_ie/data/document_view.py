@@ -0,0 +1,151 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Generic, Iterator, List, Optional, Set, Type, TypeVar
+
+import pyarrow as pa
+
+from pytorch_ie.core.document import (
+    Annotation,
+    BaseAnnotationList,
+    Document,
+    _annotation_field_fromdict,
+    _get_document_schema,
+)
+
+D = TypeVar("D", bound=Document)
+
+
+class ArrowDocumentView(Mapping, Generic[D]):
+    """
+    A lazy, read-mostly view on a single row of an Arrow table that holds serialized documents of type
+    `document_type`. In contrast to `document_type.fromdict()`, nothing is decoded upfront: the columns of
+    non-annotation fields (e.g. the text) are converted on first access and annotation fields are decoded together
+    with the annotation fields they depend on the first time they are accessed.
+
+    All other attributes (e.g. `asdict()` or `copy()`) are taken from the fully decoded document, see
+    `to_document()`. Annotation fields and mutable field values returned by the view are the ones of that document,
+    so modifying them is reflected in `to_document()`.
+    """
+
+    def __init__(self, document_type: Type[D], pa_table: pa.Table):
+        if pa_table.num_rows != 1:
+            raise ValueError(
+                f"an ArrowDocumentView requires a table with exactly one row, but it has {pa_table.num_rows}"
+            )
+        self._document_type = document_type
+        self._pa_table = pa_table
+        self._schema = _get_document_schema(document_type)
+        self._annotation_fields = {
+            field_schema.name: field_schema for field_schema in self._schema.annotation_fields
+        }
+        self._values: Dict[str, Any] = {}
+        self._document: Optional[D] = None
+        self._annotations: Dict[int, Annotation] = {}
+        self._predictions: Dict[int, Annotation] = {}
+        self._decoded_annotation_fields: Set[str] = set()
+
+    @property
+    def document_type(self) -> Type[D]:
+        return self._document_type
+
+    def _get_column_value(self, name: str) -> Any:
+        if name not in self._values:
+            if name in self._pa_table.column_names:
+                self._values[name] = self._pa_table.column(name)[0].as_py()
+            else:
+                self._values[name] = None
+        return self._values[name]
+
+    def _get_document(self) -> D:
+        """Returns the document with all non-annotation fields set, but only the already decoded annotations."""
+        if self._document is None:
+            cls_kwargs = {}
+            for field_name in self._schema.init_field_names:
+                value = self._get_column_value(field_name)
+                if value is not None:
+                    cls_kwargs[field_name] = value
+            self._document = self._document_type(**cls_kwargs)
+        return self._document
+
+    def _get_required_annotation_fields(self, name: str) -> Set[str]:
+        required = set()
+        stack = [name]
+        while len(stack) > 0:
+            field_name = stack.pop()
+            if field_name in required:
+                continue
+            required.add(field_name)
+            stack.extend(
+                target
+                for target in self._schema.annotation_graph.get(field_name, ())
+                if target in self._annotation_fields
+            )
+        return required
+
+    def _get_annotation_list(self, name: str) -> BaseAnnotationList:
+        document = self._get_document()
+        if name not in self._decoded_annotation_fields:
+            required = self._get_required_annotation_fields(name)
+            for field_schema in self._schema.dependency_ordered_annotation_fields:
+                if (
+                    field_schema.name in required
+                    and field_schema.name not in self._decoded_annotation_fields
+                ):
+                    _annotation_field_fromdict(
+                        document,
+                        field_schema,
+                        self._get_column_value(field_schema.name),
+                        self._annotations,
+                        self._predictions,
+                    )
+                    self._decoded_annotation_fields.add(field_schema.name)
+        return getattr(document, name)
+
+    def to_document(self) -> D:
+        """Decodes all remaining annotation fields and returns the resulting document."""
+        for field_name in self._annotation_fields:
+            self._get_annotation_list(field_name)
+        return self._get_document()
+
+    def __getattr__(self, name: str) -> Any:
+        # only called if the attribute is not found the usual way, so this does not shadow the attributes of the
+        # view itself (private names are not forwarded to avoid recursion before __init__ was called, e.g. when
+        # unpickling)
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name in self._annotation_fields:
+            return self._get_annotation_list(name)
+        if name in self._schema.init_field_names:
+            value = self._get_column_value(name) if self._document is None else None
+            if value is None:
+                # like fromdict(), the document falls back to the default value of the field
+                return getattr(self._get_document(), name)
+            return value
+        return getattr(self.to_document(), name)
+
+    def __getitem__(self, key: str) -> BaseAnnotationList:
+        if key not in self._annotation_fields:
+            raise KeyError(key)
+        return self._get_annotation_list(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._annotation_fields)
+
+    def __len__(self) -> int:
+        return len(self._annotation_fields)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ArrowDocumentView):
+            other = other.to_document()
+        return self.to_document() == other
+
+    def __repr__(self) -> str:
+        return f"ArrowDocumentView(document_type={self._document_type.__name__})"
+
+
+def arrow_table_to_document_views(
+    document_type: Type[D], pa_table: pa.Table
+) -> List[ArrowDocumentView[D]]:
+    # slicing does not copy any data
+    return [
+        ArrowDocumentView(document_type, pa_table.slice(i, 1)) for i in range(pa_table.num_rows)
+    ]
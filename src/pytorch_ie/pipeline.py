@@ -1,15 +1,19 @@
+import asyncio
+import functools
 import logging
 import os
 import warnings
 from collections import UserDict
+from collections.abc import Mapping
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from contextlib import contextmanager
-from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar, Union
 
 import torch
 import tqdm
 from packaging import version
 from torch import Tensor
-from torch.utils.data import DataLoader
+from torch.utils.data import DataLoader, Sampler
 from transformers.utils import ModelOutput
 
 from pytorch_ie.core.document import Document
@@ -20,11 +24,87 @@ from pytorch_ie.core.taskmodule import (
     TaskEncodingDataset,
     TaskModule,
     TaskOutput,
+    _iterate_batches,
 )
 from pytorch_ie.data import Dataset
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+
+class LengthGroupedBatchSampler(Sampler[List[int]]):
+    """
+    A batch sampler that groups inputs of similar length into the same batch, so that collate() has to add less
+    padding. The inputs are sorted by length (longest first, inputs of the same length keep their order) and split
+    into batches of at most batch_size inputs. If max_tokens_per_batch is given, a batch is also closed before the
+    number of its inputs times its padded length (the length of its longest input) would exceed that budget. Inputs
+    that are longer than the budget get a batch of their own. The batches are fixed at construction, so results that
+    are collected in batch order can be brought back into the original order with restore_order().
+    """
+
+    def __init__(
+        self,
+        lengths: Sequence[int],
+        batch_size: Optional[int] = 1,
+        max_tokens_per_batch: Optional[int] = None,
+    ):
+        if batch_size is None and max_tokens_per_batch is None:
+            raise ValueError("either batch_size or max_tokens_per_batch is required")
+        if batch_size is not None and batch_size < 1:
+            raise ValueError(f"batch_size has to be a positive integer, but it is {batch_size}")
+        if max_tokens_per_batch is not None and max_tokens_per_batch < 1:
+            raise ValueError(
+                f"max_tokens_per_batch has to be a positive integer, but it is {max_tokens_per_batch}"
+            )
+        self.lengths = list(lengths)
+        self.batch_size = batch_size
+        self.max_tokens_per_batch = max_tokens_per_batch
+        indices = sorted(range(len(self.lengths)), key=lambda idx: -self.lengths[idx])
+
+        self.batches: List[List[int]] = []
+        batch: List[int] = []
+        for idx in indices:
+            # the first input of a batch is the longest one, so it determines the padded length
+            if len(batch) > 0 and (
+                (batch_size is not None and len(batch) >= batch_size)
+                or (
+                    max_tokens_per_batch is not None
+                    and (len(batch) + 1) * self.lengths[batch[0]] > max_tokens_per_batch
+                )
+            ):
+                self.batches.append(batch)
+                batch = []
+            batch.append(idx)
+        if len(batch) > 0:
+            self.batches.append(batch)
+
+        if max_tokens_per_batch is not None:
+            num_too_long = sum(length > max_tokens_per_batch for length in self.lengths)
+            if num_too_long > 0:
+                logger.warning(
+                    f"{num_too_long} inputs are longer than max_tokens_per_batch={max_tokens_per_batch}, "
+                    f"each of them is processed in a batch of its own"
+                )
+
+    def __iter__(self) -> Iterator[List[int]]:
+        return iter(self.batches)
+
+    def __len__(self) -> int:
+        return len(self.batches)
+
+    def restore_order(self, items: Sequence[T]) -> List[T]:
+        """Reorders items that are in batch order (e.g. the unbatched model outputs) into the original order."""
+        indices = [idx for batch in self.batches for idx in batch]
+        if len(items) != len(indices):
+            raise ValueError(
+                f"expected {len(indices)} items to restore the original order, but got {len(items)}"
+            )
+        result: List[Any] = [None] * len(items)
+        for idx, item in zip(indices, items):
+            result[idx] = item
+        return result
+
 
 class Pipeline:
     """
@@ -191,7 +271,13 @@ class Pipeline:
                 forward_parameters[p_name] = pipeline_parameters[p_name]
 
         # set dataloader parameters
-        for p_name in ["batch_size", "num_workers", "shuffle"]:
+        for p_name in [
+            "batch_size",
+            "num_workers",
+            "shuffle",
+            "sort_by_length",
+            "max_tokens_per_batch",
+        ]:
             if p_name in pipeline_parameters:
                 dataloader_params[p_name] = pipeline_parameters[p_name]
 
@@ -274,13 +360,51 @@ class Pipeline:
                 )
         return model_outputs
 
+    def get_input_length(self, task_encoding: TaskEncoding) -> int:
+        """
+        Returns the length of the model input of a task encoding, i.e. the number of its input_ids. It is used to
+        group inputs of similar length into the same batch, see get_dataloader().
+        """
+        inputs = task_encoding.inputs
+        if not isinstance(inputs, Mapping) or "input_ids" not in inputs:
+            raise ValueError(
+                "can not determine the input length of task encodings without input_ids, "
+                "please overwrite Pipeline.get_input_length()"
+            )
+        return len(inputs["input_ids"])
+
     def get_dataloader(
         self,
         model_inputs: Sequence[TaskEncoding],
-        batch_size: int = 1,
+        batch_size: Optional[int] = None,
         num_workers: int = 8,
+        sort_by_length: bool = False,
+        max_tokens_per_batch: Optional[int] = None,
         **kwargs,
     ):
+        """
+        Creates a dataloader that batches the model inputs with taskmodule.collate(). If sort_by_length is enabled,
+        inputs of similar length are grouped into the same batch (see LengthGroupedBatchSampler), so the batches
+        are not in the order of the model inputs anymore. If max_tokens_per_batch is given, the inputs are also
+        grouped by length and each batch is limited to that many tokens (batch size times padded length) instead of
+        a fixed size. The batch size defaults to 1, or to no limit when max_tokens_per_batch is given.
+        """
+        if batch_size is None and max_tokens_per_batch is None:
+            batch_size = 1
+        if sort_by_length or max_tokens_per_batch is not None:
+            batch_sampler = LengthGroupedBatchSampler(
+                lengths=[self.get_input_length(task_encoding) for task_encoding in model_inputs],
+                batch_size=batch_size,
+                max_tokens_per_batch=max_tokens_per_batch,
+            )
+            return DataLoader(
+                TaskEncodingDataset(model_inputs),
+                batch_sampler=batch_sampler,
+                num_workers=num_workers,
+                collate_fn=self.taskmodule.collate,
+                **kwargs,
+            )
+
         dataloader: DataLoader[TaskEncoding] = DataLoader(
             TaskEncodingDataset(model_inputs),
             batch_size=batch_size,
@@ -292,14 +416,9 @@ class Pipeline:
 
         return dataloader
 
-    def __call__(
-        self,
-        documents: Union[Document, Sequence[Document], Dataset],
-        *args,
-        **kwargs,
-    ) -> Union[Document, Sequence[Document]]:
-        if args:
-            logger.warning(f"Ignoring args : {args}")
+    def _get_call_parameters(
+        self, documents: Any, **kwargs
+    ) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
         (
             preprocess_params,
             dataloader_params,
@@ -324,6 +443,23 @@ class Pipeline:
         dataloader_params = {**self._dataloader_params, **dataloader_params}
         forward_params = {**self._forward_params, **forward_params}
         postprocess_params = {**self._postprocess_params, **postprocess_params}
+        return preprocess_params, dataloader_params, forward_params, postprocess_params
+
+    def __call__(
+        self,
+        documents: Union[Document, Sequence[Document], Dataset],
+        *args,
+        document_chunk_size: Optional[int] = None,
+        **kwargs,
+    ) -> Union[Document, Sequence[Document]]:
+        """
+        Runs the pipeline on the documents. By default, all documents are encoded first, then the model runs on all
+        task encodings and finally all outputs are decoded. If a document_chunk_size is given, the documents are
+        processed in chunks of that size and encoding, model inference and decoding of consecutive chunks overlap,
+        which reduces the peak memory on large inputs (see _iter_pipelined()). This does not support fast_dev_run.
+        """
+        if args:
+            logger.warning(f"Ignoring args : {args}")
 
         self.call_count += 1
         if self.call_count > 10 and self.device.type == "cuda":
@@ -332,23 +468,106 @@ class Pipeline:
                 UserWarning,
             )
 
+        return self._process_documents(
+            documents, document_chunk_size=document_chunk_size, **kwargs
+        )
+
+    def _process_documents(
+        self,
+        documents: Union[Document, Sequence[Document], Dataset],
+        document_chunk_size: Optional[int] = None,
+        **kwargs,
+    ) -> Union[Document, Sequence[Document]]:
+        """Runs the pipeline on the documents like __call__(), but without counting the call."""
+        (
+            preprocess_params,
+            dataloader_params,
+            forward_params,
+            postprocess_params,
+        ) = self._get_call_parameters(documents, **kwargs)
+
         single_document = False
         if not isinstance(documents, (Sequence, Dataset)):
             single_document = True
             documents = [documents]
 
-        # This creates encodings from the documents. It modifies the documents and may produce multiple entries per
-        # document.
-        model_inputs = self.preprocess(documents, **preprocess_params)
-        if forward_params.pop("fast_dev_run", False):
-            warnings.warn(
-                "Execute a fast dev run, only the first two model inputs will be processed."
+        if document_chunk_size is not None:
+            documents = list(
+                self._iter_pipelined(
+                    documents,
+                    document_chunk_size=document_chunk_size,
+                    preprocess_params=preprocess_params,
+                    dataloader_params=dataloader_params,
+                    forward_params=forward_params,
+                    postprocess_params=postprocess_params,
+                    total=len(documents),
+                )
+            )
+        else:
+            # This creates encodings from the documents. It modifies the documents and may produce multiple entries
+            # per document.
+            model_inputs = self.preprocess(documents, **preprocess_params)
+            if forward_params.pop("fast_dev_run", False):
+                warnings.warn(
+                    "Execute a fast dev run, only the first two model inputs will be processed."
+                )
+                model_inputs = model_inputs[:2]
+            show_progress_bar = forward_params.pop("show_progress_bar", False)
+            model_outputs = self._predict_model_outputs(
+                model_inputs,
+                dataloader_params=dataloader_params,
+                forward_params=forward_params,
+                show_progress_bar=show_progress_bar,
             )
-            model_inputs = model_inputs[:2]
+            documents = self.postprocess(
+                model_inputs=model_inputs,
+                model_outputs=model_outputs,
+                **postprocess_params,
+            )
+        if single_document:
+            return documents[0]
+        else:
+            return documents
+
+    def stream(
+        self,
+        documents: Iterable[Document],
+        document_chunk_size: int = 32,
+        **kwargs,
+    ) -> Iterator[Document]:
+        """
+        Runs the pipeline lazily on a (possibly unbounded) iterable of documents and yields the resulting documents
+        in input order. The documents are consumed in chunks of document_chunk_size and, as with the
+        document_chunk_size of __call__(), encoding, model inference and decoding of consecutive chunks overlap.
+        Only a few chunks are held in memory at any time. Accepts the same parameters as __call__(), except for
+        fast_dev_run.
+        """
+        (
+            preprocess_params,
+            dataloader_params,
+            forward_params,
+            postprocess_params,
+        ) = self._get_call_parameters(documents, **kwargs)
+        return self._iter_pipelined(
+            documents,
+            document_chunk_size=document_chunk_size,
+            preprocess_params=preprocess_params,
+            dataloader_params=dataloader_params,
+            forward_params=forward_params,
+            postprocess_params=postprocess_params,
+        )
+
+    def _predict_model_outputs(
+        self,
+        model_inputs: Sequence[TaskEncoding],
+        dataloader_params: Dict[str, Any],
+        forward_params: Dict[str, Any],
+        show_progress_bar: bool = False,
+    ) -> List[TaskOutput]:
+        """Runs the model on batches of the model inputs and returns the unbatched outputs in the same order."""
         # Create a dataloader from the model inputs. This uses taskmodule.collate().
         dataloader = self.get_dataloader(model_inputs=model_inputs, **dataloader_params)
 
-        show_progress_bar = forward_params.pop("show_progress_bar", False)
         model_outputs: List = []
         with torch.no_grad():
             for batch in tqdm.tqdm(dataloader, desc="inference", disable=not show_progress_bar):
@@ -356,16 +575,234 @@ class Pipeline:
                 processed_output = self.taskmodule.unbatch_output(output)
                 model_outputs.extend(processed_output)
 
+        return self._restore_model_output_order(model_inputs, model_outputs, dataloader)
+
+    def _restore_model_output_order(
+        self,
+        model_inputs: Sequence[TaskEncoding],
+        model_outputs: List[TaskOutput],
+        dataloader: DataLoader,
+    ) -> List[TaskOutput]:
         assert len(model_inputs) == len(
             model_outputs
         ), f"length mismatch: len(model_inputs) [{len(model_inputs)}] != len(model_outputs) [{len(model_outputs)}]"
 
-        documents = self.postprocess(
-            model_inputs=model_inputs,
-            model_outputs=model_outputs,
-            **postprocess_params,
-        )
-        if single_document:
-            return documents[0]
-        else:
-            return documents
+        if isinstance(dataloader.batch_sampler, LengthGroupedBatchSampler):
+            # the batches were grouped by length, so bring the outputs back into the order of the model inputs
+            model_outputs = dataloader.batch_sampler.restore_order(model_outputs)
+        return model_outputs
+
+    def _iter_pipelined(
+        self,
+        documents: Iterable[Document],
+        document_chunk_size: int,
+        preprocess_params: Dict[str, Any],
+        dataloader_params: Dict[str, Any],
+        forward_params: Dict[str, Any],
+        postprocess_params: Dict[str, Any],
+        total: Optional[int] = None,
+    ) -> Iterator[Document]:
+        """
+        Processes the documents in chunks of document_chunk_size and returns an iterator that yields the resulting
+        documents in input order as soon as their chunk is decoded. The stages overlap: while the model runs on one
+        chunk, the next chunk is encoded and collated and the previous one is unbatched and decoded. So at most three
+        chunks are held in memory at the same time. All taskmodule calls run one after another in a single background
+        thread because tokenizers are not thread-safe, only the model runs in parallel to them.
+        """
+        if document_chunk_size < 1:
+            raise ValueError(
+                f"document_chunk_size has to be a positive integer, but it is {document_chunk_size}"
+            )
+        if forward_params.pop("fast_dev_run", False):
+            raise ValueError("fast_dev_run is not supported with a document_chunk_size")
+        show_progress_bar = forward_params.pop("show_progress_bar", False)
+        # the task encodings are already prepared in a background thread and worker processes would be created anew
+        # for each chunk
+        dataloader_params.setdefault("num_workers", 0)
+
+        def encode(
+            document_chunk: List[Document],
+        ) -> Tuple[Sequence[TaskEncoding], DataLoader, List[Any]]:
+            model_inputs = self.preprocess(document_chunk, **preprocess_params)
+            dataloader = self.get_dataloader(model_inputs=model_inputs, **dataloader_params)
+            return model_inputs, dataloader, list(dataloader)
+
+        def decode(
+            model_inputs: Sequence[TaskEncoding], dataloader: DataLoader, outputs: List[Any]
+        ) -> Sequence[Document]:
+            model_outputs: List[TaskOutput] = []
+            for output in outputs:
+                model_outputs.extend(self.taskmodule.unbatch_output(output))
+            model_outputs = self._restore_model_output_order(
+                model_inputs, model_outputs, dataloader
+            )
+            return self.postprocess(
+                model_inputs=model_inputs, model_outputs=model_outputs, **postprocess_params
+            )
+
+        def iter_documents() -> Iterator[Document]:
+            document_chunks = _iterate_batches(documents, document_chunk_size)
+            taskmodule_executor = ThreadPoolExecutor(max_workers=1)
+            progress_bar = tqdm.tqdm(total=total, desc="inference", disable=not show_progress_bar)
+            try:
+                document_chunk = next(document_chunks, None)
+                encoded_chunk: Optional[Future] = None
+                if document_chunk is not None:
+                    encoded_chunk = taskmodule_executor.submit(encode, document_chunk)
+                decoded_chunk: Optional[Future] = None
+                while encoded_chunk is not None:
+                    model_inputs, dataloader, batches = encoded_chunk.result()
+                    # the next chunk is encoded (and the previous one decoded) while the model runs
+                    document_chunk = next(document_chunks, None)
+                    encoded_chunk = None
+                    if document_chunk is not None:
+                        encoded_chunk = taskmodule_executor.submit(encode, document_chunk)
+                    with torch.no_grad():
+                        outputs = [self.forward(batch, **forward_params) for batch in batches]
+                    next_decoded_chunk = taskmodule_executor.submit(
+                        decode, model_inputs, dataloader, outputs
+                    )
+                    if decoded_chunk is not None:
+                        decoded_documents = decoded_chunk.result()
+                        progress_bar.update(len(decoded_documents))
+                        yield from decoded_documents
+                    decoded_chunk = next_decoded_chunk
+                if decoded_chunk is not None:
+                    decoded_documents = decoded_chunk.result()
+                    progress_bar.update(len(decoded_documents))
+                    yield from decoded_documents
+            finally:
+                taskmodule_executor.shutdown(cancel_futures=True)
+                progress_bar.close()
+
+        return iter_documents()
+
+
+class AsyncPipeline:
+    """
+    An asyncio front-end for a Pipeline that collects concurrent predict() calls into micro-batches: a batch is
+    closed after max_batch_size documents or when max_wait_ms passed since its first document arrived. Each batch is
+    processed with a single call of the pipeline (with the given pipeline_kwargs, e.g. batch_size) in the executor,
+    by default a thread pool with a single thread, so that only one batch runs on the model at a time. While a batch
+    is processed, the next one is collected.
+
+    Example::
+
+        async_pipeline = AsyncPipeline(pipeline, max_batch_size=32, max_wait_ms=10, batch_size=32)
+        document = await async_pipeline.predict(document)
+    """
+
+    def __init__(
+        self,
+        pipeline: Pipeline,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        executor: Optional[Executor] = None,
+        **pipeline_kwargs,
+    ):
+        if max_batch_size < 1:
+            raise ValueError(
+                f"max_batch_size has to be a positive integer, but it is {max_batch_size}"
+            )
+        self.pipeline = pipeline
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.pipeline_kwargs = pipeline_kwargs
+        self._owns_executor = executor is None
+        self._executor = executor if executor is not None else ThreadPoolExecutor(max_workers=1)
+        self._queue: Optional["asyncio.Queue[Tuple[Document, asyncio.Future]]"] = None
+        self._worker: Optional["asyncio.Task[None]"] = None
+
+    async def predict(self, document: Document) -> Document:
+        """Adds the document to the next batch and returns the resulting document once it is processed."""
+        if self._worker is None or self._worker.done():
+            # the worker may have been cancelled without close(), so nothing processes the queued calls anymore
+            self._cancel_queued()
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._process_batches())
+        assert self._queue is not None
+        result: asyncio.Future = asyncio.get_running_loop().create_future()
+        await self._queue.put((document, result))
+        return await result
+
+    async def _collect_batch(self) -> List[Tuple[Document, asyncio.Future]]:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait_ms / 1000
+        try:
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+        except asyncio.CancelledError:
+            for _, result in batch:
+                result.cancel()
+            raise
+        return batch
+
+    async def _process_batches(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [
+                (document, result)
+                for document, result in await self._collect_batch()
+                if not result.cancelled()
+            ]
+            if len(batch) == 0:
+                continue
+            # the pipeline returns each (identical) document only once
+            documents = list({id(document): document for document, _ in batch}.values())
+            try:
+                # this bypasses Pipeline.__call__(), so that the batches do not count as sequential calls
+                processed_documents = await loop.run_in_executor(
+                    self._executor,
+                    functools.partial(
+                        self.pipeline._process_documents, documents, **self.pipeline_kwargs
+                    ),
+                )
+            except asyncio.CancelledError:
+                for _, result in batch:
+                    result.cancel()
+                raise
+            except Exception as e:
+                for _, result in batch:
+                    if not result.done():
+                        result.set_exception(e)
+                continue
+            processed = {
+                id(document): processed_document
+                for document, processed_document in zip(documents, processed_documents)
+            }
+            for document, result in batch:
+                if not result.done():
+                    result.set_result(processed[id(document)])
+
+    async def close(self) -> None:
+        """Stops collecting batches and shuts down the executor if it was created by this AsyncPipeline."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        self._cancel_queued()
+        if self._owns_executor:
+            self._executor.shutdown()
+
+    def _cancel_queued(self) -> None:
+        # cancel the predict() calls that are still waiting for a batch
+        while self._queue is not None and not self._queue.empty():
+            _, result = self._queue.get_nowait()
+            result.cancel()
+
+    async def __aenter__(self) -> "AsyncPipeline":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
@@ -8,11 +8,22 @@ workflow:
 """
 
 import logging
-from typing import Any, Dict, Iterator, MutableMapping, Optional, Sequence, Tuple, TypedDict, Union
+from typing import (
+    Any,
+    Dict,
+    Iterator,
+    List,
+    MutableMapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TypedDict,
+    Union,
+)
 
 import numpy as np
 import torch
-from transformers import AutoTokenizer
+from transformers import AutoTokenizer, BatchEncoding
 from transformers.file_utils import PaddingStrategy
 from transformers.tokenization_utils_base import TruncationStrategy
 from typing_extensions import TypeAlias
@@ -24,6 +35,7 @@ from pytorch_ie.models.transformer_text_classification import (
     TransformerTextClassificationModelBatchOutput,
     TransformerTextClassificationModelStepBatchEncoding,
 )
+from pytorch_ie.utils.tokenization import batch_tokenize
 
 logger = logging.getLogger(__name__)
 
@@ -115,6 +127,17 @@ class SimpleTransformerTextClassificationTaskModule(TaskModuleType):
 
         self.id_to_label = {v: k for k, v in self.label_to_id.items()}
 
+    def _tokenize(self, texts: Sequence[str]) -> List[BatchEncoding]:
+        return batch_tokenize(
+            self.tokenizer,
+            texts,
+            # we do not pad here, this will be done in collate()
+            # when the actual batches are created
+            padding=False,
+            truncation=self.truncation,
+            max_length=self.max_length,
+        )
+
     def encode_input(
         self,
         document: DocumentType,
@@ -125,20 +148,30 @@ class SimpleTransformerTextClassificationTaskModule(TaskModuleType):
         """
 
         # tokenize the input text, this will be the input
-        inputs = self.tokenizer(
-            document.text,
-            # we do not pad here, this will be done in collate()
-            # when the actual batches are created
-            padding=False,
-            truncation=self.truncation,
-            max_length=self.max_length,
-        )
+        inputs = self._tokenize([document.text])[0]
 
         return TaskEncoding(
             document=document,
             inputs=inputs,
         )
 
+    def encode_inputs_batched(
+        self,
+        documents: Sequence[DocumentType],
+        is_training: bool = False,
+    ) -> List[TaskEncodingType]:
+        """
+        Same as encode_input(), but for a batch of documents. This allows the tokenizer to process all texts
+        at once (in parallel, if it is a fast tokenizer).
+        """
+
+        inputs = self._tokenize([document.text for document in documents])
+
+        return [
+            TaskEncoding(document=document, inputs=document_inputs)
+            for document, document_inputs in zip(documents, inputs)
+        ]
+
     def encode_target(
         self,
         task_encoding: TaskEncodingType,
@@ -19,12 +19,14 @@ from typing_extensions import TypeAlias
 
 from pytorch_ie.annotations import BinaryRelation, LabeledSpan, MultiLabeledBinaryRelation, Span
 from pytorch_ie.core import TaskEncoding, TaskModule
+from pytorch_ie.core.document import BaseAnnotationList
 from pytorch_ie.documents import TextDocument
 from pytorch_ie.models import (
     TransformerTextClassificationModelBatchOutput,
     TransformerTextClassificationModelStepBatchEncoding,
 )
 from pytorch_ie.utils.span import get_token_slice, is_contained_in
+from pytorch_ie.utils.tokenization import batch_tokenize_grouped
 from pytorch_ie.utils.window import get_window_around_slice
 
 TransformerReTextClassificationInputEncoding: TypeAlias = Dict[str, Any]
@@ -93,18 +95,18 @@ def _enumerate_entity_pairs(
     restrict pairs to be contained in that. If `relations` are given, return only pairs for which a relation exists.
     """
     existing_head_tail = {(relation.head, relation.tail) for relation in relations or []}
-    for head in entities:
-        if partition is not None and not is_contained_in(
-            (head.start, head.end), (partition.start, partition.end)
-        ):
-            continue
+    if partition is not None:
+        if isinstance(entities, BaseAnnotationList):
+            entities = entities.spans_within(partition.start, partition.end)
+        else:
+            entities = [
+                entity
+                for entity in entities
+                if is_contained_in((entity.start, entity.end), (partition.start, partition.end))
+            ]
 
+    for head in entities:
         for tail in entities:
-            if partition is not None and not is_contained_in(
-                (tail.start, tail.end), (partition.start, partition.end)
-            ):
-                continue
-
             if head == tail:
                 continue
 
@@ -135,6 +137,7 @@ class TransformerRETextClassificationTaskModule(_TransformerReTextClassification
     """
 
     PREPARED_ATTRIBUTES = ["label_to_id", "entity_labels"]
+    PER_DOCUMENT_ENCODING_METHODS = ["encode_input", "_encode_text"]
 
     def __init__(
         self,
@@ -229,13 +232,25 @@ class TransformerRETextClassificationTaskModule(_TransformerReTextClassification
         partition: Optional[Span] = None,
         add_special_tokens: bool = True,
     ) -> BatchEncoding:
-        text = (
+        grouped_encodings = self._tokenize_grouped(
+            [[self._get_partition_text(document, partition)]],
+            add_special_tokens=add_special_tokens,
+        )
+        return grouped_encodings[0][0]
+
+    def _get_partition_text(self, document: TextDocument, partition: Optional[Span]) -> str:
+        return (
             document.text[partition.start : partition.end]
             if partition is not None
             else document.text
         )
-        encoding = self.tokenizer(
-            text,
+
+    def _tokenize_grouped(
+        self, grouped_texts: Sequence[Sequence[str]], add_special_tokens: bool = True
+    ) -> List[List[BatchEncoding]]:
+        return batch_tokenize_grouped(
+            self.tokenizer,
+            grouped_texts,
             padding=False,
             truncation=self.truncation,
             max_length=self.max_length,
@@ -243,7 +258,34 @@ class TransformerRETextClassificationTaskModule(_TransformerReTextClassification
             return_offsets_mapping=False,
             add_special_tokens=add_special_tokens,
         )
-        return encoding
+
+    def _get_partitions(self, document: TextDocument) -> Sequence[Optional[Span]]:
+        if self.partition_annotation is not None:
+            return document[self.partition_annotation]
+        else:
+            # use single dummy partition
+            return [None]
+
+    def encode_inputs_batched(
+        self,
+        documents: Sequence[TextDocument],
+        is_training: bool = False,
+    ) -> List[Sequence[TransformerReTextClassificationTaskEncoding]]:
+        # tokenize the partitions of all documents at once
+        partitions_per_document = [self._get_partitions(document) for document in documents]
+        partition_encodings = self._tokenize_grouped(
+            [
+                [self._get_partition_text(document, partition) for partition in partitions]
+                for document, partitions in zip(documents, partitions_per_document)
+            ],
+            add_special_tokens=self.max_window is None,
+        )
+        return [
+            self._encode_input(document, is_training, partitions, encodings)
+            for document, partitions, encodings in zip(
+                documents, partitions_per_document, partition_encodings
+            )
+        ]
 
     def encode_input(
         self,
@@ -255,6 +297,23 @@ class TransformerRETextClassificationTaskModule(_TransformerReTextClassification
             Sequence[TransformerReTextClassificationTaskEncoding],
         ]
     ]:
+        partitions = self._get_partitions(document)
+        add_special_tokens = self.max_window is None
+        partition_encodings = [
+            self._encode_text(
+                document=document, partition=partition, add_special_tokens=add_special_tokens
+            )
+            for partition in partitions
+        ]
+        return self._encode_input(document, is_training, partitions, partition_encodings)
+
+    def _encode_input(
+        self,
+        document: TextDocument,
+        is_training: bool,
+        partitions: Sequence[Optional[Span]],
+        partition_encodings: Sequence[BatchEncoding],
+    ) -> Sequence[TransformerReTextClassificationTaskEncoding]:
         # TODO (CA): can't this be moved to some other place?
         assert (
             self.argument_markers is not None
@@ -269,20 +328,10 @@ class TransformerRETextClassificationTaskModule(_TransformerReTextClassification
             relations = None
         # relation_mapping = {(rel.head, rel.tail): rel.label for rel in relations or []}
 
-        partitions: Sequence[Optional[Span]]
-        if self.partition_annotation is not None:
-            partitions = document[self.partition_annotation]
-        else:
-            # use single dummy partition
-            partitions = [None]
-
         task_encodings: List[TransformerReTextClassificationTaskEncoding] = []
-        for partition_idx, partition in enumerate(partitions):
+        add_special_tokens = self.max_window is None
+        for partition, encoding in zip(partitions, partition_encodings):
             partition_offset = 0 if partition is None else partition.start
-            add_special_tokens = self.max_window is None
-            encoding = self._encode_text(
-                document=document, partition=partition, add_special_tokens=add_special_tokens
-            )
 
             for (
                 head,
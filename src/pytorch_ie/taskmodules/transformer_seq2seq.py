@@ -11,7 +11,7 @@ import logging
 import re
 from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
-from transformers import AutoTokenizer
+from transformers import AutoTokenizer, BatchEncoding
 from transformers.file_utils import PaddingStrategy
 from transformers.tokenization_utils_base import TruncationStrategy
 from typing_extensions import TypeAlias
@@ -23,6 +23,7 @@ from pytorch_ie.models import (
     TransformerSeq2SeqModelBatchOutput,
     TransformerSeq2SeqModelStepBatchEncoding,
 )
+from pytorch_ie.utils.tokenization import batch_tokenize
 
 TransformerSeq2SeqInputEncoding: TypeAlias = Dict[str, Sequence[int]]
 TransformerSeq2SeqTargetEncoding: TypeAlias = Dict[str, Sequence[int]]
@@ -47,6 +48,8 @@ logger = logging.getLogger(__name__)
 
 @TaskModule.register()
 class TransformerSeq2SeqTaskModule(_TransformerSeq2SeqTaskModule):
+    PER_DOCUMENT_ENCODING_METHODS = ["encode_input", "encode_text"]
+
     def __init__(
         self,
         tokenizer_name_or_path: str,
@@ -72,15 +75,31 @@ class TransformerSeq2SeqTaskModule(_TransformerSeq2SeqTaskModule):
 
         self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_name_or_path)
 
-    def encode_text(self, text: str) -> TransformerSeq2SeqInputEncoding:
-        return self.tokenizer(
-            text,
+    def _tokenize(self, texts: Sequence[str]) -> List[BatchEncoding]:
+        return batch_tokenize(
+            self.tokenizer,
+            texts,
             padding=False,
             truncation=self.truncation,
             max_length=self.max_input_length,
             is_split_into_words=False,
         )
 
+    def encode_text(self, text: str) -> TransformerSeq2SeqInputEncoding:
+        return self._tokenize([text])[0]
+
+    def encode_inputs_batched(
+        self,
+        documents: Sequence[TextDocument],
+        is_training: bool = False,
+    ) -> List[TransformerSeq2SeqTaskEncoding]:
+        # tokenize all texts at once
+        inputs = self._tokenize([document.text for document in documents])
+        return [
+            TaskEncoding(document=document, inputs=document_inputs)
+            for document, document_inputs in zip(documents, inputs)
+        ]
+
     def encode_input(
         self,
         document: TextDocument,
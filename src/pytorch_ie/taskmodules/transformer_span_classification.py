@@ -25,6 +25,7 @@ from pytorch_ie.models.transformer_span_classification import (
     TransformerSpanClassificationModelBatchOutput,
     TransformerSpanClassificationModelStepBatchEncoding,
 )
+from pytorch_ie.utils.tokenization import batch_tokenize_grouped
 
 TransformerSpanClassificationInputEncoding: TypeAlias = BatchEncoding
 TransformerSpanClassificationTargetEncoding: TypeAlias = Sequence[Tuple[int, int, int]]
@@ -130,24 +131,51 @@ class TransformerSpanClassificationTaskModule(_TransformerSpanClassificationTask
             Sequence[TransformerSpanClassificationTaskEncoding],
         ]
     ]:
+        return self._encode_input(
+            document, self._tokenize_grouped([self._get_partition_texts(document)])[0]
+        )
+
+    def encode_inputs_batched(
+        self,
+        documents: Sequence[TextDocument],
+        is_training: bool = False,
+    ) -> List[Sequence[TransformerSpanClassificationTaskEncoding]]:
+        # tokenize the partitions of all documents at once
+        partition_inputs = self._tokenize_grouped(
+            [self._get_partition_texts(document) for document in documents]
+        )
+        return [
+            self._encode_input(document, document_partition_inputs)
+            for document, document_partition_inputs in zip(documents, partition_inputs)
+        ]
+
+    def _get_partition_texts(self, document: TextDocument) -> List[str]:
         partitions: Sequence[Span]
         if self.single_sentence:
             partitions = document[self.sentence_annotation]
         else:
             partitions = [Span(start=0, end=len(document.text))]
+        return [document.text[partition.start : partition.end] for partition in partitions]
+
+    def _tokenize_grouped(
+        self, grouped_texts: Sequence[Sequence[str]]
+    ) -> List[List[BatchEncoding]]:
+        return batch_tokenize_grouped(
+            self.tokenizer,
+            grouped_texts,
+            padding=False,
+            truncation=self.truncation,
+            max_length=self.max_length,
+            is_split_into_words=False,
+            return_offsets_mapping=True,
+            return_special_tokens_mask=True,
+        )
 
+    def _encode_input(
+        self, document: TextDocument, partition_inputs: Sequence[BatchEncoding]
+    ) -> Sequence[TransformerSpanClassificationTaskEncoding]:
         task_encodings: List[TaskEncoding] = []
-        for partition_idx, partition in enumerate(partitions):
-            inputs = self.tokenizer(
-                document.text[partition.start : partition.end],
-                padding=False,
-                truncation=self.truncation,
-                max_length=self.max_length,
-                is_split_into_words=False,
-                return_offsets_mapping=True,
-                return_special_tokens_mask=True,
-            )
-
+        for partition_idx, inputs in enumerate(partition_inputs):
             metadata = {
                 "offset_mapping": inputs.pop("offset_mapping"),
                 "special_tokens_mask": inputs.pop("special_tokens_mask"),
@@ -22,7 +22,7 @@ from typing import (
 
 import numpy as np
 import torch
-from transformers import AutoTokenizer
+from transformers import AutoTokenizer, BatchEncoding
 from transformers.file_utils import PaddingStrategy
 from transformers.tokenization_utils_base import TruncationStrategy
 from typing_extensions import TypeAlias
@@ -34,6 +34,7 @@ from pytorch_ie.models.transformer_text_classification import (
     TransformerTextClassificationModelBatchOutput,
     TransformerTextClassificationModelStepBatchEncoding,
 )
+from pytorch_ie.utils.tokenization import batch_tokenize
 
 TransformerTextClassificationInputEncoding: TypeAlias = MutableMapping[str, Any]
 TransformerTextClassificationTargetEncoding: TypeAlias = Sequence[int]
@@ -127,6 +128,30 @@ class TransformerTextClassificationTaskModule(_TransformerTextClassificationTask
 
         self.id_to_label = {v: k for k, v in self.label_to_id.items()}
 
+    def _tokenize(self, texts: Sequence[str]) -> List[BatchEncoding]:
+        return batch_tokenize(
+            self.tokenizer,
+            texts,
+            padding=False,
+            truncation=self.truncation,
+            max_length=self.max_length,
+            is_split_into_words=False,
+            return_offsets_mapping=True,
+            return_special_tokens_mask=True,
+        )
+
+    def encode_inputs_batched(
+        self,
+        documents: Sequence[TextDocument],
+        is_training: bool = False,
+    ) -> List[TransformerTextClassificationTaskEncoding]:
+        # tokenize all texts at once
+        inputs = self._tokenize([document.text for document in documents])
+        return [
+            self._create_task_encoding(document, document_inputs)
+            for document, document_inputs in zip(documents, inputs)
+        ]
+
     def encode_input(
         self,
         document: TextDocument,
@@ -137,16 +162,11 @@ class TransformerTextClassificationTaskModule(_TransformerTextClassificationTask
             Sequence[TransformerTextClassificationTaskEncoding],
         ]
     ]:
-        inputs = self.tokenizer(
-            document.text,
-            padding=False,
-            truncation=self.truncation,
-            max_length=self.max_length,
-            is_split_into_words=False,
-            return_offsets_mapping=True,
-            return_special_tokens_mask=True,
-        )
+        return self._create_task_encoding(document, self._tokenize([document.text])[0])
 
+    def _create_task_encoding(
+        self, document: TextDocument, inputs: BatchEncoding
+    ) -> TransformerTextClassificationTaskEncoding:
         metadata = {
             "offset_mapping": inputs.pop("offset_mapping"),
             "special_tokens_mask": inputs.pop("special_tokens_mask"),
@@ -26,12 +26,13 @@ from pytorch_ie.models.transformer_token_classification import (
     TransformerTokenClassificationModelStepBatchEncoding,
 )
 from pytorch_ie.utils.span import (
+    CharToTokenMapper,
     bio_tags_to_spans,
     convert_span_annotations_to_tag_sequence,
-    get_char_to_token_mapper,
     get_special_token_mask,
     has_overlap,
 )
+from pytorch_ie.utils.tokenization import batch_tokenize_grouped
 from pytorch_ie.utils.window import enumerate_windows
 
 TransformerTokenClassificationInputEncoding: TypeAlias = Union[Dict[str, Any], BatchEncoding]
@@ -59,6 +60,8 @@ logger = logging.getLogger(__name__)
 
 @TaskModule.register()
 class TransformerTokenClassificationTaskModule(_TransformerTokenClassificationTaskModule):
+    PER_DOCUMENT_ENCODING_METHODS = ["encode_input", "encode_text"]
+
     def __init__(
         self,
         tokenizer_name_or_path: str,
@@ -124,8 +127,17 @@ class TransformerTokenClassificationTaskModule(_TransformerTokenClassificationTa
             raise ValueError(f"partitioning is enabled, but no partition is provided")
 
         text_partition = text[partition.start : partition.end] if partition is not None else text
-        return self.tokenizer(
-            text_partition,
+        grouped_encodings = self._tokenize_grouped(
+            [[text_partition]], add_special_tokens=add_special_tokens
+        )
+        return grouped_encodings[0][0]
+
+    def _tokenize_grouped(
+        self, grouped_texts: Sequence[Sequence[str]], add_special_tokens: bool = True
+    ) -> List[List[BatchEncoding]]:
+        return batch_tokenize_grouped(
+            self.tokenizer,
+            grouped_texts,
             padding=False,
             truncation=False,
             max_length=None,
@@ -135,6 +147,38 @@ class TransformerTokenClassificationTaskModule(_TransformerTokenClassificationTa
             add_special_tokens=add_special_tokens,
         )
 
+    def _get_partitions(self, document: TextDocument) -> Sequence[Optional[Span]]:
+        if self.partition_annotation is not None:
+            return document[self.partition_annotation]
+        else:
+            return [None]
+
+    def encode_inputs_batched(
+        self,
+        documents: Sequence[TextDocument],
+        is_training: bool = False,
+    ) -> List[Sequence[TransformerTokenClassificationTaskEncoding]]:
+        # tokenize the partitions of all documents at once
+        partitions_per_document = [self._get_partitions(document) for document in documents]
+        partition_inputs = self._tokenize_grouped(
+            [
+                [
+                    document.text[partition.start : partition.end]
+                    if partition is not None
+                    else document.text
+                    for partition in partitions
+                ]
+                for document, partitions in zip(documents, partitions_per_document)
+            ],
+            add_special_tokens=self.max_window is None,
+        )
+        return [
+            self._encode_input(document, partitions, document_partition_inputs)
+            for document, partitions, document_partition_inputs in zip(
+                documents, partitions_per_document, partition_inputs
+            )
+        ]
+
     def encode_input(
         self,
         document: TextDocument,
@@ -145,19 +189,24 @@ class TransformerTokenClassificationTaskModule(_TransformerTokenClassificationTa
             Sequence[TransformerTokenClassificationTaskEncoding],
         ]
     ]:
-        partitions: Sequence[Optional[Span]]
-        if self.partition_annotation is not None:
-            partitions = document[self.partition_annotation]
-        else:
-            partitions = [None]
-
-        task_encodings: List[TransformerTokenClassificationTaskEncoding] = []
-        for partition_index, partition in enumerate(partitions):
-            add_special_tokens = self.max_window is None
-            inputs: BatchEncoding = self.encode_text(
+        partitions = self._get_partitions(document)
+        add_special_tokens = self.max_window is None
+        partition_inputs = [
+            self.encode_text(
                 text=document.text, partition=partition, add_special_tokens=add_special_tokens
             )
+            for partition in partitions
+        ]
+        return self._encode_input(document, partitions, partition_inputs)
 
+    def _encode_input(
+        self,
+        document: TextDocument,
+        partitions: Sequence[Optional[Span]],
+        partition_inputs: Sequence[BatchEncoding],
+    ) -> Sequence[TransformerTokenClassificationTaskEncoding]:
+        task_encodings: List[TransformerTokenClassificationTaskEncoding] = []
+        for partition_index, (partition, inputs) in enumerate(zip(partitions, partition_inputs)):
             metadata = {
                 "offset_mapping": inputs.pop("offset_mapping"),
                 "special_tokens_mask": inputs.pop("special_tokens_mask"),
@@ -177,10 +226,13 @@ class TransformerTokenClassificationTaskModule(_TransformerTokenClassificationTa
                 )
             else:
                 offset_mapping = metadata.pop("offset_mapping")
+                # this gets replaced per window, so do not copy it (and the encoding) for each window
+                metadata.pop("char_to_token_mapper")
                 # The actual number of tokens will be lower than max_window because we add the default special
                 # tokens later on (e.g. CLS and SEP).
                 max_window = self.max_window - self.tokenizer.num_special_tokens_to_add()
                 token_ids = inputs["input_ids"]
+                char_to_token_mapper = CharToTokenMapper(offset_mapping)
                 for token_slice, label_offset_slice in enumerate_windows(
                     sequence=token_ids, max_size=max_window, overlap=self.window_overlap
                 ):
@@ -208,15 +260,26 @@ class TransformerTokenClassificationTaskModule(_TransformerTokenClassificationTa
                             current_offset_mapping.append(offset_mapping_without_special_tokens[j])
                             j += 1
                     window_metadata["offset_mapping"] = current_offset_mapping
-                    char_to_token_mapping: Dict[int, int] = {}
-                    for token_idx, (char_start, char_end) in enumerate(current_offset_mapping):
-                        for char_idx in range(char_start, char_end):
-                            char_to_token_mapping[char_idx] = token_idx
-                    window_metadata["char_to_token_mapper"] = get_char_to_token_mapper(
-                        char_to_token_mapping=char_to_token_mapping,
-                        char_start=offset_mapping_without_special_tokens[0][0],
-                        char_end=offset_mapping_without_special_tokens[-1][1],
-                    )
+                    char_start = offset_mapping_without_special_tokens[0][0]
+                    char_end = offset_mapping_without_special_tokens[-1][1]
+                    token_offset = position_with_special_tokens[0]
+                    if all(
+                        position == token_offset + j
+                        for j, position in position_with_special_tokens.items()
+                    ):
+                        # the window tokens are not interrupted by special tokens, so we can share the
+                        # offsets of the whole partition
+                        window_metadata["char_to_token_mapper"] = char_to_token_mapper.with_window(
+                            token_start=start_idx,
+                            token_end=end_idx,
+                            token_offset=token_offset,
+                            char_start=char_start,
+                            char_end=char_end,
+                        )
+                    else:
+                        window_metadata["char_to_token_mapper"] = CharToTokenMapper(
+                            current_offset_mapping, char_start=char_start, char_end=char_end
+                        )
                     # new_metadata["window_tokens"] = token_slice
                     window_metadata["window_labels"] = (
                         position_with_special_tokens[label_offset_slice[0]],
@@ -0,0 +1,185 @@
+"""
+A small, pickle-free binary encoding for JSON-like values (None, bool, int, float, str, bytes, list, tuple and
+dict). In contrast to JSON, lists of plain ints or floats are stored as packed 64-bit arrays and repeated strings
+(e.g. annotation labels) are stored only once and referenced afterwards, for lists of strings by packed positions.
+"""
+
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List, Tuple
+
+_NONE = b"N"
+_TRUE = b"T"
+_FALSE = b"F"
+_INT = b"i"
+_BIG_INT = b"I"
+_FLOAT = b"f"
+_STR = b"s"
+_STR_REF = b"r"
+_BYTES = b"b"
+_LIST = b"l"
+_TUPLE = b"t"
+_DICT = b"d"
+_INT_ARRAY = b"q"
+_FLOAT_ARRAY = b"D"
+_STR_ARRAY = b"S"
+
+_UINT32 = struct.Struct("<I")
+_INT64 = struct.Struct("<q")
+_FLOAT64 = struct.Struct("<d")
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+# the arrays are stored little-endian
+_SWAP_BYTES = sys.byteorder != "little"
+
+
+def _packed_array(typecode: str, values: List[Any]) -> bytes:
+    arr = array(typecode, values)
+    if _SWAP_BYTES:
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _unpacked_array(typecode: str, data: memoryview) -> List[Any]:
+    arr = array(typecode)
+    arr.frombytes(data)
+    if _SWAP_BYTES:
+        arr.byteswap()
+    return arr.tolist()
+
+
+def _encode(value: Any, out: List[bytes], strings: Dict[str, int]) -> None:
+    value_type = type(value)
+    if value_type is str:
+        string_id = strings.get(value)
+        if string_id is not None:
+            out.append(_STR_REF + _UINT32.pack(string_id))
+        else:
+            strings[value] = len(strings)
+            data = value.encode("utf-8")
+            out.append(_STR + _UINT32.pack(len(data)))
+            out.append(data)
+    elif value is None:
+        out.append(_NONE)
+    elif value_type is bool:
+        out.append(_TRUE if value else _FALSE)
+    elif value_type is int:
+        if _INT64_MIN <= value <= _INT64_MAX:
+            out.append(_INT + _INT64.pack(value))
+        else:
+            data = str(value).encode("ascii")
+            out.append(_BIG_INT + _UINT32.pack(len(data)))
+            out.append(data)
+    elif value_type is float:
+        out.append(_FLOAT + _FLOAT64.pack(value))
+    elif value_type is list or value_type is tuple:
+        if value_type is list and len(value) > 0:
+            item_types = set(map(type, value))
+            if item_types == {int} and _INT64_MIN <= min(value) and max(value) <= _INT64_MAX:
+                out.append(_INT_ARRAY + _UINT32.pack(len(value)))
+                out.append(_packed_array("q", value))
+                return
+            if item_types == {float}:
+                out.append(_FLOAT_ARRAY + _UINT32.pack(len(value)))
+                out.append(_packed_array("d", value))
+                return
+            if item_types == {str}:
+                # the distinct strings followed by the positions of the items in them
+                distinct: Dict[str, int] = {}
+                item_positions = [distinct.setdefault(item, len(distinct)) for item in value]
+                out.append(_STR_ARRAY + _UINT32.pack(len(distinct)))
+                for item in distinct:
+                    _encode(item, out, strings)
+                out.append(_UINT32.pack(len(value)))
+                out.append(_packed_array("I", item_positions))
+                return
+        out.append((_LIST if value_type is list else _TUPLE) + _UINT32.pack(len(value)))
+        for item in value:
+            _encode(item, out, strings)
+    elif value_type is dict:
+        out.append(_DICT + _UINT32.pack(len(value)))
+        for key, item in value.items():
+            _encode(key, out, strings)
+            _encode(item, out, strings)
+    elif value_type is bytes:
+        out.append(_BYTES + _UINT32.pack(len(value)))
+        out.append(value)
+    else:
+        raise TypeError(f"can not encode value of type {value_type.__name__}: {value}")
+
+
+def _decode(data: memoryview, pos: int, strings: List[str]) -> Tuple[Any, int]:
+    tag = data[pos : pos + 1].tobytes()
+    pos += 1
+    if tag == _STR_REF:
+        return strings[_UINT32.unpack_from(data, pos)[0]], pos + 4
+    if tag == _STR:
+        length = _UINT32.unpack_from(data, pos)[0]
+        pos += 4
+        value = str(data[pos : pos + length], "utf-8")
+        strings.append(value)
+        return value, pos + length
+    if tag == _NONE:
+        return None, pos
+    if tag == _TRUE:
+        return True, pos
+    if tag == _FALSE:
+        return False, pos
+    if tag == _INT:
+        return _INT64.unpack_from(data, pos)[0], pos + 8
+    if tag == _FLOAT:
+        return _FLOAT64.unpack_from(data, pos)[0], pos + 8
+    if tag == _INT_ARRAY or tag == _FLOAT_ARRAY:
+        length = _UINT32.unpack_from(data, pos)[0]
+        pos += 4
+        end = pos + 8 * length
+        return _unpacked_array("q" if tag == _INT_ARRAY else "d", data[pos:end]), end
+    if tag == _STR_ARRAY:
+        num_distinct = _UINT32.unpack_from(data, pos)[0]
+        pos += 4
+        distinct = []
+        for _ in range(num_distinct):
+            item, pos = _decode(data, pos, strings)
+            distinct.append(item)
+        length = _UINT32.unpack_from(data, pos)[0]
+        pos += 4
+        end = pos + 4 * length
+        return [distinct[idx] for idx in _unpacked_array("I", data[pos:end])], end
+    if tag == _LIST or tag == _TUPLE:
+        length = _UINT32.unpack_from(data, pos)[0]
+        pos += 4
+        items = []
+        for _ in range(length):
+            item, pos = _decode(data, pos, strings)
+            items.append(item)
+        return (items if tag == _LIST else tuple(items)), pos
+    if tag == _DICT:
+        length = _UINT32.unpack_from(data, pos)[0]
+        pos += 4
+        dct = {}
+        for _ in range(length):
+            key, pos = _decode(data, pos, strings)
+            dct[key], pos = _decode(data, pos, strings)
+        return dct, pos
+    if tag == _BYTES or tag == _BIG_INT:
+        length = _UINT32.unpack_from(data, pos)[0]
+        pos += 4
+        raw = data[pos : pos + length].tobytes()
+        return (raw if tag == _BYTES else int(raw)), pos + length
+    raise ValueError(f"unknown tag {tag!r} at position {pos - 1}")
+
+
+def dumps(value: Any) -> bytes:
+    """Encodes a JSON-like value (see the module docstring). Raises a TypeError for values of any other type."""
+    out: List[bytes] = []
+    _encode(value, out, strings={})
+    return b"".join(out)
+
+
+def loads(data: bytes) -> Any:
+    """Decodes a value that was encoded with dumps()."""
+    value, pos = _decode(memoryview(data), 0, strings=[])
+    if pos != len(data):
+        raise ValueError(f"found {len(data) - pos} trailing bytes after the encoded value")
+    return value
@@ -1,21 +1,28 @@
+import bisect
+import copy
 import functools
 import logging
+from array import array
 from typing import (
     Callable,
     Counter,
     DefaultDict,
     Dict,
+    Iterable,
     List,
     MutableSequence,
     Optional,
     Sequence,
     Set,
     Tuple,
+    Union,
 )
 
+import numpy as np
 from transformers import PreTrainedTokenizer
 
 from pytorch_ie.annotations import LabeledSpan, Span
+from pytorch_ie.core.document import BaseAnnotationList
 
 TypedSpan = Tuple[int, Tuple[int, int]]
 TypedStringSpan = Tuple[str, Tuple[int, int]]
@@ -178,6 +185,9 @@ def convert_span_annotations_to_tag_sequence(
         None if special_tokens_mask[j] else "O" for j in range(len(special_tokens_mask))
     ]
     offset = partition.start if partition is not None else 0
+    if partition is not None and isinstance(spans, BaseAnnotationList):
+        # use the span index of the annotation list instead of checking each span
+        spans = spans.spans_within(partition.start, partition.end)
     for span in spans:
         if partition is not None and (span.start < partition.start or span.end > partition.end):
             continue
@@ -239,6 +249,160 @@ def has_overlap(start_end: Tuple[int, int], other_start_end: Tuple[int, int]):
     )
 
 
+# Vectorized variants of the helpers above. These operate on integer arrays of shape (N, 2) that hold the
+# (start, end) pairs of N spans, end exclusive, e.g. as created by spans_to_array().
+
+SpanArray = np.ndarray
+SpanLike = Union[Iterable[Span], Iterable[Tuple[int, int]], np.ndarray]
+
+
+def spans_to_array(spans: SpanLike) -> SpanArray:
+    """
+    Collects the (start, end) pairs of the spans, e.g. the entries of an AnnotationList, in an int64 array of
+    shape (N, 2). Arrays and (start, end) tuples are passed through (as int64).
+    """
+    if isinstance(spans, np.ndarray):
+        return spans.astype(np.int64, copy=False).reshape(-1, 2)
+    if isinstance(spans, BaseAnnotationList):
+        # this does not create annotation objects for columnar annotation lists
+        starts, ends = spans._get_starts_and_ends()
+        return np.stack([starts, ends], axis=1).astype(np.int64, copy=False)
+    return np.array(
+        [span if isinstance(span, tuple) else (span.start, span.end) for span in spans],
+        dtype=np.int64,
+    ).reshape(-1, 2)
+
+
+def containment_matrix(spans: SpanLike, other_spans: SpanLike) -> np.ndarray:
+    """
+    Returns a boolean matrix of shape (len(spans), len(other_spans)) whose entry [i, j] is True iff span i is
+    contained in other span j (see is_contained_in).
+    """
+    spans = spans_to_array(spans)
+    other_spans = spans_to_array(other_spans)
+    return (other_spans[None, :, 0] <= spans[:, None, 0]) & (
+        spans[:, None, 1] <= other_spans[None, :, 1]
+    )
+
+
+def overlap_matrix(spans: SpanLike, other_spans: SpanLike) -> np.ndarray:
+    """
+    Returns a boolean matrix of shape (len(spans), len(other_spans)) whose entry [i, j] is True iff span i and
+    other span j overlap. For non-empty spans, this is the same as has_overlap.
+    """
+    spans = spans_to_array(spans)
+    other_spans = spans_to_array(other_spans)
+    return (spans[:, None, 0] < other_spans[None, :, 1]) & (
+        other_spans[None, :, 0] < spans[:, None, 1]
+    )
+
+
+def span_distance_matrix(spans: SpanLike, other_spans: SpanLike) -> np.ndarray:
+    """
+    Returns the number of characters (or tokens) between all pairs of spans as matrix of shape
+    (len(spans), len(other_spans)). Overlapping and adjacent spans have distance 0.
+    """
+    spans = spans_to_array(spans)
+    other_spans = spans_to_array(other_spans)
+    gap_after = other_spans[None, :, 0] - spans[:, None, 1]
+    gap_before = spans[:, None, 0] - other_spans[None, :, 1]
+    return np.maximum(np.maximum(gap_after, gap_before), 0)
+
+
+def nearest_spans(
+    spans: SpanLike,
+    other_spans: SpanLike,
+    exclude_overlapping: bool = False,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds for each span the nearest other span (see span_distance_matrix). Returns the indices of the nearest
+    other spans and the respective distances. If there is no candidate (e.g. other_spans is empty), the index
+    is -1 and the distance is -1. Set exclude_overlapping to ignore overlapping other spans.
+    """
+    spans = spans_to_array(spans)
+    other_spans = spans_to_array(other_spans)
+    if len(other_spans) == 0:
+        return np.full(len(spans), -1, dtype=np.int64), np.full(len(spans), -1, dtype=np.int64)
+    distances = span_distance_matrix(spans, other_spans)
+    if exclude_overlapping:
+        distances = np.where(overlap_matrix(spans, other_spans), np.iinfo(np.int64).max, distances)
+    indices = np.argmin(distances, axis=1) if len(spans) > 0 else np.empty(0, dtype=np.int64)
+    nearest_distances = distances[np.arange(len(spans)), indices]
+    invalid = nearest_distances == np.iinfo(np.int64).max
+    indices = np.where(invalid, -1, indices)
+    nearest_distances = np.where(invalid, -1, nearest_distances)
+    return indices, nearest_distances
+
+
+def merge_spans(spans: SpanLike, merge_adjacent: bool = False) -> SpanArray:
+    """
+    Merges overlapping spans (and adjacent ones, if merge_adjacent is enabled) into their union. The result is
+    sorted by start.
+    """
+    spans = spans_to_array(spans)
+    if len(spans) == 0:
+        return spans
+    spans = spans[np.lexsort((spans[:, 1], spans[:, 0]))]
+    max_ends = np.maximum.accumulate(spans[:, 1])
+    # a span starts a new group if it does not overlap with any of the previous ones
+    if merge_adjacent:
+        starts_group = spans[1:, 0] > max_ends[:-1]
+    else:
+        starts_group = spans[1:, 0] >= max_ends[:-1]
+    group_starts = np.concatenate([[0], np.flatnonzero(starts_group) + 1])
+    group_ends = np.concatenate([group_starts[1:], [len(spans)]]) - 1
+    return np.stack([spans[group_starts, 0], max_ends[group_ends]], axis=1)
+
+
+def deduplicate_spans(spans: SpanLike) -> Tuple[SpanArray, np.ndarray]:
+    """
+    Removes duplicated (start, end) pairs. Returns the unique spans sorted by (start, end) and, for each input
+    span, the index of its unique span.
+    """
+    spans = spans_to_array(spans)
+    unique, inverse = np.unique(spans, axis=0, return_inverse=True)
+    return unique.reshape(-1, 2), inverse.reshape(-1)
+
+
+def char_to_token_indices(
+    char_indices: Union[Sequence[int], np.ndarray], token_offsets: Union[Sequence, np.ndarray]
+) -> np.ndarray:
+    """
+    Maps character positions to the indices of the tokens that contain them. The token offsets are (start, end)
+    character pairs, e.g. the offset_mapping of a tokenizer, sorted by start. Tokens without characters (e.g.
+    special tokens with offsets (0, 0)) are ignored. Positions that are not covered by any token get -1.
+    """
+    char_indices = np.asarray(char_indices, dtype=np.int64)
+    token_offsets = spans_to_array(np.asarray(token_offsets))
+    token_indices = np.flatnonzero(token_offsets[:, 1] > token_offsets[:, 0])
+    starts = token_offsets[token_indices, 0]
+    ends = token_offsets[token_indices, 1]
+    if len(starts) == 0:
+        return np.full(char_indices.shape, -1, dtype=np.int64)
+    positions = np.searchsorted(starts, char_indices, side="right") - 1
+    clipped_positions = np.clip(positions, 0, len(starts) - 1)
+    valid = (positions >= 0) & (char_indices < ends[clipped_positions])
+    return np.where(valid, token_indices[clipped_positions], -1)
+
+
+def spans_to_token_slices(
+    spans: SpanLike,
+    token_offsets: Union[Sequence, np.ndarray],
+    character_offset: int = 0,
+) -> np.ndarray:
+    """
+    Vectorized version of get_token_slice: maps the character spans to (start, end) token slices, end exclusive.
+    Spans whose first or last character is not covered by a token get (-1, -1).
+    """
+    spans = spans_to_array(spans) - character_offset
+    start_tokens = char_to_token_indices(spans[:, 0], token_offsets)
+    before_end_tokens = char_to_token_indices(spans[:, 1] - 1, token_offsets)
+    valid = (start_tokens >= 0) & (before_end_tokens >= 0)
+    token_slices = np.stack([start_tokens, before_end_tokens + 1], axis=1)
+    token_slices[~valid] = -1
+    return token_slices
+
+
 def _char_to_token_mapper(
     char_idx: int,
     char_to_token_mapping: Dict[int, int],
@@ -267,6 +431,82 @@ def get_char_to_token_mapper(
     )
 
 
+class CharToTokenMapper:
+    """
+    A memory efficient alternative to get_char_to_token_mapper(): instead of one dict entry per character, this
+    keeps the token offsets in compact arrays sorted by start and looks up the token of a character with binary
+    search. The offsets of a whole document can be shared by the mappers of all its windows: the token range
+    [token_start, token_end) selects the tokens of the window and token_offset is added to the result, e.g. the
+    number of special tokens that precede the first token of the window.
+
+    Like the mappers created by get_char_to_token_mapper(), it returns -1 for positions before char_start,
+    -2 for positions at or after char_end and None for positions that are not covered by a token.
+    """
+
+    def __init__(
+        self,
+        token_offsets: Sequence[Tuple[int, int]],
+        char_start: Optional[int] = None,
+        char_end: Optional[int] = None,
+        token_start: int = 0,
+        token_end: Optional[int] = None,
+        token_offset: int = 0,
+    ):
+        # tokens without characters, e.g. special tokens with offsets (0, 0), are not mapped to
+        self._token_indices = array(
+            "q", (idx for idx, (start, end) in enumerate(token_offsets) if start < end)
+        )
+        self._starts = array("q", (token_offsets[idx][0] for idx in self._token_indices))
+        self._ends = array("q", (token_offsets[idx][1] for idx in self._token_indices))
+        self.char_start = char_start
+        self.char_end = char_end
+        self.token_start = token_start
+        self.token_end = token_end
+        self.token_offset = token_offset
+
+    def with_window(
+        self,
+        token_start: int,
+        token_end: int,
+        token_offset: int = 0,
+        char_start: Optional[int] = None,
+        char_end: Optional[int] = None,
+    ) -> "CharToTokenMapper":
+        """Creates a mapper for a window of the tokens that shares the offset arrays with this one."""
+        result = copy.copy(self)
+        result.char_start = char_start
+        result.char_end = char_end
+        result.token_start = token_start
+        result.token_end = token_end
+        result.token_offset = token_offset
+        return result
+
+    def __call__(self, char_idx: int) -> Optional[int]:
+        if self.char_start is not None and char_idx < self.char_start:
+            # return negative number to encode out-ot-window
+            return -1
+        if self.char_end is not None and char_idx >= self.char_end:
+            # return negative number to encode out-ot-window
+            return -2
+        position = bisect.bisect_right(self._starts, char_idx) - 1
+        if position < 0 or char_idx >= self._ends[position]:
+            return None
+        token_idx = self._token_indices[position]
+        in_window = token_idx >= self.token_start and (
+            self.token_end is None or token_idx < self.token_end
+        )
+        if not in_window:
+            return None
+        return token_idx - self.token_start + self.token_offset
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(num_tokens={len(self._token_indices)}, char_start={self.char_start}, "
+            f"char_end={self.char_end}, token_start={self.token_start}, token_end={self.token_end}, "
+            f"token_offset={self.token_offset})"
+        )
+
+
 def get_special_token_mask(token_ids_0: List[int], tokenizer: PreTrainedTokenizer) -> List[int]:
     # TODO: check why we can not just use tokenizer.get_special_tokens_mask()
     #  (this checks if token_ids_1 is not None and raises an exception)
@@ -0,0 +1,48 @@
+from typing import Any, List, Sequence
+
+from transformers import BatchEncoding, PreTrainedTokenizerBase
+
+
+def batch_tokenize(
+    tokenizer: PreTrainedTokenizerBase, texts: Sequence[str], **tokenizer_kwargs: Any
+) -> List[BatchEncoding]:
+    """
+    Tokenizes all texts with a single tokenizer call (fast tokenizers process the batch in parallel) and splits the
+    result into one BatchEncoding per text. Each of them is equivalent to the result of calling the tokenizer with
+    the respective text alone, including the character / token mapping methods such as char_to_token(). Padding is
+    not supported.
+    """
+    if tokenizer_kwargs.get("padding", False) not in (False, "do_not_pad"):
+        raise ValueError("batch_tokenize does not support padding")
+    if len(texts) == 0:
+        return []
+    batch = tokenizer(list(texts), **tokenizer_kwargs)
+    encodings = batch.encodings
+    return [
+        BatchEncoding(
+            {key: values[idx] for key, values in batch.items()},
+            encoding=encodings[idx] if encodings is not None else None,
+            n_sequences=batch.n_sequences,
+        )
+        for idx in range(len(texts))
+    ]
+
+
+def batch_tokenize_grouped(
+    tokenizer: PreTrainedTokenizerBase,
+    grouped_texts: Sequence[Sequence[str]],
+    **tokenizer_kwargs: Any,
+) -> List[List[BatchEncoding]]:
+    """
+    Like batch_tokenize, but for groups of texts, e.g. the partitions of multiple documents: all texts are tokenized
+    with a single tokenizer call and the result contains one list of BatchEncodings per group.
+    """
+    encodings = batch_tokenize(
+        tokenizer, [text for texts in grouped_texts for text in texts], **tokenizer_kwargs
+    )
+    result = []
+    start = 0
+    for texts in grouped_texts:
+        result.append(encodings[start : start + len(texts)])
+        start += len(texts)
+    return result
@@ -161,6 +161,19 @@ def test_get_reference_fields_and_container_types():
         _get_reference_fields_and_container_types(Dummy)
 
 
+def test_get_reference_fields_and_container_types_is_cached():
+    @dataclasses.dataclass(eq=True, frozen=True)
+    class Dummy(Annotation):
+        a: Span
+        b: Optional[Span]
+        c: Tuple[Span, ...]
+        d: int
+
+    reference_fields = _get_reference_fields_and_container_types(Dummy)
+    assert reference_fields == {"a": None, "b": Optional, "c": tuple}
+    assert _get_reference_fields_and_container_types(Dummy) is reference_fields
+
+
 def test_annotation_with_optional_reference():
     @dataclasses.dataclass(eq=True, frozen=True)
     class BinaryRelationWithOptionalTrigger(Annotation):
@@ -0,0 +1,416 @@
+import os
+import pickle
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Any, Iterator, List, Tuple
+
+import pytest
+from torch.utils.data import DataLoader
+from transformers import BertTokenizerFast
+
+import datasets
+from pytorch_ie.annotations import LabeledSpan
+from pytorch_ie.core import AnnotationList, TaskEncoding, TaskModule, annotation_field
+from pytorch_ie.core.taskmodule import (
+    ArrowTaskEncodingSequence,
+    IterableTaskEncodingDataset,
+    MemmapTaskEncodingDataset,
+    TaskEncodingDataset,
+    TaskEncodingSequence,
+)
+from pytorch_ie.data import IterableDataset
+from pytorch_ie.documents import TextDocument
+from pytorch_ie.taskmodules import TransformerSeq2SeqTaskModule
+
+
+@dataclass
+class ExampleDocument(TextDocument):
+    entities: AnnotationList[LabeledSpan] = annotation_field(target="text")
+
+
+class EntityTaskModule(TaskModule):
+    """Creates one task encoding per entity (entity text as input, its label as target)."""
+
+    def encode_input(self, document, is_training=False):
+        return [
+            TaskEncoding(document=document, inputs=str(entity), metadata={"entity": entity})
+            for entity in document.entities
+        ]
+
+    def encode_target(self, task_encoding):
+        label = task_encoding.metadata["entity"].label
+        # skip the entities without label to check that filtering works
+        return label if label != "" else None
+
+    def unbatch_output(self, model_output):
+        return model_output
+
+    def create_annotations_from_output(
+        self, task_encoding, task_output
+    ) -> Iterator[Tuple[str, LabeledSpan]]:
+        entity = task_encoding.metadata["entity"]
+        yield "entities", LabeledSpan(start=entity.start, end=entity.end, label=task_output)
+
+    def collate(self, task_encodings):
+        return [task_encoding.inputs for task_encoding in task_encodings]
+
+
+def get_documents() -> List[ExampleDocument]:
+    documents = []
+    for i in range(10):
+        document = ExampleDocument(text=f"Document {i} is about document {i}.")
+        for j in range(i % 3):
+            document.entities.append(LabeledSpan(start=0, end=8, label=f"label-{i}-{j}"))
+        document.entities.append(LabeledSpan(start=9, end=10 + i // 10, label=""))
+        documents.append(document)
+    return documents
+
+
+def _as_tuples(task_encodings) -> List[Tuple[Any, ...]]:
+    return [
+        (
+            id(task_encoding.document),
+            task_encoding.inputs,
+            task_encoding.targets if task_encoding.has_targets else None,
+            id(task_encoding.metadata["entity"]),
+        )
+        for task_encoding in task_encodings
+    ]
+
+
+def test_encode_with_num_workers():
+    documents = get_documents()
+    taskmodule = EntityTaskModule()
+
+    expected = taskmodule.encode(documents)
+    encodings = taskmodule.encode(documents, num_workers=2, document_batch_size=4)
+    assert isinstance(encodings, TaskEncodingSequence)
+    assert len(encodings) == 19
+    # the task encodings refer to the original documents and annotations
+    assert _as_tuples(encodings) == _as_tuples(expected)
+    assert [id(doc) for doc in encodings.documents_in_order] == [id(doc) for doc in documents]
+
+    expected = taskmodule.encode(documents, encode_target=True)
+    encodings = taskmodule.encode(documents, encode_target=True, num_workers=2)
+    assert len(encodings) == 9
+    assert _as_tuples(encodings) == _as_tuples(expected)
+
+    encodings = taskmodule.encode(
+        documents, encode_target=True, num_workers=2, as_iterator=True, document_batch_size=3
+    )
+    assert _as_tuples(list(encodings)) == _as_tuples(expected)
+
+    task_encodings, documents_in_order = taskmodule.batch_encode(
+        documents, encode_target=False, num_workers=2
+    )
+    assert documents_in_order == documents
+    assert len(task_encodings) == 19
+
+    # decoding adds the predictions to the original documents
+    taskmodule.decode(task_encodings, ["prediction"] * len(task_encodings))
+    assert [len(document.entities.predictions) for document in documents] == [
+        len(document.entities) for document in documents
+    ]
+
+
+def test_encode_with_cache_dir(tmp_path, monkeypatch):
+    documents = get_documents()
+    taskmodule = EntityTaskModule()
+    expected = taskmodule.encode(documents, encode_target=True)
+
+    encodings = taskmodule.encode(documents, encode_target=True, cache_dir=str(tmp_path))
+    assert isinstance(encodings, ArrowTaskEncodingSequence)
+    assert len(list(tmp_path.iterdir())) == 1
+    assert [
+        (id(task_encoding.document), task_encoding.inputs, task_encoding.targets)
+        for task_encoding in encodings
+    ] == [
+        (id(task_encoding.document), task_encoding.inputs, task_encoding.targets)
+        for task_encoding in expected
+    ]
+
+    # the second call loads the task encodings from the cache
+    def fail(*args, **kwargs):
+        raise AssertionError("the documents should not be encoded again")
+
+    monkeypatch.setattr(taskmodule, "encode_input", fail)
+    dataset = taskmodule.encode(
+        documents, encode_target=True, as_dataset=True, cache_dir=str(tmp_path)
+    )
+    assert isinstance(dataset, MemmapTaskEncodingDataset)
+    assert [task_encoding.targets for task_encoding in dataset[2:5]] == [
+        task_encoding.targets for task_encoding in expected[2:5]
+    ]
+    assert dataset[-1].targets == expected[-1].targets
+    assert dataset[0].metadata == {}
+
+    # the cached encodings can be pickled (e.g. for DataLoader workers) without copying the data
+    restored = pickle.loads(pickle.dumps(encodings))
+    assert [task_encoding.targets for task_encoding in restored] == [
+        task_encoding.targets for task_encoding in expected
+    ]
+
+    # changed documents get a new cache entry
+    monkeypatch.undo()
+    documents[0].entities.append(LabeledSpan(start=0, end=8, label="new"))
+    encodings = taskmodule.encode(documents, encode_target=True, cache_dir=str(tmp_path))
+    assert len(encodings) == len(expected) + 1
+    assert len(list(tmp_path.iterdir())) == 2
+
+    # documents with values that are not supported by Document.to_bytes() can be cached as well
+    documents[1].metadata["tags"] = {"a", "b"}
+    encodings = taskmodule.encode(documents, encode_target=True, cache_dir=str(tmp_path))
+    assert len(encodings) == len(expected) + 1
+    assert len(list(tmp_path.iterdir())) == 3
+
+    with pytest.raises(ValueError, match="requires encode_target=True"):
+        taskmodule.encode(documents, cache_dir=str(tmp_path))
+
+
+FINGERPRINT_SCRIPT = """
+import dataclasses
+
+from pytorch_ie.annotations import BinaryRelation, LabeledSpan
+from pytorch_ie.core import AnnotationList, TaskModule, annotation_field
+from pytorch_ie.core.taskmodule import _fingerprint_documents, _fingerprint_taskmodule
+from pytorch_ie.documents import TextDocument
+
+
+@dataclasses.dataclass
+class RelationDocument(TextDocument):
+    entities: AnnotationList[LabeledSpan] = annotation_field(target="text")
+    relations: AnnotationList[BinaryRelation] = annotation_field(target="entities")
+
+
+class Options:
+    def __init__(self):
+        self.lowercase = True
+
+
+class LabelTaskModule(TaskModule):
+    def __init__(self, labels, options, **kwargs):
+        super().__init__(**kwargs)
+        self.save_hyperparameters()
+
+    encode_input = encode_target = unbatch_output = create_annotations_from_output = collate = None
+
+
+document = RelationDocument(text="Jane lives in Berlin.")
+document.entities.extend([LabeledSpan(0, 4, "PER"), LabeledSpan(14, 20, "LOC")])
+document.relations.append(BinaryRelation(*document.entities, label="lives_in"))
+document.relations.predictions.append(BinaryRelation(*document.entities, label="lives_in"))
+# sets are not supported by Document.to_bytes()
+document.metadata["tags"] = {"person", "location", "relation"}
+print(_fingerprint_documents([document]))
+# the repr() of options contains its address
+print(_fingerprint_taskmodule(LabelTaskModule(labels={"PER", "LOC", "ORG"}, options=Options())))
+"""
+
+
+@pytest.mark.slow
+def test_fingerprints_do_not_depend_on_the_hash_seed():
+    fingerprints = [
+        subprocess.run(
+            [sys.executable, "-c", FINGERPRINT_SCRIPT],
+            env={
+                **os.environ,
+                "PYTHONHASHSEED": str(seed),
+                "PYTHONPATH": os.pathsep.join(sys.path),
+            },
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+        for seed in [1, 2]
+    ]
+    assert fingerprints[0] == fingerprints[1]
+
+
+def test_memmap_task_encoding_dataset(tmp_path):
+    documents = get_documents()[:3]
+    task_encodings = [
+        TaskEncoding(
+            document=documents[2],
+            inputs={"input_ids": [101, 7, 8, 102], "attention_mask": [1, 1, 1, 1]},
+            targets=[(1, 2, 3), (2, 3, 1)],
+        ),
+        TaskEncoding(
+            document=documents[2],
+            inputs={"input_ids": [101, 102], "attention_mask": [1, 1]},
+            targets=[],
+        ),
+        # documents[1] has no task encodings
+        TaskEncoding(
+            document=documents[0],
+            inputs={"input_ids": [101, 9, 102], "attention_mask": [1, 1, 1]},
+        ),
+    ]
+    path = str(tmp_path / "task_encodings.arrow")
+    dataset = MemmapTaskEncodingDataset.from_task_encodings(path, task_encodings, documents)
+    assert isinstance(dataset, TaskEncodingDataset)
+    assert len(dataset) == 3
+    for task_encoding, expected in zip(dataset, task_encodings):
+        assert task_encoding.document is expected.document
+        assert task_encoding.inputs == expected.inputs
+        assert task_encoding.has_targets == expected.has_targets
+        if expected.has_targets:
+            assert task_encoding.targets == expected.targets
+    assert [task_encoding.inputs["input_ids"] for task_encoding in dataset[1:]] == [
+        [101, 102],
+        [101, 9, 102],
+    ]
+
+    restored = pickle.loads(pickle.dumps(MemmapTaskEncodingDataset(path, documents)))
+    assert restored[-1].inputs == task_encodings[-1].inputs
+    assert restored[-1].document == documents[0]
+
+
+def _inputs_and_targets(task_encodings) -> List[Tuple[Any, Any]]:
+    return [(task_encoding.inputs, task_encoding.targets) for task_encoding in task_encodings]
+
+
+def test_encode_as_iterator_with_prefetch(monkeypatch):
+    documents = get_documents()
+    taskmodule = EntityTaskModule()
+    expected = taskmodule.encode(documents, encode_target=True)
+
+    encodings = taskmodule.encode(
+        iter(documents), encode_target=True, document_batch_size=3, prefetch=2
+    )
+    assert isinstance(encodings, Iterator)
+    assert _as_tuples(encodings) == _as_tuples(expected)
+
+    # closing the iterator early stops the background encoding
+    encodings = taskmodule.encode(
+        iter(documents), encode_target=True, document_batch_size=1, prefetch=1
+    )
+    assert next(encodings).targets == expected[0].targets
+    encodings.close()
+
+    # exceptions are raised in the consumer
+    encode_input = taskmodule.encode_input
+
+    def encode_input_or_fail(document, is_training=False):
+        if document.text == "broken":
+            raise ValueError("can not encode the document")
+        return encode_input(document, is_training)
+
+    monkeypatch.setattr(taskmodule, "encode_input", encode_input_or_fail)
+    encodings = taskmodule.encode(
+        iter(documents + [ExampleDocument(text="broken")]),
+        encode_target=True,
+        document_batch_size=3,
+        prefetch=2,
+    )
+    with pytest.raises(ValueError, match="can not encode the document"):
+        list(encodings)
+
+
+@pytest.mark.parametrize("num_workers", [0, 2])
+def test_iterable_task_encoding_dataset_with_dataloader_workers(num_workers):
+    documents = get_documents()
+    taskmodule = EntityTaskModule()
+    expected = sorted(_inputs_and_targets(taskmodule.encode(documents, encode_target=True)))
+
+    dataset = taskmodule.encode(
+        documents, encode_target=True, as_iterator=True, as_dataset=True, document_batch_size=2
+    )
+    assert isinstance(dataset, IterableTaskEncodingDataset)
+    for _ in range(2):
+        # the dataset can be iterated multiple times (e.g. for multiple epochs) and each
+        # document is encoded by exactly one worker
+        dataloader = DataLoader(
+            dataset, batch_size=None, num_workers=num_workers, collate_fn=lambda x: x
+        )
+        assert sorted(_inputs_and_targets(dataloader)) == expected
+
+    # the task encodings of a plain IterableTaskEncodingDataset are sharded
+    dataset = IterableTaskEncodingDataset(
+        encodings=taskmodule.encode(documents, encode_target=True)
+    )
+    dataloader = DataLoader(
+        dataset, batch_size=None, num_workers=num_workers, collate_fn=lambda x: x
+    )
+    assert sorted(_inputs_and_targets(dataloader)) == expected
+
+
+def _generate_document_dicts(shards):
+    for shard in shards:
+        yield from shard
+
+
+def test_iterable_task_encoding_dataset_with_sharded_iterable_dataset():
+    documents = get_documents()
+    taskmodule = EntityTaskModule()
+    expected = sorted(_inputs_and_targets(taskmodule.encode(documents, encode_target=True)))
+
+    # the DataLoader workers get disjoint shards of the dataset and should encode all of them
+    shards = [[document.asdict() for document in documents[i : i + 3]] for i in range(0, 10, 3)]
+    hf_dataset = datasets.IterableDataset.from_generator(
+        _generate_document_dicts, gen_kwargs={"shards": shards}
+    )
+    assert hf_dataset.n_shards == 4
+    document_dataset = IterableDataset(
+        document_type=ExampleDocument, ex_iterable=hf_dataset._ex_iterable, info=hf_dataset.info
+    )
+    dataset = taskmodule.encode(
+        document_dataset,
+        encode_target=True,
+        as_iterator=True,
+        as_dataset=True,
+    )
+    dataloader = DataLoader(dataset, batch_size=None, num_workers=2, collate_fn=lambda x: x)
+    assert sorted(_inputs_and_targets(dataloader)) == expected
+
+
+class BatchedEntityTaskModule(EntityTaskModule):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.num_batched_calls = 0
+
+    def encode_inputs_batched(self, documents, is_training=False):
+        self.num_batched_calls += 1
+        return super().encode_inputs_batched(documents, is_training)
+
+
+class CustomEntityTaskModule(BatchedEntityTaskModule):
+    def encode_input(self, document, is_training=False):
+        task_encodings = super().encode_input(document, is_training)
+        for task_encoding in task_encodings:
+            task_encoding.inputs = task_encoding.inputs.upper()
+        return task_encodings
+
+
+def test_encode_inputs_with_overridden_encode_input():
+    taskmodule = BatchedEntityTaskModule()
+    expected = [task_encoding.inputs for task_encoding in taskmodule.encode(get_documents())]
+    assert taskmodule.num_batched_calls == 1
+
+    # the batched encoding would bypass the overridden encode_input(), so it is not used
+    taskmodule = CustomEntityTaskModule()
+    encodings = taskmodule.encode(get_documents())
+    assert taskmodule.num_batched_calls == 0
+    assert [task_encoding.inputs for task_encoding in encodings] == [
+        inputs.upper() for inputs in expected
+    ]
+
+
+def test_encode_inputs_with_overridden_encode_text(tmp_path):
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "document", "is", "about", "."]
+    vocab_file = tmp_path / "vocab.txt"
+    vocab_file.write_text("\n".join(vocab) + "\n")
+    tokenizer = BertTokenizerFast(vocab_file=str(vocab_file), do_lower_case=False)
+    tokenizer.save_pretrained(str(tmp_path / "tokenizer"))
+
+    class CustomSeq2SeqTaskModule(TransformerSeq2SeqTaskModule):
+        def encode_text(self, text):
+            return super().encode_text(text.lower())
+
+    documents = get_documents()
+    encodings = TransformerSeq2SeqTaskModule(str(tmp_path / "tokenizer")).encode(documents)
+    assert encodings[0].inputs["input_ids"][1] == 1
+    encodings = CustomSeq2SeqTaskModule(str(tmp_path / "tokenizer")).encode(documents)
+    assert len(encodings) == len(documents)
+    # "Document" is only in the vocabulary when lowercased
+    assert encodings[0].inputs["input_ids"][1] == 5
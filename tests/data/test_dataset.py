@@ -3,6 +3,7 @@ from dataclasses import dataclass
 from typing import Dict, Sequence
 
 import numpy
+import pyarrow as pa
 import pytest
 import torch
 
@@ -15,6 +16,7 @@ from pytorch_ie.core.taskmodule import (
     TaskEncodingDataset,
     TaskEncodingSequence,
 )
+from pytorch_ie.data import ArrowDocumentView
 from pytorch_ie.documents import TextDocument
 from pytorch_ie.taskmodules import TransformerSpanClassificationTaskModule
 
@@ -76,6 +78,47 @@ def test_dataset_index(dataset):
     assert [doc.id for doc in train_dataset[2:5]] == ["train_doc3", "train_doc4", "train_doc5"]
 
 
+def test_dataset_lazy_documents(dataset):
+    train_dataset = dataset["train"]
+    expected_documents = list(train_dataset)
+
+    train_dataset.set_lazy_documents()
+    doc = train_dataset[4]
+    assert isinstance(doc, ArrowDocumentView)
+    assert doc.id == "train_doc5"
+    assert doc._decoded_annotation_fields == set()
+    # accessing the relations also decodes the entities they refer to, but not the sentences
+    assert len(doc.relations) == 3
+    assert doc._decoded_annotation_fields == {"entities", "relations"}
+    assert any(entity is doc.relations[0].head for entity in doc.entities)
+    assert len(doc["sentences"]) == len(expected_documents[4].sentences)
+    assert str(doc.sentences[1]) == "Entity G works at H."
+    assert doc.to_document() == expected_documents[4]
+    assert doc.asdict() == expected_documents[4].asdict()
+
+    views = train_dataset[2:5]
+    assert all(isinstance(view, ArrowDocumentView) for view in views)
+    assert [view.id for view in views] == ["train_doc3", "train_doc4", "train_doc5"]
+    assert list(train_dataset) == expected_documents
+
+    train_dataset.set_lazy_documents(False)
+    assert not isinstance(train_dataset[4], ArrowDocumentView)
+    assert train_dataset[4] == expected_documents[4]
+
+
+def test_document_view_missing_field_values():
+    # the row has no metadata and a null id
+    row = {"text": "Jane lives in Berlin.", "id": None}
+    view = ArrowDocumentView(TextDocument, pa.Table.from_pylist([row]))
+    document = TextDocument.fromdict(row)
+    for field in TextDocument.fields():
+        assert getattr(view, field.name) == getattr(document, field.name)
+    assert view.metadata == {}
+    # the default value is the one of the document
+    view.metadata["a"] = 1
+    assert view.to_document().metadata == {"a": 1}
+
+
 def test_dataset_map(maybe_iterable_dataset):
     train_dataset = maybe_iterable_dataset["train"]
 
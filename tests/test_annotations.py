@@ -1,4 +1,9 @@
+import copy
+import dataclasses
+import pickle
 import re
+import weakref
+from typing import Tuple
 
 import pytest
 
@@ -13,6 +18,7 @@ from pytorch_ie.annotations import (
     MultiLabeledSpan,
     Span,
 )
+from pytorch_ie.core import with_slots
 from tests.core.test_document import _test_annotation_reconstruction
 
 
@@ -264,3 +270,83 @@ def test_multilabeled_binary_relation():
         MultiLabeledBinaryRelation(
             head=head, tail=tail, label=("label5", "label6"), score=(0.1, 0.2, 0.3)
         )
+
+
+@pytest.mark.parametrize(
+    "annotation",
+    [
+        Label(label="label1"),
+        MultiLabel(label=("label1", "label2")),
+        Span(start=0, end=4),
+        LabeledSpan(start=0, end=4, label="PER"),
+        MultiLabeledSpan(start=0, end=4, label=("PER",)),
+        LabeledMultiSpan(slices=((0, 4),), label="PER"),
+        MultiLabeledMultiSpan(slices=((0, 4),), label=("PER",)),
+        BinaryRelation(head=Span(0, 4), tail=Span(14, 20), label="lives_in"),
+        MultiLabeledBinaryRelation(head=Span(0, 4), tail=Span(14, 20), label=("lives_in",)),
+    ],
+)
+def test_annotations_use_slots(annotation):
+    assert not hasattr(annotation, "__dict__")
+    assert weakref.ref(annotation)() is annotation
+    assert annotation._targets is None
+    assert pickle.loads(pickle.dumps(annotation)) == annotation
+    assert copy.copy(annotation) == annotation
+
+
+def test_with_slots():
+    @with_slots
+    @dataclasses.dataclass(eq=True, frozen=True)
+    class TaggedSpan(Span):
+        tags: Tuple[str, ...] = dataclasses.field(default_factory=tuple)
+        label: str = "default"
+
+        def __post_init__(self) -> None:
+            if not isinstance(self.tags, tuple):
+                object.__setattr__(self, "tags", tuple(self.tags))
+
+        def __str__(self) -> str:
+            return f"{super().__str__()} ({self.label})"
+
+    span = TaggedSpan(start=0, end=4, tags=["a", "b"])
+    assert not hasattr(span, "__dict__")
+    assert weakref.ref(span)() is span
+    assert span.tags == ("a", "b")
+    assert span.label == "default"
+    assert TaggedSpan(start=0, end=4).tags == ()
+    assert span == TaggedSpan(0, 4, ("a", "b"), "default")
+    assert dataclasses.replace(span, label="PER").label == "PER"
+    assert str(span) == " (default)"
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        span.label = "PER"  # type: ignore
+    with pytest.raises(TypeError, match="missing 1 required positional argument: 'end'"):
+        TaggedSpan(start=0)  # type: ignore
+
+
+def test_annotation_hash_cache_is_not_a_dataclass_field():
+    span = LabeledSpan(start=0, end=4, label="PER")
+    # cache the hash
+    hash(span)
+    assert {field.name for field in dataclasses.fields(span)} == {
+        "_targets",
+        "start",
+        "end",
+        "label",
+        "score",
+    }
+    assert "_hash" not in dataclasses.asdict(span)
+    span_replaced = dataclasses.replace(span, start=1)
+    assert hash(span_replaced) == hash(LabeledSpan(start=1, end=4, label="PER"))
+    assert hash(span_replaced) != hash(span)
+
+
+def test_label_validation():
+    with pytest.raises(ValueError, match="label must be a single string."):
+        LabeledSpan(start=0, end=4, label=("PER",))  # type: ignore
+    with pytest.raises(ValueError, match="score must be a single float."):
+        LabeledSpan(start=0, end=4, label="PER", score=1)
+    span = MultiLabeledSpan(start=0, end=4, label=["PER", "LOC"])  # type: ignore
+    assert span.label == ("PER", "LOC")
+    assert span.score == (1.0, 1.0)
+    with pytest.raises(ValueError, match=re.escape("Number of labels (2) and scores (1)")):
+        MultiLabeledSpan(start=0, end=4, label=("PER", "LOC"), score=(1.0,))
@@ -1,11 +1,20 @@
+import copy
 import dataclasses
+import pickle
 import re
 
 import pytest
 
-from pytorch_ie.annotations import BinaryRelation, Label, LabeledSpan, Span
+from pytorch_ie.annotations import BinaryRelation, Label, LabeledSpan, MultiLabel, Span
 from pytorch_ie.core import AnnotationList, annotation_field
-from pytorch_ie.core.document import Annotation, Document, _enumerate_dependencies
+from pytorch_ie.core.document import (
+    Annotation,
+    ColumnarAnnotationList,
+    ColumnarBaseAnnotationList,
+    Document,
+    _enumerate_dependencies,
+    _get_document_schema,
+)
 from pytorch_ie.documents import TextDocument
 
 
@@ -171,6 +180,311 @@ def test_document_with_same_annotations():
     assert doc == doc_reconstructed
 
 
+def test_document_with_predictions_referencing_predictions():
+    @dataclasses.dataclass
+    class TestDocument(TextDocument):
+        entities: AnnotationList[LabeledSpan] = annotation_field(target="text")
+        relations: AnnotationList[BinaryRelation] = annotation_field(target="entities")
+
+    document = TestDocument(text="Jane lives in Berlin.")
+    jane = LabeledSpan(start=0, end=4, label="PER")
+    berlin = LabeledSpan(start=14, end=20, label="LOC")
+    predicted_jane = LabeledSpan(start=0, end=4, label="PER", score=0.9)
+    document.entities.append(jane)
+    document.entities.predictions.extend([predicted_jane, berlin])
+    # the predicted relation references a gold and a predicted entity
+    document.relations.predictions.append(
+        BinaryRelation(head=jane, tail=berlin, label="lives_in", score=0.5)
+    )
+    document.relations.predictions.append(
+        BinaryRelation(head=predicted_jane, tail=berlin, label="lives_in", score=0.4)
+    )
+
+    document_reconstructed = TestDocument.fromdict(document.asdict())
+    assert document_reconstructed == document
+    relations = document_reconstructed.relations.predictions
+    assert relations[0].head is document_reconstructed.entities[0]
+    assert relations[0].tail is document_reconstructed.entities.predictions[1]
+    assert relations[1].head is document_reconstructed.entities.predictions[0]
+
+
+def test_document_copy():
+    @dataclasses.dataclass
+    class TestDocument(TextDocument):
+        entities: AnnotationList[LabeledSpan] = annotation_field(target="text")
+        relations: AnnotationList[BinaryRelation] = annotation_field(target="entities")
+
+    document = TestDocument(text="Jane lives in Berlin.", id="doc1", metadata={"a": [1]})
+    jane = LabeledSpan(start=0, end=4, label="PER")
+    berlin = LabeledSpan(start=14, end=20, label="LOC")
+    document.entities.extend([jane, berlin])
+    document.relations.append(BinaryRelation(head=jane, tail=berlin, label="lives_in"))
+    document.entities.predictions.append(LabeledSpan(start=5, end=10, label="X", score=0.1))
+
+    document_copy = document.copy()
+    assert document_copy == document
+    assert document_copy.text is document.text
+    assert document_copy.metadata is not document.metadata
+    assert document_copy.metadata["a"] is not document.metadata["a"]
+    assert document_copy.entities[0] is not jane
+    assert document_copy.entities[0].target is document.text
+    relation_copy = document_copy.relations[0]
+    assert relation_copy.target is document_copy.entities
+    assert relation_copy.head is document_copy.entities[0]
+    assert relation_copy.tail is document_copy.entities[1]
+    # the original document is not modified
+    assert document.relations[0].target is document.entities
+    assert document.relations[0].head is jane
+
+    document_copy.relations.predictions.append(
+        BinaryRelation(head=document_copy.entities[1], tail=document_copy.entities[0], label="x")
+    )
+    assert len(document.relations.predictions) == 0
+
+    document_without_predictions = document.copy(with_predictions=False)
+    assert len(document_without_predictions.entities) == 2
+    assert len(document_without_predictions.entities.predictions) == 0
+
+    document_without_annotations = document.copy(with_annotations=False)
+    assert len(document_without_annotations.entities) == 0
+    assert len(document_without_annotations.relations) == 0
+    assert list(document_without_annotations.entities.predictions) == list(
+        document.entities.predictions
+    )
+
+    # a predicted relation between gold entities can not be copied without the gold entities
+    document.relations.predictions.append(BinaryRelation(head=jane, tail=berlin, label="x"))
+    with pytest.raises(ValueError, match="references the annotation .* which is not copied"):
+        document.copy(with_annotations=False)
+    document_copy = document.copy(with_predictions=False)
+    assert len(document_copy.relations.predictions) == 0
+    document_copy = document.copy()
+    assert document_copy.relations.predictions[0].head is document_copy.entities[0]
+    assert type(document_copy).fromdict(document_copy.asdict()) == document_copy
+
+
+@dataclasses.dataclass
+class RelationDocument(TextDocument):
+    entities: AnnotationList[LabeledSpan] = annotation_field(target="text")
+    relations: AnnotationList[BinaryRelation] = annotation_field(target="entities")
+
+
+def test_document_pickle_keeps_annotation_identity():
+    document = RelationDocument(text="Jane lives in Berlin.")
+    document.entities.append(LabeledSpan(start=0, end=4, label="PER"))
+    document.entities.append(LabeledSpan(start=14, end=20, label="LOC"))
+    document.relations.append(
+        BinaryRelation(head=document.entities[0], tail=document.entities[1], label="lives_in")
+    )
+
+    for document_copy, entity_copy in [
+        pickle.loads(pickle.dumps((document, document.entities[0]))),
+        copy.deepcopy((document, document.entities[0])),
+    ]:
+        assert document_copy == document
+        assert entity_copy is document_copy.entities[0]
+        assert document_copy.relations[0].head is entity_copy
+        # the annotations referenced from outside the document can be used in new annotations
+        document_copy.relations.predictions.append(
+            BinaryRelation(head=document_copy.entities[1], tail=entity_copy, label="x")
+        )
+        assert RelationDocument.from_bytes(document_copy.to_bytes()) == document_copy
+        assert pickle.loads(pickle.dumps(document_copy)) == document_copy
+
+
+def test_document_to_bytes():
+    @dataclasses.dataclass
+    class TestDocument(TextDocument):
+        entities: AnnotationList[LabeledSpan] = annotation_field(target="text")
+        columnar_entities: AnnotationList[LabeledSpan] = annotation_field(
+            target="text", columnar=True
+        )
+        relations: AnnotationList[BinaryRelation] = annotation_field(target="entities")
+
+    document = TestDocument(text="Jane lives in Berlin.", id="doc1", metadata={"a": (1, 2)})
+    jane = LabeledSpan(start=0, end=4, label="PER")
+    berlin = LabeledSpan(start=14, end=20, label="LOC")
+    document.entities.extend([jane, berlin])
+    document.relations.append(BinaryRelation(head=jane, tail=berlin, label="lives_in"))
+    # this prediction is equal to jane, but a different object
+    document.entities.predictions.append(LabeledSpan(start=0, end=4, label="PER"))
+    document.relations.predictions.append(
+        BinaryRelation(head=document.entities.predictions[0], tail=berlin, label="lives_in")
+    )
+    document.columnar_entities.append(LabeledSpan(start=5, end=10, label="X", score=0.1))
+
+    data = document.to_bytes()
+    assert isinstance(data, bytes)
+    document_reconstructed = TestDocument.from_bytes(data)
+    assert document_reconstructed == document
+    assert document_reconstructed.asdict() == document.asdict()
+    assert document_reconstructed.metadata == {"a": (1, 2)}
+    relation_prediction = document_reconstructed.relations.predictions[0]
+    assert relation_prediction.head is document_reconstructed.entities.predictions[0]
+    assert relation_prediction.tail is document_reconstructed.entities[1]
+
+    # values that are not supported by the binary format
+    document.metadata["a"] = {1, 2}
+    with pytest.raises(TypeError, match="can not encode value of type set"):
+        document.to_bytes()
+    assert copy.deepcopy(document) == document
+
+    with pytest.raises(ValueError, match="the data was not created with Document.to_bytes()"):
+        TestDocument.from_bytes(b"{}")
+
+
+def test_document_interns_labels():
+    @dataclasses.dataclass
+    class TestDocument(TextDocument):
+        entities: AnnotationList[LabeledSpan] = annotation_field(target="text")
+        labels: AnnotationList[MultiLabel] = annotation_field()
+
+    # build the labels at runtime to get distinct string objects
+    def make_document(text: str) -> TestDocument:
+        document = TestDocument(text=text)
+        document.entities.append(LabeledSpan(start=0, end=4, label="".join(["P", "E", "R"])))
+        document.entities.predictions.append(
+            LabeledSpan(start=0, end=4, label="".join(["P", "E", "R"]))
+        )
+        document.labels.append(MultiLabel(label=("".join(["a", "b"]),)))
+        return document
+
+    document1 = make_document("Jane lives in Berlin.")
+    document2 = make_document("John lives in Paris.")
+    assert document1.entities[0].label is not document2.entities[0].label
+
+    for deserialize in [
+        lambda document: TestDocument.fromdict(document.asdict()),
+        lambda document: TestDocument.from_bytes(document.to_bytes()),
+    ]:
+        reconstructed1 = deserialize(document1)
+        reconstructed2 = deserialize(document2)
+        assert reconstructed1 == document1
+        assert reconstructed1.entities[0].label is reconstructed2.entities[0].label
+        assert reconstructed1.entities[0].label is reconstructed2.entities.predictions[0].label
+        assert reconstructed1.labels[0].label[0] is reconstructed2.labels[0].label[0]
+
+
+def test_document_delta():
+    @dataclasses.dataclass
+    class TestDocument(TextDocument):
+        entities: AnnotationList[LabeledSpan] = annotation_field(target="text")
+        relations: AnnotationList[BinaryRelation] = annotation_field(target="entities")
+
+    document = TestDocument(text="Jane lives in Berlin and works in Paris.", id="doc1")
+    jane = LabeledSpan(start=0, end=4, label="PER")
+    berlin = LabeledSpan(start=14, end=20, label="LOC")
+    paris = LabeledSpan(start=34, end=39, label="LOC")
+    document.entities.extend([jane, berlin, paris])
+    document.relations.append(BinaryRelation(head=jane, tail=berlin, label="lives_in"))
+
+    stored = document.asdict()
+    document = TestDocument.fromdict(stored)
+    assert document.asdict_delta() == {}
+    assert not document.entities.is_changed
+
+    # add predictions that reference unchanged annotations and other predictions
+    predicted_paris = LabeledSpan(start=34, end=39, label="LOC", score=0.9)
+    document.entities.predictions.append(predicted_paris)
+    document.relations.predictions.append(
+        BinaryRelation(head=document.entities[0], tail=predicted_paris, label="works_in")
+    )
+    document.relations.predictions.append(
+        BinaryRelation(head=document.entities[0], tail=document.entities[1], label="x")
+    )
+    document.relations.predictions.pop()
+    # remove an unchanged annotation
+    document.entities.pop(2)
+    assert document.entities.is_changed
+
+    delta = document.asdict_delta()
+    assert set(delta) == {"entities", "relations"}
+    assert delta["entities"]["annotations"] == {"cleared": False, "removed": [2], "added": []}
+    assert "annotations" not in delta["relations"]
+    added_relations = delta["relations"]["predictions"]["added"]
+    assert len(added_relations) == 1
+    assert added_relations[0]["head"] == {"field": "entities", "predictions": False, "index": 0}
+    assert added_relations[0]["tail"] == delta["entities"]["predictions"]["added"][0]["_id"]
+
+    stored_document = TestDocument.fromdict(stored)
+    stored_document.apply_delta(delta)
+    assert stored_document == document
+    relation = stored_document.relations.predictions[0]
+    assert relation.head is stored_document.entities[0]
+    assert relation.tail is stored_document.entities.predictions[0]
+
+    document.checkpoint()
+    assert document.asdict_delta() == {}
+    document.relations.clear()
+    assert document.asdict_delta() == {
+        "relations": {"annotations": {"cleared": True, "removed": [], "added": []}}
+    }
+    stored_document.apply_delta(document.asdict_delta())
+    assert stored_document == document
+
+    # without any unchanged annotations, all references point to added ones
+    document = TestDocument(text="Jane lives in Berlin and works in Paris.", id="doc2")
+    entities = [
+        LabeledSpan(start=0, end=4, label="PER"),
+        LabeledSpan(start=14, end=20, label="LOC"),
+        LabeledSpan(start=34, end=39, label="LOC"),
+    ]
+    document.entities.extend(entities)
+    document.relations.append(BinaryRelation(head=entities[0], tail=entities[1], label="x"))
+    document.relations.append(BinaryRelation(head=entities[0], tail=entities[2], label="y"))
+    delta = document.asdict_delta()
+    stored_document = TestDocument(text=document.text, id="doc2")
+    stored_document.apply_delta(delta)
+    assert stored_document == document
+
+
+def test_document_with_allocated_annotation_ids():
+    @dataclasses.dataclass
+    class TestDocument(TextDocument):
+        entities: AnnotationList[LabeledSpan] = annotation_field(target="text")
+        relations: AnnotationList[BinaryRelation] = annotation_field(target="entities")
+
+        ALLOCATE_ANNOTATION_IDS = True
+
+    document = TestDocument(text="Jane lives in Berlin.")
+    jane = LabeledSpan(start=0, end=4, label="PER")
+    berlin = LabeledSpan(start=14, end=20, label="LOC")
+    document.entities.extend([jane, berlin])
+    # a prediction that is equal to an annotation
+    predicted_berlin = LabeledSpan(start=14, end=20, label="LOC")
+    document.entities.predictions.append(predicted_berlin)
+    relation = BinaryRelation(head=jane, tail=predicted_berlin, label="lives_in")
+    document.relations.predictions.append(relation)
+    assert [jane._id, berlin._id, predicted_berlin._id, relation._id] == [0, 1, 2, 3]
+
+    document_dict = document.asdict()
+    assert document_dict["relations"]["predictions"][0]["head"] == 0
+    assert document_dict["relations"]["predictions"][0]["tail"] == 2
+    document_reconstructed = TestDocument.fromdict(document_dict)
+    assert document_reconstructed == document
+    assert document_reconstructed.asdict() == document_dict
+    reconstructed_relation = document_reconstructed.relations.predictions[0]
+    assert reconstructed_relation.tail is document_reconstructed.entities.predictions[0]
+
+    # the allocated id is removed when the annotation is removed from the document
+    document.entities.predictions.pop(0)
+    assert predicted_berlin._id == hash(predicted_berlin)
+
+
+def test_annotation_hash_is_cached():
+    head = LabeledSpan(start=0, end=4, label="PER")
+    tail = LabeledSpan(start=14, end=20, label="LOC")
+    relation = BinaryRelation(head=head, tail=tail, label="lives_in")
+    assert hash(relation) == hash((head, tail, "lives_in", 1.0))
+    assert relation._hash == hash(relation)
+    assert hash(head) == hash((0, 4, "PER", 1.0))
+
+    # the cached hash is not pickled
+    relation_unpickled = pickle.loads(pickle.dumps(relation))
+    assert relation_unpickled._hash is None
+    assert relation_unpickled == relation
+
+
 def test_as_type():
     @dataclasses.dataclass
     class TestDocument1(TextDocument):
@@ -212,6 +526,46 @@ def test_as_type():
     assert len(document3.relations) == 1
 
 
+def test_document_schema():
+    @dataclasses.dataclass
+    class TestDocument(TextDocument):
+        sentences: AnnotationList[Span] = annotation_field(target="text")
+        relations: AnnotationList[BinaryRelation] = annotation_field(target="entities")
+        entities: AnnotationList[LabeledSpan] = annotation_field(target="text", columnar=True)
+        label: AnnotationList[Label] = annotation_field()
+
+    schema = _get_document_schema(TestDocument)
+    # the schema is computed only once per document type
+    assert _get_document_schema(TestDocument) is schema
+
+    assert [field.name for field in schema.fields] == [
+        "text",
+        "id",
+        "metadata",
+        "sentences",
+        "relations",
+        "entities",
+        "label",
+    ]
+    assert schema.init_field_names == ("text", "id", "metadata")
+    assert [field_schema.name for field_schema in schema.dependency_ordered_annotation_fields] == [
+        "sentences",
+        "entities",
+        "relations",
+        "label",
+    ]
+    entities_schema = schema.dependency_ordered_annotation_fields[1]
+    assert entities_schema.annotation_type is LabeledSpan
+    assert entities_schema.targets == ("text",)
+    assert entities_schema.columnar
+    assert schema.annotation_graph == {
+        "sentences": ("text",),
+        "relations": ("entities",),
+        "entities": ("text",),
+        "_artificial_root": ("sentences", "relations", "label"),
+    }
+
+
 def test_enumerate_dependencies():
     # annotation field -> targets
     graph = {"a": ["b"], "b": ["c"], "d": ["c", "a"], "e": ["f"], "g": ["e"], "h": ["e"]}
@@ -504,3 +858,153 @@ def test_annotation_list_artificial_root_error():
         ),
     ):
         doc = TestDocument(text="text1")
+
+
+def test_columnar_annotation_list():
+    @dataclasses.dataclass
+    class TestDocument(TextDocument):
+        entities: AnnotationList[LabeledSpan] = annotation_field(target="text", columnar=True)
+        relations: AnnotationList[BinaryRelation] = annotation_field(target="entities")
+
+    document = TestDocument(text="Entity A works at B.")
+    assert isinstance(document.entities, ColumnarAnnotationList)
+    assert isinstance(document.entities.predictions, ColumnarBaseAnnotationList)
+
+    entity1 = LabeledSpan(start=0, end=8, label="PER")
+    entity2 = LabeledSpan(start=18, end=19, label="ORG", score=0.5)
+    document.entities.append(entity1)
+    document.entities.append(entity2)
+    assert len(document.entities) == 2
+    assert document.entities[0] == entity1
+    assert document.entities[-1] == entity2
+    assert list(document.entities) == [entity1, entity2]
+    assert document.entities[1:] == [entity2]
+    assert str(document.entities[0]) == "Entity A"
+    assert document.entities[0].target == document.text
+    # the annotations are not stored as objects, so each access creates a new one
+    assert document.entities[0] is not document.entities[0]
+    with pytest.raises(IndexError):
+        document.entities[2]
+
+    assert document.entities.column("start").tolist() == [0, 18]
+    assert document.entities.column("score").tolist() == [1.0, 0.5]
+    assert document.entities.vocabulary("label") == ["PER", "ORG"]
+    assert document.entities.column("label").tolist() == [0, 1]
+    mask = document.entities.column("end") - document.entities.column("start") > 1
+    assert document.entities.select(mask) == [entity1]
+    assert document.entities.select([1]) == [entity2]
+
+    with pytest.raises(
+        TypeError, match=re.escape("can only append annotations of type LabeledSpan")
+    ):
+        document.entities.append(Span(start=0, end=1))
+
+    relation = BinaryRelation(head=entity1, tail=entity2, label="works_at")
+    document.relations.append(relation)
+    document.entities.predictions.append(LabeledSpan(start=9, end=14, label="PER", score=0.1))
+
+    document_reconstructed = TestDocument.fromdict(document.asdict())
+    assert document_reconstructed == document
+    assert isinstance(document_reconstructed.entities, ColumnarAnnotationList)
+    assert document_reconstructed.relations[0].head.target == document.text
+
+    popped = document.entities.pop(0)
+    assert popped == LabeledSpan(start=0, end=8, label="PER")
+    assert popped.target is None
+    assert list(document.entities) == [entity2]
+    document.entities.clear()
+    assert len(document.entities) == 0
+
+
+def test_columnar_annotation_list_unsupported_type():
+    @dataclasses.dataclass
+    class TestDocument(TextDocument):
+        relations: AnnotationList[BinaryRelation] = annotation_field(target="text", columnar=True)
+
+    with pytest.raises(
+        TypeError,
+        match=re.escape(
+            "The type '<class 'pytorch_ie.annotations.Span'>' of the field 'head' from Annotation subclass "
+            "'BinaryRelation' can not be stored column-wise."
+        ),
+    ):
+        TestDocument(text="text")
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_annotation_list_extend(columnar):
+    @dataclasses.dataclass
+    class TestDocument(TextDocument):
+        entities: AnnotationList[LabeledSpan] = annotation_field(target="text", columnar=columnar)
+
+    document = TestDocument(text="Jane lives in Berlin.")
+    jane = LabeledSpan(start=0, end=4, label="PER")
+    berlin = LabeledSpan(start=14, end=20, label="LOC")
+    document.entities.extend(iter([jane, berlin]))
+    assert list(document.entities) == [jane, berlin]
+    assert jane.target == document.text
+    assert berlin.target == document.text
+
+    # the batch is validated before anything is added
+    lives = LabeledSpan(start=5, end=10, label="X")
+    with pytest.raises(ValueError, match="Annotation already has assigned targets."):
+        document.entities.extend([lives, jane])
+    with pytest.raises(ValueError, match="Annotation already has assigned targets."):
+        document.entities.extend([lives, lives])
+    assert lives.target is None
+    assert len(document.entities) == 2
+
+    document.entities.predictions.extend([lives])
+    assert list(document.entities.predictions) == [lives]
+
+
+def test_annotation_list_from_iterable():
+    document = TextDocument(text="Jane lives in Berlin.")
+    jane = LabeledSpan(start=0, end=4, label="PER")
+    berlin = LabeledSpan(start=14, end=20, label="LOC")
+    annotation_list = AnnotationList.from_iterable(
+        document=document, targets=["text"], annotations=[jane, berlin]
+    )
+    assert isinstance(annotation_list, AnnotationList)
+    assert list(annotation_list) == [jane, berlin]
+    assert berlin.target == document.text
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_annotation_list_span_queries(columnar):
+    @dataclasses.dataclass
+    class TestDocument(TextDocument):
+        entities: AnnotationList[LabeledSpan] = annotation_field(target="text", columnar=columnar)
+        relations: AnnotationList[BinaryRelation] = annotation_field(target="entities")
+
+    document = TestDocument(text="Jane lives in New York City.")
+    city = LabeledSpan(start=14, end=27, label="LOC")
+    jane = LabeledSpan(start=0, end=4, label="PER")
+    york = LabeledSpan(start=18, end=22, label="LOC")
+    document.entities.extend([city, jane, york])
+
+    assert document.entities.spans_within(0, 28) == [city, jane, york]
+    assert document.entities.spans_within(14, 27) == [city, york]
+    assert document.entities.spans_within(15, 27) == [york]
+    assert document.entities.spans_within(5, 13) == []
+    assert document.entities.spans_overlapping(3, 15) == [city, jane]
+    assert document.entities.spans_overlapping(4, 14) == []
+    assert document.entities.spans_containing(20) == [city, york]
+    assert document.entities.spans_containing(4) == []
+
+    # the index is invalidated when the list is modified
+    document.entities.pop(0)
+    assert document.entities.spans_containing(20) == [york]
+    lives = LabeledSpan(start=5, end=10, label="X")
+    document.entities.append(lives)
+    assert document.entities.spans_overlapping(3, 15) == [jane, lives]
+    document.entities.clear()
+    assert document.entities.spans_within(0, 28) == []
+    assert document.entities.predictions.spans_containing(0) == []
+
+    document.relations.append(BinaryRelation(head=jane, tail=york, label="lives_in"))
+    with pytest.raises(
+        TypeError,
+        match=re.escape("span queries are only supported for annotations with start and end"),
+    ):
+        document.relations.spans_containing(0)
@@ -1,4 +1,11 @@
+import asyncio
+import contextlib
+import json
 import re
+import threading
+import warnings
+from dataclasses import dataclass
+from typing import List
 
 import pytest
 import torch
@@ -6,9 +13,12 @@ import transformers
 from transformers.modeling_outputs import BaseModelOutputWithPooling
 
 import pytorch_ie.models.modules.mlp
+from pytorch_ie.annotations import LabeledSpan
+from pytorch_ie.core import AnnotationList, TaskEncoding, TaskModule, annotation_field
 from pytorch_ie.core.taskmodule import InplaceNotSupportedException
+from pytorch_ie.documents import TextDocument
 from pytorch_ie.models.transformer_span_classification import TransformerSpanClassificationModel
-from pytorch_ie.pipeline import Pipeline
+from pytorch_ie.pipeline import AsyncPipeline, LengthGroupedBatchSampler, Pipeline
 from pytorch_ie.taskmodules.transformer_span_classification import (
     TransformerSpanClassificationTaskModule,
 )
@@ -145,3 +155,371 @@ def test_pipeline_with_dataset(dataset, prepared_taskmodule, mock_model, inplace
             assert not (id(returned_document) == id(document))
             assert not document.entities.predictions
             assert returned_document.entities.predictions
+
+
+@dataclass
+class SentenceDocument(TextDocument):
+    sentences: AnnotationList[LabeledSpan] = annotation_field(target="text")
+
+
+class SentenceLengthTaskModule(TaskModule):
+    """Creates one task encoding per sentence with the character codes as input_ids."""
+
+    def __init__(self):
+        super().__init__()
+        self.batch_shapes: List[torch.Size] = []
+
+    def encode_input(self, document, is_training=False):
+        return [
+            TaskEncoding(
+                document=document,
+                inputs={"input_ids": [ord(c) for c in str(sentence)]},
+                metadata={"sentence": sentence},
+            )
+            for sentence in document.sentences
+        ]
+
+    def encode_target(self, task_encoding):
+        return task_encoding.metadata["sentence"].label
+
+    def collate(self, task_encodings):
+        max_length = max(
+            len(task_encoding.inputs["input_ids"]) for task_encoding in task_encodings
+        )
+        input_ids = torch.tensor(
+            [
+                task_encoding.inputs["input_ids"]
+                + [0] * (max_length - len(task_encoding.inputs["input_ids"]))
+                for task_encoding in task_encodings
+            ]
+        )
+        self.batch_shapes.append(input_ids.shape)
+        return {"input_ids": input_ids}, None
+
+    def unbatch_output(self, model_output):
+        return model_output["lengths"].tolist()
+
+    def create_annotations_from_output(self, task_encoding, task_output):
+        sentence = task_encoding.metadata["sentence"]
+        yield "sentences", LabeledSpan(
+            start=sentence.start, end=sentence.end, label=str(task_output)
+        )
+
+
+class SentenceLengthModel(torch.nn.Module):
+    def predict(self, inputs):
+        return {"lengths": (inputs["input_ids"] != 0).sum(dim=1)}
+
+
+def get_sentence_documents() -> List[SentenceDocument]:
+    documents = []
+    for i in range(6):
+        sentences = [
+            f"Sentence {j} of document {i}." + " More." * ((i * 7 + j * 3) % 5)
+            for j in range(i % 3 + 1)
+        ]
+        document = SentenceDocument(text=" ".join(sentences))
+        start = 0
+        for sentence in sentences:
+            document.sentences.append(
+                LabeledSpan(start=start, end=start + len(sentence), label="gold")
+            )
+            start += len(sentence) + 1
+        documents.append(document)
+    return documents
+
+
+def get_sentence_predictions(document: SentenceDocument):
+    return [
+        (str(sentence), prediction.label)
+        for sentence, prediction in zip(document.sentences, document.sentences.predictions)
+    ]
+
+
+def test_length_grouped_batch_sampler():
+    sampler = LengthGroupedBatchSampler(lengths=[3, 7, 5, 7, 1], batch_size=2)
+    assert list(sampler) == [[1, 3], [2, 0], [4]]
+    assert len(sampler) == 3
+    assert sampler.restore_order(["b", "d", "c", "a", "e"]) == ["a", "b", "c", "d", "e"]
+    with pytest.raises(ValueError, match="expected 5 items"):
+        sampler.restore_order(["a"])
+    with pytest.raises(ValueError, match="batch_size has to be a positive integer"):
+        LengthGroupedBatchSampler(lengths=[1], batch_size=0)
+
+
+def test_length_grouped_batch_sampler_with_max_tokens_per_batch(caplog):
+    lengths = [3, 7, 5, 7, 1, 12, 2, 2, 2]
+    sampler = LengthGroupedBatchSampler(lengths=lengths, batch_size=None, max_tokens_per_batch=10)
+    assert list(sampler) == [[5], [1], [3], [2, 0], [6, 7, 8, 4]]
+    assert "1 inputs are longer than max_tokens_per_batch=10" in caplog.text
+
+    # the batch size still limits the number of inputs per batch
+    sampler = LengthGroupedBatchSampler(lengths=lengths, batch_size=2, max_tokens_per_batch=10)
+    assert list(sampler) == [[5], [1], [3], [2, 0], [6, 7], [8, 4]]
+
+    with pytest.raises(ValueError, match="either batch_size or max_tokens_per_batch is required"):
+        LengthGroupedBatchSampler(lengths=lengths, batch_size=None)
+    with pytest.raises(ValueError, match="max_tokens_per_batch has to be a positive integer"):
+        LengthGroupedBatchSampler(lengths=lengths, max_tokens_per_batch=0)
+
+
+def test_pipeline_with_sort_by_length():
+    taskmodule = SentenceLengthTaskModule()
+    pipeline = Pipeline(model=SentenceLengthModel(), taskmodule=taskmodule, device=-1)
+
+    documents = get_sentence_documents()
+    pipeline(documents, batch_size=3, num_workers=0)
+    expected = [get_sentence_predictions(document) for document in documents]
+    unsorted_padding = sum(shape.numel() for shape in taskmodule.batch_shapes)
+
+    documents = get_sentence_documents()
+    taskmodule.batch_shapes = []
+    pipeline(documents, batch_size=3, num_workers=0, sort_by_length=True)
+    # the predictions are assigned to the correct sentences
+    for document, expected_predictions in zip(documents, expected):
+        predictions = get_sentence_predictions(document)
+        assert predictions == expected_predictions
+        assert all(label == str(len(text)) for text, label in predictions)
+    assert sum(shape.numel() for shape in taskmodule.batch_shapes) < unsorted_padding
+
+
+def test_pipeline_with_max_tokens_per_batch():
+    taskmodule = SentenceLengthTaskModule()
+    pipeline = Pipeline(
+        model=SentenceLengthModel(), taskmodule=taskmodule, device=-1, max_tokens_per_batch=100
+    )
+
+    documents = get_sentence_documents()
+    pipeline(documents, num_workers=0)
+    for document in documents:
+        predictions = get_sentence_predictions(document)
+        assert len(predictions) == len(document.sentences)
+        assert all(label == str(len(text)) for text, label in predictions)
+    assert len(taskmodule.batch_shapes) > 1
+    assert all(shape.numel() <= 100 for shape in taskmodule.batch_shapes)
+
+
+def test_pipeline_with_document_chunk_size():
+    taskmodule = SentenceLengthTaskModule()
+    pipeline = Pipeline(model=SentenceLengthModel(), taskmodule=taskmodule, device=-1)
+
+    documents = get_sentence_documents()
+    expected = [
+        get_sentence_predictions(document)
+        for document in pipeline(documents, batch_size=2, num_workers=0, inplace=False)
+    ]
+
+    # a document without task encodings
+    documents.insert(3, SentenceDocument(text="No sentences."))
+    expected.insert(3, [])
+    returned_documents = pipeline(
+        documents, batch_size=2, document_chunk_size=2, inplace=False, sort_by_length=True
+    )
+    assert len(returned_documents) == len(documents)
+    for returned_document, document, expected_predictions in zip(
+        returned_documents, documents, expected
+    ):
+        assert returned_document.text == document.text
+        assert not document.sentences.predictions
+        assert get_sentence_predictions(returned_document) == expected_predictions
+
+    returned_documents = pipeline(documents, batch_size=2, document_chunk_size=3)
+    assert [id(document) for document in returned_documents] == [
+        id(document) for document in documents
+    ]
+    assert [get_sentence_predictions(document) for document in documents] == expected
+
+    with pytest.raises(ValueError, match="fast_dev_run is not supported"):
+        pipeline(documents, document_chunk_size=3, fast_dev_run=True)
+
+
+class ThreadRecordingTaskModule(SentenceLengthTaskModule):
+    """Records the threads that call the taskmodule, e.g. the (not thread-safe) tokenizer."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.thread_ids = set()
+
+    def encode_input(self, document, is_training=False):
+        self.thread_ids.add(threading.get_ident())
+        return super().encode_input(document, is_training)
+
+    def collate(self, task_encodings):
+        self.thread_ids.add(threading.get_ident())
+        return super().collate(task_encodings)
+
+    def unbatch_output(self, model_output):
+        self.thread_ids.add(threading.get_ident())
+        return super().unbatch_output(model_output)
+
+    def create_annotations_from_output(self, task_encoding, task_output):
+        self.thread_ids.add(threading.get_ident())
+        yield from super().create_annotations_from_output(task_encoding, task_output)
+
+
+def test_pipeline_with_document_chunk_size_calls_taskmodule_in_one_thread():
+    taskmodule = ThreadRecordingTaskModule()
+    pipeline = Pipeline(model=SentenceLengthModel(), taskmodule=taskmodule, device=-1)
+
+    documents = pipeline(get_sentence_documents(), batch_size=2, document_chunk_size=2)
+    assert all(len(get_sentence_predictions(document)) > 0 for document in documents)
+    assert len(taskmodule.thread_ids) == 1
+
+
+def test_pipeline_stream(tmp_path):
+    taskmodule = SentenceLengthTaskModule()
+    pipeline = Pipeline(model=SentenceLengthModel(), taskmodule=taskmodule, device=-1)
+
+    # a local file as stand-in for an unbounded stream of documents
+    path = tmp_path / "documents.jsonl"
+    with open(path, "w") as f:
+        for _ in range(10):
+            for document in get_sentence_documents():
+                f.write(json.dumps(document.asdict()) + "\n")
+
+    num_read = 0
+
+    def read_documents():
+        nonlocal num_read
+        with open(path) as f:
+            for line in f:
+                num_read += 1
+                yield SentenceDocument.fromdict(json.loads(line))
+
+    stream = pipeline.stream(read_documents(), document_chunk_size=4, batch_size=3)
+    first_document = next(stream)
+    assert get_sentence_predictions(first_document) == [
+        (str(sentence), str(len(str(sentence)))) for sentence in first_document.sentences
+    ]
+    # the documents are consumed lazily
+    assert num_read < 60
+    stream.close()
+
+    num_read = 0
+    returned_documents = list(pipeline.stream(read_documents(), document_chunk_size=7))
+    assert num_read == 60
+    assert [document.text for document in returned_documents] == [
+        document.text for document in get_sentence_documents()
+    ] * 10
+    for document in returned_documents:
+        predictions = get_sentence_predictions(document)
+        assert len(predictions) == len(document.sentences)
+        assert all(label == str(len(text)) for text, label in predictions)
+
+    with pytest.raises(ValueError, match="document_chunk_size has to be a positive integer"):
+        pipeline.stream(read_documents(), document_chunk_size=0)
+
+
+def test_async_pipeline(monkeypatch):
+    taskmodule = SentenceLengthTaskModule()
+    pipeline = Pipeline(model=SentenceLengthModel(), taskmodule=taskmodule, device=-1)
+    documents = get_sentence_documents() + get_sentence_documents()
+
+    async def predict_all():
+        async with AsyncPipeline(
+            pipeline, max_batch_size=4, max_wait_ms=100, num_workers=0, batch_size=8
+        ) as async_pipeline:
+            return await asyncio.gather(
+                *(async_pipeline.predict(document) for document in documents)
+            )
+
+    batch_sizes = []
+    process_documents = pipeline._process_documents
+
+    def record_batch(documents, **kwargs):
+        batch_sizes.append(len(documents))
+        return process_documents(documents, **kwargs)
+
+    monkeypatch.setattr(pipeline, "_process_documents", record_batch)
+    returned_documents = asyncio.run(predict_all())
+    # the concurrent calls are processed in batches of at most 4 documents
+    assert batch_sizes == [4, 4, 4]
+    assert [id(document) for document in returned_documents] == [
+        id(document) for document in documents
+    ]
+    for document in returned_documents:
+        predictions = get_sentence_predictions(document)
+        assert len(document.sentences.predictions) == len(document.sentences)
+        assert all(label == str(len(text)) for text, label in predictions)
+
+
+def test_async_pipeline_does_not_warn_about_sequential_calls(monkeypatch):
+    taskmodule = SentenceLengthTaskModule()
+    pipeline = Pipeline(model=SentenceLengthModel(), taskmodule=taskmodule, device=-1)
+    # pretend to run on GPU, the warning is only shown there
+    pipeline.device = torch.device("cuda")
+    monkeypatch.setattr(pipeline, "device_placement", contextlib.nullcontext)
+    monkeypatch.setattr(pipeline, "_ensure_tensor_on_device", lambda inputs, device: inputs)
+
+    async def predict_all():
+        async with AsyncPipeline(pipeline, max_batch_size=1, num_workers=0) as async_pipeline:
+            return await asyncio.gather(
+                *(async_pipeline.predict(document) for document in documents)
+            )
+
+    # more than 10 batches
+    documents = get_sentence_documents() * 2
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        returned_documents = asyncio.run(predict_all())
+    assert len(returned_documents) == 12
+    assert pipeline.call_count == 0
+
+    with pytest.warns(UserWarning, match="using the pipelines sequentially on GPU"):
+        for document in documents:
+            pipeline(document, num_workers=0)
+
+
+def test_async_pipeline_with_cancelled_worker():
+    taskmodule = SentenceLengthTaskModule()
+    pipeline = Pipeline(model=SentenceLengthModel(), taskmodule=taskmodule, device=-1)
+    documents = get_sentence_documents()
+
+    async def predict_after_cancelled_worker():
+        async with AsyncPipeline(
+            pipeline, max_batch_size=2, max_wait_ms=1000, num_workers=0
+        ) as async_pipeline:
+            # the worker takes the first document and waits for a second one
+            collected = asyncio.ensure_future(async_pipeline.predict(documents[0]))
+            await asyncio.sleep(0.1)
+            async_pipeline._worker.cancel()
+            # the worker is cancelled before it takes the queued documents
+            queued = [
+                asyncio.ensure_future(async_pipeline.predict(document))
+                for document in documents[1:3]
+            ]
+            await asyncio.sleep(0)
+            async_pipeline._worker.cancel()
+            # this starts a new worker
+            processed = await asyncio.wait_for(async_pipeline.predict(documents[3]), 10)
+            results = await asyncio.wait_for(
+                asyncio.gather(collected, *queued, return_exceptions=True), 10
+            )
+            return processed, results
+
+    processed, results = asyncio.run(predict_after_cancelled_worker())
+    assert processed is documents[3]
+    assert len(get_sentence_predictions(processed)) == len(processed.sentences)
+    assert len(results) == 3
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+
+
+def test_async_pipeline_with_error(monkeypatch):
+    taskmodule = SentenceLengthTaskModule()
+    pipeline = Pipeline(model=SentenceLengthModel(), taskmodule=taskmodule, device=-1)
+
+    def raise_error(*args, **kwargs):
+        raise RuntimeError("model failed")
+
+    monkeypatch.setattr(taskmodule, "collate", raise_error)
+
+    async def predict_all():
+        async with AsyncPipeline(pipeline, max_wait_ms=10, num_workers=0) as async_pipeline:
+            return await asyncio.gather(
+                *(async_pipeline.predict(document) for document in get_sentence_documents()),
+                return_exceptions=True,
+            )
+
+    results = asyncio.run(predict_all())
+    assert len(results) == 6
+    assert all(isinstance(result, RuntimeError) for result in results)
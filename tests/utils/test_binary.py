@@ -0,0 +1,44 @@
+import pytest
+
+from pytorch_ie.utils.binary import dumps, loads
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        None,
+        True,
+        -3,
+        2**70,
+        0.5,
+        "Jane",
+        b"\x00\x01",
+        [],
+        [1, 2, 3],
+        [0.1, 0.2],
+        ["PER", "LOC", "PER"],
+        [1, "a", None, [2.0, 3]],
+        (1, ("a", "b")),
+        {"text": "Jane lives in Berlin.", "labels": ["PER", "PER"], "nested": {"PER": 1}},
+    ],
+)
+def test_dumps_and_loads(value):
+    data = dumps(value)
+    assert isinstance(data, bytes)
+    result = loads(data)
+    assert result == value
+    assert type(result) is type(value)
+
+
+def test_dumps_deduplicates_strings():
+    assert len(dumps(["a long label"] * 100)) < len(dumps(["a long label"])) + 500
+
+
+def test_dumps_unsupported_type():
+    with pytest.raises(TypeError, match="can not encode value of type set"):
+        dumps({1, 2})
+
+
+def test_loads_trailing_bytes():
+    with pytest.raises(ValueError, match="found 1 trailing bytes after the encoded value"):
+        loads(dumps(1) + b"N")
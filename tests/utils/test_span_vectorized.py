@@ -0,0 +1,121 @@
+import pickle
+from dataclasses import dataclass
+
+import numpy as np
+
+from pytorch_ie.annotations import LabeledSpan
+from pytorch_ie.core import AnnotationList, annotation_field
+from pytorch_ie.documents import TextDocument
+from pytorch_ie.utils.span import (
+    CharToTokenMapper,
+    char_to_token_indices,
+    containment_matrix,
+    deduplicate_spans,
+    get_char_to_token_mapper,
+    get_token_slice,
+    has_overlap,
+    is_contained_in,
+    merge_spans,
+    nearest_spans,
+    overlap_matrix,
+    span_distance_matrix,
+    spans_to_array,
+    spans_to_token_slices,
+)
+
+
+@dataclass
+class ExampleDocument(TextDocument):
+    entities: AnnotationList[LabeledSpan] = annotation_field(target="text")
+
+
+SPANS = [(0, 3), (2, 5), (5, 8), (10, 12), (0, 12)]
+
+
+def test_spans_to_array():
+    document = ExampleDocument(text="This is a test.")
+    document.entities.extend([LabeledSpan(start=0, end=4, label="a"), LabeledSpan(5, 7, "b")])
+    np.testing.assert_array_equal(spans_to_array(document.entities), [[0, 4], [5, 7]])
+    np.testing.assert_array_equal(spans_to_array(list(document.entities)), [[0, 4], [5, 7]])
+    assert spans_to_array([]).shape == (0, 2)
+
+
+def test_containment_and_overlap_matrix():
+    spans = np.array(SPANS)
+    contained = containment_matrix(spans, spans)
+    overlapping = overlap_matrix(spans, spans)
+    for i, span in enumerate(SPANS):
+        for j, other_span in enumerate(SPANS):
+            assert contained[i, j] == is_contained_in(span, other_span)
+            assert overlapping[i, j] == has_overlap(span, other_span)
+
+
+def test_nearest_spans():
+    spans = np.array([(0, 3), (6, 8)])
+    other_spans = np.array([(4, 5), (2, 4), (12, 13)])
+    np.testing.assert_array_equal(span_distance_matrix(spans, other_spans), [[1, 0, 9], [1, 2, 4]])
+    indices, distances = nearest_spans(spans, other_spans)
+    np.testing.assert_array_equal(indices, [1, 0])
+    np.testing.assert_array_equal(distances, [0, 1])
+    indices, distances = nearest_spans(spans, other_spans, exclude_overlapping=True)
+    np.testing.assert_array_equal(indices, [0, 0])
+    np.testing.assert_array_equal(distances, [1, 1])
+    indices, distances = nearest_spans(spans, np.zeros((0, 2)))
+    np.testing.assert_array_equal(indices, [-1, -1])
+    np.testing.assert_array_equal(distances, [-1, -1])
+
+
+def test_merge_and_deduplicate_spans():
+    np.testing.assert_array_equal(
+        merge_spans(np.array([(10, 12), (0, 3), (2, 5), (5, 8)])), [[0, 5], [5, 8], [10, 12]]
+    )
+    np.testing.assert_array_equal(
+        merge_spans(np.array([(10, 12), (0, 3), (2, 5), (5, 8)]), merge_adjacent=True),
+        [[0, 8], [10, 12]],
+    )
+    assert merge_spans([]).shape == (0, 2)
+    unique, inverse = deduplicate_spans(np.array([(2, 5), (0, 3), (2, 5)]))
+    np.testing.assert_array_equal(unique, [[0, 3], [2, 5]])
+    np.testing.assert_array_equal(inverse, [1, 0, 1])
+
+
+def test_spans_to_token_slices():
+    # "Hello world!" with special tokens at the beginning and the end
+    token_offsets = [(0, 0), (0, 5), (6, 11), (11, 12), (0, 0)]
+    np.testing.assert_array_equal(
+        char_to_token_indices([0, 4, 5, 6, 11, 12], token_offsets), [1, 1, -1, 2, 3, -1]
+    )
+    spans = [(0, 5), (6, 12), (5, 11), (3, 8), (0, 4)]
+    char_to_token = {
+        char_idx: token_idx
+        for token_idx, (start, end) in enumerate(token_offsets)
+        for char_idx in range(start, end)
+    }
+    expected = [
+        get_token_slice((start, end), char_to_token.get) or (-1, -1) for start, end in spans
+    ]
+    np.testing.assert_array_equal(spans_to_token_slices(spans, token_offsets), expected)
+    np.testing.assert_array_equal(expected, [[1, 2], [2, 4], [-1, -1], [1, 3], [1, 2]])
+    assert char_to_token_indices([0, 1], np.zeros((0, 2))).tolist() == [-1, -1]
+
+
+def test_char_to_token_mapper():
+    token_offsets = [(0, 5), (6, 11), (11, 12), (13, 17), (18, 20)]
+    mapper = CharToTokenMapper(token_offsets)
+    char_indices = [0, 4, 5, 6, 11, 12, 19, 20]
+    assert [mapper(idx) for idx in char_indices] == [0, 0, None, 1, 2, None, 4, None]
+
+    # a window over the tokens 1 and 2 with one leading special token, see the windowing in
+    # TransformerTokenClassificationTaskModule
+    window_mapper = mapper.with_window(
+        token_start=1, token_end=3, token_offset=1, char_start=6, char_end=12
+    )
+    char_to_token_mapping = {char_idx: 1 for char_idx in range(6, 11)}
+    char_to_token_mapping[11] = 2
+    expected_mapper = get_char_to_token_mapper(char_to_token_mapping, char_start=6, char_end=12)
+    for char_idx in range(22):
+        assert window_mapper(char_idx) == expected_mapper(char_idx)
+    assert mapper(0) == 0
+
+    restored = pickle.loads(pickle.dumps(window_mapper))
+    assert [restored(idx) for idx in range(22)] == [window_mapper(idx) for idx in range(22)]
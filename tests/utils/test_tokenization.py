@@ -0,0 +1,43 @@
+import pytest
+from transformers import BertTokenizerFast
+
+from pytorch_ie.utils.tokenization import batch_tokenize, batch_tokenize_grouped
+
+
+@pytest.fixture
+def tokenizer(tmp_path):
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "the", "quick", "fox", "dog", "."]
+    vocab_file = tmp_path / "vocab.txt"
+    vocab_file.write_text("\n".join(vocab) + "\n")
+    return BertTokenizerFast(vocab_file=str(vocab_file))
+
+
+@pytest.mark.parametrize("add_special_tokens", [True, False])
+def test_batch_tokenize(tokenizer, add_special_tokens):
+    texts = ["the quick fox", "the dog.", ""]
+    kwargs = dict(
+        add_special_tokens=add_special_tokens,
+        return_offsets_mapping=True,
+        return_special_tokens_mask=True,
+    )
+    encodings = batch_tokenize(tokenizer, texts, **kwargs)
+    assert len(encodings) == len(texts)
+    for text, encoding in zip(texts, encodings):
+        expected = tokenizer(text, **kwargs)
+        assert dict(encoding) == dict(expected)
+        assert [encoding.char_to_token(idx) for idx in range(len(text))] == [
+            expected.char_to_token(idx) for idx in range(len(text))
+        ]
+
+    assert batch_tokenize(tokenizer, []) == []
+    with pytest.raises(ValueError, match="does not support padding"):
+        batch_tokenize(tokenizer, texts, padding=True)
+
+
+def test_batch_tokenize_grouped(tokenizer):
+    grouped_texts = [["the quick fox"], [], ["the dog.", "quick"]]
+    grouped_encodings = batch_tokenize_grouped(tokenizer, grouped_texts)
+    assert [len(encodings) for encodings in grouped_encodings] == [1, 0, 2]
+    for texts, encodings in zip(grouped_texts, grouped_encodings):
+        for text, encoding in zip(texts, encodings):
+            assert encoding["input_ids"] == tokenizer(text)["input_ids"]